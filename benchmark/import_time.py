@@ -0,0 +1,97 @@
+"""Cold-start benchmark of the no-work path of main().
+
+Runs main() in fresh interpreters against an empty local SQLite course
+table, once refreshing the plan from the database and once from a cached
+snapshot, and reports wall-clock time, the slowest imports and which heavy
+modules got loaded:
+
+    python -m benchmark.import_time --repeat 5 --budget-ms 400
+
+Exits non-zero when the cached no-work run exceeds the budget or imports
+any module that is only needed for booking.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# only needed once there is something to book
+BOOKING_ONLY_MODULES = ("selenium", "cryptography", "requests", "yaml", "sqlalchemy")
+
+PROBE = """
+import json, sys
+import main
+try:
+    main.main()
+except SystemExit:
+    pass
+print(json.dumps(sorted(name for name in %r if name in sys.modules)))
+""" % (BOOKING_ONLY_MODULES,)
+
+
+def create_course_table(path: str) -> None:
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE courses (id INTEGER PRIMARY KEY, orig_course_name TEXT, person TEXT, weekday TEXT, "
+                           "weekday_ger_abb TEXT, is_registration_active BOOLEAN, updated_at TIMESTAMP)")
+
+
+def run_once(env: dict) -> dict:
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", PROBE], env=env, capture_output=True, text=True)
+    wall_clock_s = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr[-2000:])
+
+    imports = []
+    for line in completed.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            # only top-level entries, nested imports are part of their parent's cumulative time
+            if not name.startswith("  "):
+                imports.append((int(cumulative) / 1e6, name.strip()))
+    return {"wall_clock_s": wall_clock_s,
+            "loaded": json.loads(completed.stdout.strip().splitlines()[-1]),
+            "slowest_imports": sorted(imports, reverse=True)[:8]}
+
+
+def summarize(mode: str, runs: list[dict]) -> str:
+    values = [run["wall_clock_s"] for run in runs]
+    lines = [f"{mode}: mean {statistics.mean(values) * 1000:.0f} ms, min {min(values) * 1000:.0f} ms, max {max(values) * 1000:.0f} ms",
+             f"  booking-only modules loaded: {runs[-1]['loaded'] or 'none'}"]
+    lines += [f"  {seconds * 1000:>7.1f} ms  {name}" for seconds, name in runs[-1]["slowest_imports"]]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=400,
+                        help="wall-clock budget of the cached no-work run, interpreter start included")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "courses.sqlite")
+        create_course_table(db_path)
+        env = {**os.environ,
+               "DB_URL": f"sqlite:///{db_path}",
+               "TABLE_NAME": "courses",
+               "COURSE_PLAN_SNAPSHOT_PATH": os.path.join(tmp_dir, "course_plan.sqlite"),
+               "PYTHONDONTWRITEBYTECODE": "1"}
+
+        results = {"database": [run_once(env=env) for _ in range(args.repeat)],
+                   "cached": [run_once(env={**env, "COURSE_PLAN_MAX_AGE_SECONDS": "3600"}) for _ in range(args.repeat)]}
+
+    for mode, runs in results.items():
+        print(summarize(mode, runs))
+
+    cached_ms = statistics.mean(run["wall_clock_s"] for run in results["cached"]) * 1000
+    if cached_ms > args.budget_ms or results["cached"][-1]["loaded"]:
+        print(f"FAIL: cached no-work run took {cached_ms:.0f} ms (budget {args.budget_ms:.0f} ms), "
+              f"loaded {results['cached'][-1]['loaded']}")
+        sys.exit(1)
+    print(f"OK: cached no-work run within {args.budget_ms:.0f} ms budget")
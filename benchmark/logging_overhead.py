@@ -0,0 +1,80 @@
+"""Per-call cost of logging on the booking thread, synchronous vs queue mode.
+
+Configures logging from logger_config.yaml with the log files redirected to
+a temporary directory, then times the calls the booking flow makes: an
+enabled info record through console, file and JSON handlers, and a disabled
+debug call built eagerly with an f-string vs lazily with %-arguments:
+
+    python -m benchmark.logging_overhead --calls 20000
+
+Console output is discarded while measuring.
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import tempfile
+import time
+
+import yaml
+
+from logger import setup_logging, get_logger
+from logger.logger import DEFAULT_CONFIG, _stop_queue_listeners
+
+COURSE = {"orig_course_name": "Yoga am Morgen", "person": "Max Mustermann"}
+
+
+def write_config(tmp_dir: str, is_queued: bool) -> str:
+    with open(DEFAULT_CONFIG, encoding="utf-8") as file:
+        cfg = yaml.safe_load(file)
+    cfg["queue"] = is_queued
+    for handler in cfg["handlers"].values():
+        if "filename" in handler:
+            handler["filename"] = os.path.join(tmp_dir, os.path.basename(handler["filename"]))
+    path = os.path.join(tmp_dir, f"logger_config_{is_queued}.yaml")
+    with open(path, "w", encoding="utf-8") as file:
+        yaml.safe_dump(cfg, file)
+    return path
+
+
+def time_calls(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def measure(config_path: str, calls: int) -> dict:
+    with contextlib.redirect_stdout(io.StringIO()):
+        setup_logging(config_path)
+        # the console handler holds the sys.stdout of configuration time
+        logger = get_logger("etvcourse.course_booking")
+        timings = {
+            "info_lazy_us": time_calls(lambda: logger.info("COURSE: %s\nPERSON: %s\nIS BOOKED: %s",
+                                                           COURSE["orig_course_name"], COURSE["person"], True), calls),
+            "debug_disabled_fstring_us": time_calls(lambda: logger.debug(f"COURSE: {COURSE['orig_course_name']}\nPERSON: {COURSE['person']}"), calls),
+            "debug_disabled_lazy_us": time_calls(lambda: logger.debug("COURSE: %s\nPERSON: %s",
+                                                                      COURSE["orig_course_name"], COURSE["person"]), calls),
+        }
+        drain_start = time.perf_counter()
+        _stop_queue_listeners()
+        timings["drain_s"] = time.perf_counter() - drain_start
+    logging.shutdown()
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = {mode: measure(write_config(tmp_dir, is_queued=mode == "queue"), calls=args.calls)
+                   for mode in ("sync", "queue")}
+
+    print(f"{'CALL':<28} {'SYNC US':>9} {'QUEUE US':>9}")
+    for name in ("info_lazy_us", "debug_disabled_fstring_us", "debug_disabled_lazy_us"):
+        print(f"{name[:-3]:<28} {results['sync'][name]:>9.2f} {results['queue'][name]:>9.2f}")
+    print(f"Saved per info call on the booking thread: {results['sync']['info_lazy_us'] - results['queue']['info_lazy_us']:.2f} us, "
+          f"queue drained in {results['queue']['drain_s']:.3f}s")
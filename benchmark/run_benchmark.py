@@ -0,0 +1,99 @@
+"""Offline benchmark of the full main() flow against the local stand-in site.
+
+Serves the fixtures from standin/ on a free port, points main() at them with
+headless Firefox and reports wall-clock time per phase from the run trace:
+
+    python -m benchmark.run_benchmark --repeat 3 --latency-ms 150 --overlay --output bench.json
+
+Only the course plan is injected; login, filter and booking run for real
+against the stand-in pages, so wait and retry changes can be compared.
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from unittest import mock
+
+import main
+from src.utils.tracing import tracer
+from standin.http_api import StandinState
+from standin.site import SiteConfig, serve
+
+PERSON_NAME = "Max Mustermann"
+
+
+def course_plan(state: StandinState, weekday_abbr: str) -> list[dict]:
+    return [{"orig_course_name": course["name"],
+             "person": PERSON_NAME,
+             "weekday": course["weekday"],
+             "weekday_ger_abb": course["weekday"],
+             "is_registration_active": True}
+            for course in state.courses if course["weekday"] == weekday_abbr]
+
+
+def phase_durations() -> dict:
+    phases = {}
+    for span in tracer.spans:
+        if span.kind in ("flow", "wait"):
+            phases[span.name] = phases.get(span.name, 0.0) + span.duration_s
+    return phases
+
+
+def run_once(config: SiteConfig, weekday_abbr: str, extra_env: dict) -> dict:
+    tracer.reset()
+    state = StandinState()
+    server = serve(port=0, state=state, config=config)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    env = {"LOGIN_URL": f"{base_url}/login",
+           "COURSE_OVERVIEW_URL": f"{base_url}/overview",
+           "ETV_LOGIN_NAME": "benchmark@example.com",
+           "ETV_LOGIN_PW": "benchmark",
+           **extra_env}
+
+    start = time.monotonic()
+    try:
+        with mock.patch.dict(os.environ, env), \
+             mock.patch.object(main, "load_active_courses", return_value=course_plan(state, weekday_abbr)):
+            main.main()
+    except SystemExit:
+        pass
+    finally:
+        server.shutdown()
+
+    return {"wall_clock_s": time.monotonic() - start,
+            "bookings": len(state.bookings),
+            "phases": phase_durations()}
+
+
+def summarize(runs: list[dict]) -> str:
+    names = sorted({name for run in runs for name in run["phases"]},
+                   key=lambda name: -statistics.mean(run["phases"].get(name, 0.0) for run in runs))
+    lines = [f"{'PHASE':<50} {'MEAN S':>8} {'MIN S':>8} {'MAX S':>8}"]
+    for name in ["wall_clock"] + names:
+        values = [run["wall_clock_s"] if name == "wall_clock" else run["phases"].get(name, 0.0) for run in runs]
+        lines.append(f"{name:<50} {statistics.mean(values):>8.2f} {min(values):>8.2f} {max(values):>8.2f}")
+    lines.append(f"Bookings per run: {[run['bookings'] for run in runs]}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--overlay", action="store_true")
+    parser.add_argument("--weekday", default="Mo")
+    parser.add_argument("--env", action="append", default=[],
+                        help="extra KEY=VALUE passed to main(), e.g. USE_FILTER_DEEP_LINK=true")
+    parser.add_argument("--output", help="write all runs as JSON for later comparison")
+    args = parser.parse_args()
+
+    extra_env = dict(item.split("=", 1) for item in args.env)
+    runs = [run_once(config=SiteConfig(latency_ms=args.latency_ms, overlay=args.overlay),
+                     weekday_abbr=args.weekday,
+                     extra_env=extra_env)
+            for _ in range(args.repeat)]
+    print(summarize(runs))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"args": vars(args), "runs": runs}, file, indent=2)
@@ -0,0 +1,186 @@
+import os
+import signal
+import threading
+import time
+from datetime import timedelta
+
+from logger import setup_logging
+from main import (logger,
+                  load_tasks_cfg,
+                  load_active_courses,
+                  create_session_store,
+                  create_firefox_driver)
+from src.utils.help_functions import read_yaml_file
+from src.tasks.preparation import get_tomorrow_weekday_abbr
+from src.tasks.course_booking import ensure_login, is_session_valid, run_course_booking, log_run_summary
+from src.tasks.course_index import build_course_link_indexes, seed_checkpoints
+from src.tasks.booking_window import BookingWindow, parse_opens_at, measure_clock_skew
+from src.tasks.hot_driver import HotDriver
+from src.tasks.daemon_metrics import DaemonMetrics, MetricsServer
+from src.utils.selenium.readiness import PageReadiness
+from src.utils.tracing import tracer
+from src.utils.selenium.error_exception_handler import retry_engine
+
+
+def next_opens_at(registration_opens_at: str):
+    """The next registration opening, today if it is still ahead, otherwise tomorrow."""
+    opens_at = parse_opens_at(registration_opens_at)
+    if opens_at.timestamp() <= time.time():
+        opens_at = parse_opens_at(registration_opens_at, default_date=opens_at.date() + timedelta(days=1))
+    return opens_at
+
+
+def refresh_plan(tasks_cfg: dict, weekday_abbr: str, metrics: DaemonMetrics, active_courses: list[dict]) -> list[dict]:
+    """Reload the course plan, keeping the previous one if the database and the snapshot both fail."""
+    try:
+        active_courses = load_active_courses(tasks_cfg=tasks_cfg, weekday_abbr=weekday_abbr)
+    except Exception as err:
+        logger.warning("Could not refresh the course plan, keeping %s known courses: %s", len(active_courses), err)
+        metrics.increment("etvcourse_plan_refresh_errors_total")
+        return active_courses
+    metrics.increment("etvcourse_plan_refreshes_total")
+    metrics.set_state(last_plan_refresh=time.strftime("%Y-%m-%dT%H:%M:%S%z"), active_courses=len(active_courses))
+    return active_courses
+
+
+def book_window(hot_driver: HotDriver, opens_at, weekday_abbr: str, active_courses: list[dict], tasks_cfg: dict,
+                locator_fillings: dict, metrics: DaemonMetrics) -> list[dict]:
+    """Book the courses of one registration opening on the hot driver, releasing each at its open time."""
+    try:
+        clock_skew = measure_clock_skew(url=tasks_cfg["course_overview_url"], logger=logger)
+    except Exception as err:
+        logger.warning("Could not measure clock skew, assuming none: %s", err)
+        clock_skew = 0.0
+
+    driver = hot_driver.ensure_authenticated()
+    readiness = PageReadiness(driver=driver, logger=logger)
+    indexes = {}
+    if tasks_cfg["use_course_index"]:
+        indexes = build_course_link_indexes(driver=driver,
+                                            active_courses=active_courses,
+                                            tasks_cfg=tasks_cfg,
+                                            locator_fillings=locator_fillings,
+                                            readiness=readiness,
+                                            logger=logger)
+    checkpoints = seed_checkpoints(indexes=indexes, active_courses=active_courses, logger=logger)
+
+    results = []
+    for single_course, checkpoint in zip(active_courses, checkpoints):
+        window = BookingWindow(opens_at=parse_opens_at(single_course.get("registration_opens_at") or opens_at,
+                                                       default_date=opens_at.date()),
+                               clock_skew_s=clock_skew,
+                               logger=logger)
+
+        def on_booking_ready(booking_pipe, window=window):
+            window.wait_until_open()
+            booking_pipe.refresh_course_page()
+
+        result = run_course_booking(driver=driver,
+                                    single_course=single_course,
+                                    weekday_abbr=weekday_abbr,
+                                    tasks_cfg=tasks_cfg,
+                                    locator_fillings=locator_fillings,
+                                    readiness=readiness,
+                                    on_booking_ready=on_booking_ready,
+                                    checkpoint=checkpoint,
+                                    logger=logger)
+        result["click_lateness_ms"] = window.lateness_ms(result.get("clicked_at"))
+        metrics.observe_booking(result)
+        results.append(result)
+    return results
+
+
+def main_daemon():
+    """Keep a logged-in driver warm and book at every registration opening until stopped.
+
+    Between openings the course plan is refreshed every `daemon_plan_refresh_s`
+    and the driver is checked every `daemon_health_check_s`, restarting it when
+    it died. `prewarm_lead_s` before the opening the plan is loaded a last time
+    and the session validated. /health and /metrics are served locally.
+    """
+    setup_logging()
+    tasks_cfg = load_tasks_cfg()
+    locator_fillings = read_yaml_file(os.path.join("src", "utils", "locators","locator_fillings.yaml"))
+    firefox_cfg = read_yaml_file(os.path.join("config", "browser_settings.yaml"))["firefox"]
+    session_store = create_session_store(tasks_cfg=tasks_cfg)
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    metrics = DaemonMetrics()
+    metrics_server = MetricsServer(metrics=metrics,
+                                   host=tasks_cfg["daemon_metrics_host"],
+                                   port=tasks_cfg["daemon_metrics_port"],
+                                   logger=logger)
+    metrics_server.start()
+
+    hot_driver = HotDriver(driver_factory=lambda: create_firefox_driver(tasks_cfg=tasks_cfg, firefox_cfg=firefox_cfg),
+                           login_fn=lambda driver: ensure_login(driver=driver,
+                                                                tasks_cfg=tasks_cfg,
+                                                                locator_fillings=locator_fillings,
+                                                                session_store=session_store,
+                                                                logger=logger),
+                           session_check_fn=lambda driver: is_session_valid(driver, tasks_cfg, locator_fillings),
+                           on_restart=lambda: metrics.increment("etvcourse_driver_restarts_total"),
+                           logger=logger)
+
+    try:
+        while not stop.is_set():
+            opens_at = next_opens_at(tasks_cfg["registration_opens_at"])
+            # same target day as main() computes when started at the open time
+            weekday_abbr = get_tomorrow_weekday_abbr(add_n_hours=24, now=opens_at.replace(tzinfo=None))
+            metrics.set_state(next_window=opens_at.isoformat())
+            logger.info("Next registration opening at %s for %s", opens_at.isoformat(), weekday_abbr)
+
+            active_courses, next_plan_refresh = [], 0.0
+            while not stop.is_set():
+                seconds_until_prewarm = opens_at.timestamp() - time.time() - tasks_cfg["prewarm_lead_s"]
+                if seconds_until_prewarm <= 0:
+                    break
+                if time.monotonic() >= next_plan_refresh:
+                    active_courses = refresh_plan(tasks_cfg, weekday_abbr, metrics, active_courses)
+                    next_plan_refresh = time.monotonic() + tasks_cfg["daemon_plan_refresh_s"]
+                try:
+                    hot_driver.get()
+                except Exception as err:
+                    logger.error("Could not start the driver: %s", err)
+                metrics.set_state(driver_alive=hot_driver.is_alive())
+                stop.wait(min(tasks_cfg["daemon_health_check_s"], seconds_until_prewarm))
+            if stop.is_set():
+                break
+
+            active_courses = refresh_plan(tasks_cfg, weekday_abbr, metrics, active_courses)
+            if not active_courses:
+                logger.info("No active courses for %s", weekday_abbr)
+                # skip past this opening before computing the next one
+                stop.wait(max(0.0, opens_at.timestamp() - time.time()) + 1)
+                continue
+
+            metrics.increment("etvcourse_booking_runs_total")
+            try:
+                results = book_window(hot_driver=hot_driver,
+                                      opens_at=opens_at,
+                                      weekday_abbr=weekday_abbr,
+                                      active_courses=active_courses,
+                                      tasks_cfg=tasks_cfg,
+                                      locator_fillings=locator_fillings,
+                                      metrics=metrics)
+                log_run_summary(results=results, logger=logger)
+            except Exception as err:
+                logger.error("Booking run for %s failed: %s", weekday_abbr, err)
+            metrics.set_state(driver_alive=hot_driver.is_alive())
+            logger.info("Slowest traced spans:\n%s", tracer.summary())
+            logger.info("Retry statistics:\n%s", retry_engine.report())
+            # the daemon lives for many windows, each report covers one
+            tracer.reset()
+            retry_engine.reset()
+            stop.wait(max(0.0, opens_at.timestamp() - time.time()) + 1)
+    finally:
+        logger.info("Stopping daemon...")
+        hot_driver.quit()
+        metrics_server.stop()
+
+
+if __name__ == "__main__":
+    main_daemon()
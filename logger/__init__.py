@@ -1,3 +1,3 @@
-from .logger import setup_logging, get_logger, load_config
+from .logger import setup_logging, setup_console_logging, setup_worker_logging, start_worker_log_listener, get_logger, load_config
 
-__all__ = ["setup_logging", "get_logger", "load_config"]
+__all__ = ["setup_logging", "setup_console_logging", "setup_worker_logging", "start_worker_log_listener", "get_logger", "load_config"]
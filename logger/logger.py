@@ -1,13 +1,17 @@
+import atexit
 import logging
 import logging.handlers
+import queue
 from logging.config import dictConfig
 from pathlib import Path
-import yaml
 import sys
 import json
 
 DEFAULT_CONFIG = Path(__file__).parent / "logger_config.yaml"
 
+# listeners of the queue mode, stopped before a reconfiguration and at exit
+_queue_listeners = []
+
 class JsonFormatter(logging.Formatter):
     """Lightweight JSON formatter for logging records.
 
@@ -30,6 +34,10 @@ class JsonFormatter(logging.Formatter):
         }
         if record.exc_info:
             payload["exc_info"] = self.formatException(record.exc_info)
+        # timing spans from src.utils.tracing travel as an `extra` field
+        span = getattr(record, "span", None)
+        if span is not None:
+            payload["span"] = span
         return json.dumps(payload, ensure_ascii=False)
 
 
@@ -42,10 +50,41 @@ def _ensure_log_dirs(cfg: dict):
             p.parent.mkdir(parents=True, exist_ok=True)
 
 
+def _stop_queue_listeners():
+    while _queue_listeners:
+        _queue_listeners.pop().stop()
+
+
+def _enable_queue_mode(cfg: dict):
+    """Move the handlers of every configured logger behind a QueueHandler.
+
+    Each logger gets its own queue and a QueueListener thread that feeds its
+    original handlers, so emitting a record on the calling thread only costs
+    formatting the message and a queue put.
+    """
+    loggers = [logging.getLogger()] + [logging.getLogger(name) for name in cfg.get("loggers", {})]
+    for logger in loggers:
+        handlers = list(logger.handlers)
+        if not handlers:
+            continue
+        log_queue = queue.SimpleQueue()
+        for handler in handlers:
+            logger.removeHandler(handler)
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        _queue_listeners.append(listener)
+
+
+atexit.register(_stop_queue_listeners)
+
+
 def load_config(path: Path | str | None = None) -> dict:
     path = Path(path) if path else DEFAULT_CONFIG
     if not path.exists():
         raise FileNotFoundError(f"Logging config not found: {path}")
+    import yaml
+
     with path.open("r", encoding="utf-8") as f:
         return yaml.safe_load(f)
 
@@ -54,6 +93,7 @@ def setup_logging(config_path: str | Path | None = None):
     """Load logging configuration from YAML and configure logging.
 
     - Ensures any file handler directories exist.
+    - With a top-level `queue: true` the handlers are written from background threads.
     - Falls back to basicConfig on error to avoid losing logs.
     - Returns the root logger.
 
@@ -67,9 +107,13 @@ def setup_logging(config_path: str | Path | None = None):
         logging.getLogger(__name__).exception("Failed to load logging config: %s", config_path)
         return logging.getLogger()
 
+    _stop_queue_listeners()
     try:
+        is_queued = cfg.pop("queue", False)
         _ensure_log_dirs(cfg)
         dictConfig(cfg)
+        if is_queued:
+            _enable_queue_mode(cfg)
     except Exception:
         logging.basicConfig(level=logging.INFO)
         logging.getLogger(__name__).exception("Failed to configure logging from config. Using basicConfig.")
@@ -77,9 +121,58 @@ def setup_logging(config_path: str | Path | None = None):
     return logging.getLogger()
 
 
+class _ForwardToLogger(logging.Handler):
+    """Hands a record received from a worker process to the parent's logger of the same name."""
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        logging.getLogger(record.name).handle(record)
+        return True
+
+
+def start_worker_log_listener(log_queue) -> logging.handlers.QueueListener:
+    """Write the records worker processes put on `log_queue` through this process's handlers.
+
+    Workers then never open the log files themselves, so concurrent processes
+    do not rotate the same files under each other. Stop the listener after the
+    workers finished.
+    """
+    listener = logging.handlers.QueueListener(log_queue, _ForwardToLogger())
+    listener.start()
+    return listener
+
+
+def setup_worker_logging(log_queue, config_path: str | Path | None = None):
+    """Worker-process side of `start_worker_log_listener`.
+
+    Keeps the logger levels of the YAML config but replaces every handler with
+    a QueueHandler on `log_queue`. Returns the root logger.
+    """
+    cfg = load_config(config_path)
+    configured = {"": cfg.get("root", {}), **cfg.get("loggers", {})}
+    for name, logger_cfg in configured.items():
+        logger = logging.getLogger(name or None)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        logger.setLevel(logger_cfg.get("level", "INFO"))
+        if name:
+            logger.propagate = logger_cfg.get("propagate", True)
+    return logging.getLogger()
+
+
+def setup_console_logging(level: int = logging.INFO):
+    """Console-only logging for the startup phase.
+
+    Avoids opening the log files on runs that end right away; a later
+    `setup_logging` call replaces it with the full configuration.
+    """
+    logging.basicConfig(level=level, format="%(asctime)s %(levelname)s [%(name)s] %(message)s", stream=sys.stdout)
+    return logging.getLogger()
+
+
 def get_logger(name: str | None = None) -> logging.Logger:
     """Shorthand to fetch a logger after configuration."""
     return logging.getLogger(name)
 
 
-__all__ = ["setup_logging", "get_logger", "load_config"]
+__all__ = ["setup_logging", "setup_console_logging", "setup_worker_logging", "start_worker_log_listener", "get_logger", "load_config"]
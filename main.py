@@ -1,136 +1,249 @@
-
 import sys
 import time
-from datetime import datetime
-from logger import setup_logging, get_logger
-setup_logging()
+import functools
+import os
+from logger import setup_logging, setup_console_logging, get_logger
 logger = get_logger(__name__)
 
-
-import os
 from dotenv import load_dotenv
 
-from db_handler import DatabaseHandler
-from src.utils.help_functions import read_yaml_file
-from src.utils.locators.locator_help_fns import fill_and_resolve_locators
-from src.utils.locators.locator_templates import (LoginPageLocators,
-                                                  FilterPageLocators,
-                                                  BookingLocators)
-
-from src.tasks.preparation import (get_tomorrow_weekday_abbr,
-                                   get_active_courses_by_weekday)
-from src.tasks.driver_initialization import DriverInitialization
-from src.tasks.login import Login
-from src.tasks.filter import Filter
-from src.tasks.booking import Booking
+# phase 1 only decides whether anything is booked today, the selenium, http
+# and locator modules are imported inside the functions that need them
+from src.tasks.preparation import get_tomorrow_weekday_abbr
+from src.tasks.course_plan import CoursePlanLoader
 
 load_dotenv()
 
-def main():
-
-    tasks_cfg = {"is_headless" : True,
-                 "is_remote" : False,
-                 "n_filter_tries" : 2,
-                 "n_correct_filter" : 3,
-                 "selenium_remote_url" : "",
-                 "db_url": os.getenv("DB_URL"),
-                 "table_name": os.getenv("TABLE_NAME"),
-                 "login_name" : os.getenv("ETV_LOGIN_NAME"),
-                 "login_url": os.getenv("LOGIN_URL"),
-                 "login_name": os.getenv("ETV_LOGIN_NAME"),
-                 "password": os.getenv("ETV_LOGIN_PW"),
-                 "course_overview_url": os.getenv("COURSE_OVERVIEW_URL")}
-    
-    locator_fillings = read_yaml_file(os.path.join("src", "utils", "locators","locator_fillings.yaml"))
-    firefox_cfg = read_yaml_file(os.path.join("config", "browser_settings.yaml"))["firefox"]
-
-    db = DatabaseHandler(db_url=tasks_cfg["db_url"])
-    db.load_table(table_name=tasks_cfg["table_name"])
-
-    weekday_abbr=get_tomorrow_weekday_abbr(add_n_hours=24)
-    active_courses = get_active_courses_by_weekday(course_table=db.loaded_table,
-                                                   weekday_ger_abb=weekday_abbr)
-
-    if not active_courses:
-        logger.info("No active courses for %s", weekday_abbr)
-        sys.exit()
-
+def load_tasks_cfg() -> dict:
+    return {"booking_engine" : os.getenv("BOOKING_ENGINE", "selenium"),
+            "is_headless" : True,
+            "is_remote" : False,
+            "n_filter_tries" : 2,
+            "n_correct_filter" : 3,
+            "booking_budget_s" : float(os.getenv("BOOKING_BUDGET_SECONDS", 120)),
+            "bookable_poll_interval_s" : float(os.getenv("BOOKABLE_POLL_INTERVAL_SECONDS", 0.25)),
+            "bookable_poll_deadline_s" : float(os.getenv("BOOKABLE_POLL_DEADLINE_SECONDS", 0)),
+            "bookable_poll_refresh" : os.getenv("BOOKABLE_POLL_REFRESH", "reload"),
+            "prestage_booking_form" : os.getenv("PRESTAGE_BOOKING_FORM", "false").lower() == "true",
+            "use_filter_deep_link" : os.getenv("USE_FILTER_DEEP_LINK", "false").lower() == "true",
+            "n_parallel_drivers" : int(os.getenv("N_PARALLEL_DRIVERS", 1)),
+            "use_tabs" : os.getenv("USE_TABS", "false").lower() == "true",
+            "use_course_index" : os.getenv("USE_COURSE_INDEX", "true").lower() == "true",
+            "share_login_cookies" : os.getenv("SHARE_LOGIN_COOKIES", "false").lower() == "true",
+            "registration_opens_at" : os.getenv("REGISTRATION_OPENS_AT", "09:00:00"),
+            "prewarm_lead_s" : float(os.getenv("PREWARM_LEAD_SECONDS", 90)),
+            "daemon_plan_refresh_s" : float(os.getenv("DAEMON_PLAN_REFRESH_SECONDS", 900)),
+            "daemon_health_check_s" : float(os.getenv("DAEMON_HEALTH_CHECK_SECONDS", 60)),
+            "daemon_metrics_host" : os.getenv("DAEMON_METRICS_HOST", "127.0.0.1"),
+            "daemon_metrics_port" : int(os.getenv("DAEMON_METRICS_PORT", 8765)),
+            "selenium_remote_url" : "",
+            "db_url": os.getenv("DB_URL"),
+            "table_name": os.getenv("TABLE_NAME"),
+            "course_plan_snapshot_path": os.getenv("COURSE_PLAN_SNAPSHOT_PATH", os.path.join(".cache", "course_plan.sqlite")),
+            "course_plan_max_age_s": float(os.getenv("COURSE_PLAN_MAX_AGE_SECONDS", 0)),
+            "login_name" : os.getenv("ETV_LOGIN_NAME"),
+            "login_url": os.getenv("LOGIN_URL"),
+            "login_name": os.getenv("ETV_LOGIN_NAME"),
+            "password": os.getenv("ETV_LOGIN_PW"),
+            "course_overview_url": os.getenv("COURSE_OVERVIEW_URL"),
+            "session_store_path": os.getenv("SESSION_STORE_PATH", os.path.join(".session", "session.bin")),
+            "session_store_key": os.getenv("SESSION_STORE_KEY"),
+            "snapshot_dir": os.getenv("SNAPSHOT_DIR")}
+
+def load_active_courses(tasks_cfg: dict, weekday_abbr: str) -> list[dict]:
+    course_plan = CoursePlanLoader(db_url=tasks_cfg["db_url"],
+                                   table_name=tasks_cfg["table_name"],
+                                   snapshot_path=tasks_cfg["course_plan_snapshot_path"],
+                                   logger=logger)
+    return course_plan.load(weekday_abbr=weekday_abbr, max_age_s=tasks_cfg["course_plan_max_age_s"])
+
+def create_session_store(tasks_cfg: dict):
+    from src.tasks.session_store import SessionStore
+
+    if not tasks_cfg["session_store_key"]:
+        return None
+    return SessionStore(path=tasks_cfg["session_store_path"],
+                        secret=tasks_cfg["session_store_key"],
+                        logger=logger)
+
+def create_firefox_driver(tasks_cfg: dict, firefox_cfg: dict):
+    from src.tasks.driver_initialization import DriverInitialization
+    from src.tasks.profile_template import FirefoxProfileTemplate
+
+    profile_template = None
+    template_cfg = firefox_cfg.get("profile_template") or {}
+    if template_cfg.get("enabled"):
+        profile_template = FirefoxProfileTemplate(preferences=firefox_cfg["settings"]["preferences"],
+                                                  cache_dir=template_cfg["cache_dir"],
+                                                  seed_preferences=template_cfg.get("seed_preferences"),
+                                                  logger=logger)
     driver_cl = DriverInitialization(settings=firefox_cfg["settings"]["preferences"],
-                                     arguments=firefox_cfg["settings"]["arguments"])
+                                     arguments=firefox_cfg["settings"]["arguments"],
+                                     profile_template=profile_template,
+                                     request_blocking=firefox_cfg.get("request_blocking"),
+                                     memory_constrained=firefox_cfg.get("memory_constrained"),
+                                     logger=logger)
     driver = driver_cl.create_firefox_driver(is_headless=tasks_cfg["is_headless"],
                                              remote_url=tasks_cfg["selenium_remote_url"],
                                              is_remote=tasks_cfg["is_remote"])
-
-    ## login
-    login_locators_filled = fill_and_resolve_locators(template_class=LoginPageLocators,
-                                                      base_placeholders=locator_fillings['LoginPageLocators'],
-                                                      extra_fields={"PERSON_NAME": tasks_cfg["login_name"]},)
-
-    login_pipe = Login(driver=driver,
-                       login_url=tasks_cfg["login_url"],
-                       login_name=tasks_cfg["login_name"],
-                       password=tasks_cfg["password"],
-                       locators_filled=login_locators_filled,
-                       logger=logger)
-    login_pipe.run_login()
+    if tasks_cfg.get("snapshot_dir"):
+        from src.utils.help_functions import read_yaml_file
+        from src.utils.locators.snapshots import SnapshotRecorder
+
+        # one directory per driver, so parallel drivers never share a manifest
+        driver.snapshot_recorder = SnapshotRecorder(directory=os.path.join(tasks_cfg["snapshot_dir"],
+                                                                           f"{time.strftime('%Y%m%d-%H%M%S')}-{driver.session_id[:8]}"),
+                                                    locator_fillings=read_yaml_file(os.path.join("src", "utils", "locators", "locator_fillings.yaml")),
+                                                    logger=logger)
+    return driver
+
+def run_http_engine(active_courses: list[dict], weekday_abbr: str, tasks_cfg: dict, locator_fillings: dict):
+    """Book via the http engine and return its results plus the courses left for the selenium fallback."""
+    from src.utils.help_functions import read_yaml_file
+    from src.tasks.http_engine import HttpEngine
+
+    http_cfg = read_yaml_file(os.path.join("config", "http_engine.yaml"))["http_engine"]
+    http_engine = HttpEngine(http_cfg=http_cfg, tasks_cfg=tasks_cfg, locator_fillings=locator_fillings, logger=logger)
+    results, fallback_courses = [], []
+    try:
+        http_engine.login()
+    except Exception as err:
+        logger.warning("Http login failed, falling back to selenium: %s", err)
+        http_engine.close()
+        return results, list(active_courses)
 
     for single_course in active_courses:
-        
-        now = datetime.now().astimezone()
-        logger.info(f"Starting booking flow for\nCOURSE: {single_course["orig_course_name"]}\nWEEKDAY: {weekday_abbr}\nPERSON: {single_course["person"]}\nSYSTEM TIME: {now.strftime('%Y-%m-%d %H:%M:%S (%A) %Z %z')}")
-
+        try:
+            results.append(http_engine.book_course(single_course=single_course, weekday_abbr=weekday_abbr))
+        except Exception as err:
+            logger.warning("Http booking failed for %s, falling back to selenium: %s", single_course.get("orig_course_name"), err)
+            fallback_courses.append(single_course)
+    http_engine.close()
+    return results, fallback_courses
 
-        # filter
-        filter_locators_filled = fill_and_resolve_locators(template_class=FilterPageLocators,
-                                                           base_placeholders=locator_fillings['FilterPageLocators'],
-                                                           extra_fields={"DAY_GER_ABB": single_course.get("weekday_ger_abb")},)
-
-        for _ in range(tasks_cfg["n_filter_tries"]):
+def main():
+    start = time.perf_counter()
+    setup_console_logging()
 
-            try:
-                filter_pipe = Filter(driver=driver,
-                                    course_overview_url=tasks_cfg["course_overview_url"],
-                                    filter_locators_filled=filter_locators_filled,
-                                    logger=logger)
-                filter_pipe.run_filter()
-
-                if filter_pipe.ctx["applied_filter_number"] != tasks_cfg["n_correct_filter"]:
-                        logger.warning("Incorrect number of filters applied: %s", filter_pipe.ctx["applied_filter_number"])
-                        continue
-                else:
-                    logger.debug("Correct numbers of filter applied")
-                    
+    tasks_cfg = load_tasks_cfg()
+    weekday_abbr=get_tomorrow_weekday_abbr(add_n_hours=24)
+    active_courses = load_active_courses(tasks_cfg=tasks_cfg, weekday_abbr=weekday_abbr)
 
-                # booking
-                booking_locators_filled = fill_and_resolve_locators(template_class=BookingLocators,
-                                                                    base_placeholders=locator_fillings['BookingLocators'],
-                                                                    extra_fields={"COURSE_NAME": single_course.get("orig_course_name"),
-                                                                                  "PERSON_NAME": single_course.get("person")},)
+    if not active_courses:
+        logger.info("No active courses for %s, decided in %.3fs", weekday_abbr, time.perf_counter() - start)
+        sys.exit()
 
-                booking_pipe = Booking(driver=driver,
-                                       booking_locators_filled=booking_locators_filled,
-                                       logger=logger)
-                booking_pipe.run_booking()
-                break
+    setup_logging()
+    run_bookings(tasks_cfg=tasks_cfg, weekday_abbr=weekday_abbr, active_courses=active_courses)
+    logger.info("Closing process...")
+    sys.exit()
 
+def run_bookings(tasks_cfg: dict, weekday_abbr: str, active_courses: list[dict]) -> None:
+    from src.utils.help_functions import read_yaml_file
+    from src.tasks.driver_pool import DriverPool
+    from src.tasks.driver_initialization import teardown_driver
+    from src.tasks.tab_orchestrator import TabOrchestrator
+    from src.tasks.course_booking import ensure_login, run_course_booking, log_run_summary
+    from src.tasks.course_index import build_course_link_indexes, seed_checkpoints
+    from src.utils.selenium.readiness import PageReadiness
+    from src.utils.tracing import tracer
+    from src.utils.selenium.error_exception_handler import retry_engine
 
-            except Exception as err:
-                logger.error("Error in filter/ booking process: ", err)
+    locator_fillings = read_yaml_file(os.path.join("src", "utils", "locators","locator_fillings.yaml"))
+    firefox_cfg = read_yaml_file(os.path.join("config", "browser_settings.yaml"))["firefox"]
 
+    session_store = create_session_store(tasks_cfg=tasks_cfg)
+    create_driver = functools.partial(create_firefox_driver, tasks_cfg=tasks_cfg, firefox_cfg=firefox_cfg)
+
+    results = []
+    if tasks_cfg["booking_engine"] == "http":
+        results, active_courses = run_http_engine(active_courses=active_courses,
+                                                  weekday_abbr=weekday_abbr,
+                                                  tasks_cfg=tasks_cfg,
+                                                  locator_fillings=locator_fillings)
+
+    if active_courses:
+        n_drivers = min(tasks_cfg["n_parallel_drivers"], len(active_courses))
+
+        if n_drivers > 1:
+            logger.info("Booking %s courses in parallel on %s drivers", len(active_courses), n_drivers)
+            driver_pool = DriverPool(driver_factory=create_driver,
+                                     login_fn=lambda driver: ensure_login(driver=driver,
+                                                                          tasks_cfg=tasks_cfg,
+                                                                          locator_fillings=locator_fillings,
+                                                                          session_store=session_store,
+                                                                          logger=logger),
+                                     size=n_drivers,
+                                     login_url=tasks_cfg["login_url"],
+                                     share_login_cookies=tasks_cfg["share_login_cookies"],
+                                     logger=logger)
+            try:
+                driver_pool.start()
+                indexes = {}
+                if tasks_cfg["use_course_index"]:
+                    indexes = driver_pool.run(tasks=[active_courses],
+                                              task_fn=lambda driver, courses: build_course_link_indexes(driver=driver,
+                                                                                                        active_courses=courses,
+                                                                                                        tasks_cfg=tasks_cfg,
+                                                                                                        locator_fillings=locator_fillings,
+                                                                                                        logger=logger))[0]
+                checkpoints = seed_checkpoints(indexes=indexes, active_courses=active_courses, logger=logger)
+                results += driver_pool.run(tasks=list(zip(active_courses, checkpoints)),
+                                           task_fn=lambda driver, course_checkpoint: run_course_booking(driver=driver,
+                                                                                                        single_course=course_checkpoint[0],
+                                                                                                        weekday_abbr=weekday_abbr,
+                                                                                                        tasks_cfg=tasks_cfg,
+                                                                                                        locator_fillings=locator_fillings,
+                                                                                                        checkpoint=course_checkpoint[1],
+                                                                                                        logger=logger))
             finally:
-
-                is_booked_xpath = BookingLocators._resolve(locator=BookingLocators.IS_BOOKED,
-                                                           PERSON_NAME=single_course.get("person"))
-                is_course_booked = driver.find_elements(*is_booked_xpath) != []
-
-                if is_course_booked:
-                    logger.info(f"COURSE: {single_course['orig_course_name']}\nWEEKDAY: {weekday_abbr}\nPERSON: {single_course['person']}\nIS BOOKED: True")
-                    break
+                driver_pool.close()
+        else:
+            driver = create_driver()
+            try:
+                readiness = PageReadiness(driver=driver, logger=logger)
+
+                ## login
+                ensure_login(driver=driver,
+                             tasks_cfg=tasks_cfg,
+                             locator_fillings=locator_fillings,
+                             session_store=session_store,
+                             readiness=readiness,
+                             logger=logger)
+
+                indexes = {}
+                if tasks_cfg["use_course_index"]:
+                    indexes = build_course_link_indexes(driver=driver,
+                                                        active_courses=active_courses,
+                                                        tasks_cfg=tasks_cfg,
+                                                        locator_fillings=locator_fillings,
+                                                        readiness=readiness,
+                                                        logger=logger)
+                checkpoints = seed_checkpoints(indexes=indexes, active_courses=active_courses, logger=logger)
+
+                if tasks_cfg["use_tabs"] and len(active_courses) > 1:
+                    tab_orchestrator = TabOrchestrator(driver=driver,
+                                                       tasks_cfg=tasks_cfg,
+                                                       locator_fillings=locator_fillings,
+                                                       logger=logger)
+                    results += tab_orchestrator.run(active_courses=active_courses, weekday_abbr=weekday_abbr, checkpoints=checkpoints)
                 else:
-                    logger.warning(f"COURSE: {single_course['orig_course_name']}\nPERSON: {single_course['person']}\nIS BOOKED: False")
-          
-    logger.info("Closing process...")
-    sys.exit()
+                    results += [run_course_booking(driver=driver,
+                                                   single_course=single_course,
+                                                   weekday_abbr=weekday_abbr,
+                                                   tasks_cfg=tasks_cfg,
+                                                   locator_fillings=locator_fillings,
+                                                   readiness=readiness,
+                                                   checkpoint=checkpoint,
+                                                   logger=logger)
+                               for single_course, checkpoint in zip(active_courses, checkpoints)]
+                logger.info("Total time spent waiting for page readiness: %.2fs", readiness.total_waited)
+            finally:
+                teardown_driver(driver, logger=logger)
+
+    log_run_summary(results=results, logger=logger)
+    logger.info("Slowest traced spans:\n%s", tracer.summary())
+    logger.info("Retry statistics:\n%s", retry_engine.report())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,116 @@
+import sys
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from logger import setup_logging, setup_worker_logging, start_worker_log_listener
+from main import (logger,
+                  load_tasks_cfg,
+                  load_active_courses,
+                  create_session_store,
+                  create_firefox_driver)
+from src.utils.help_functions import read_yaml_file
+from src.tasks.preparation import get_tomorrow_weekday_abbr
+from src.tasks.accounts import load_accounts, assign_courses, write_report
+from src.tasks.course_booking import ensure_login, run_course_booking, log_run_summary
+from src.tasks.driver_initialization import teardown_driver
+
+
+def failed_result(single_course: dict, weekday_abbr: str, account_name: str | None, error: str) -> dict:
+    return {"course": single_course.get("orig_course_name"),
+            "person": single_course.get("person"),
+            "weekday": weekday_abbr,
+            "is_booked": False,
+            "error": error,
+            "duration_s": 0.0,
+            "account": account_name}
+
+
+def book_account(account: dict, courses: list[dict], weekday_abbr: str) -> list[dict]:
+    """Worker process: one driver and one login for all courses of an account."""
+    tasks_cfg = {**load_tasks_cfg(),
+                 "login_name": account["login_name"],
+                 "password": account["password"],
+                 "session_store_path": os.path.join(".session", f"{account['name']}.bin")}
+    locator_fillings = read_yaml_file(os.path.join("src", "utils", "locators","locator_fillings.yaml"))
+    firefox_cfg = read_yaml_file(os.path.join("config", "browser_settings.yaml"))["firefox"]
+
+    logger.info("Account %s: booking %s courses", account["name"], len(courses))
+    driver = create_firefox_driver(tasks_cfg=tasks_cfg, firefox_cfg=firefox_cfg)
+    try:
+        ensure_login(driver=driver,
+                     tasks_cfg=tasks_cfg,
+                     locator_fillings=locator_fillings,
+                     session_store=create_session_store(tasks_cfg=tasks_cfg),
+                     logger=logger)
+        results = [run_course_booking(driver=driver,
+                                      single_course=single_course,
+                                      weekday_abbr=weekday_abbr,
+                                      tasks_cfg=tasks_cfg,
+                                      locator_fillings=locator_fillings,
+                                      logger=logger)
+                   for single_course in courses]
+    finally:
+        teardown_driver(driver, logger=logger)
+    return [{**result, "account": account["name"]} for result in results]
+
+
+def main_multi_account():
+    """Book the courses of several accounts concurrently, one worker process and browser per account.
+
+    Accounts and the persons they book for come from config/accounts.yaml,
+    at most `max_concurrent_browsers` accounts run at the same time.
+    """
+    setup_logging()
+    tasks_cfg = load_tasks_cfg()
+    accounts_cfg = read_yaml_file(os.path.join("config", "accounts.yaml"))
+    accounts = load_accounts(accounts_cfg=accounts_cfg)
+
+    weekday_abbr = get_tomorrow_weekday_abbr(add_n_hours=24)
+    active_courses = load_active_courses(tasks_cfg=tasks_cfg, weekday_abbr=weekday_abbr)
+
+    if not active_courses:
+        logger.info("No active courses for %s", weekday_abbr)
+        sys.exit()
+
+    courses_by_account, unassigned = assign_courses(accounts=accounts, active_courses=active_courses, logger=logger)
+    results = [failed_result(single_course, weekday_abbr, None, "no account configured for person")
+               for single_course in unassigned]
+    account_errors = {}
+
+    busy_accounts = [account for account in accounts if courses_by_account[account["name"]]]
+    if busy_accounts:
+        n_workers = min(accounts_cfg.get("max_concurrent_browsers", 2), len(busy_accounts))
+        logger.info("Booking %s accounts on up to %s browsers", len(busy_accounts), n_workers)
+        # spawned workers do not inherit the parent's logging threads and locks; they queue
+        # their records to this process, the only one writing and rotating the log files
+        mp_context = multiprocessing.get_context("spawn")
+        log_queue = mp_context.Queue()
+        log_listener = start_worker_log_listener(log_queue)
+        try:
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp_context,
+                                     initializer=setup_worker_logging, initargs=(log_queue,)) as executor:
+                futures = {executor.submit(book_account, account, courses_by_account[account["name"]], weekday_abbr): account["name"]
+                           for account in busy_accounts}
+                for future in as_completed(futures):
+                    account_name = futures[future]
+                    try:
+                        results += future.result()
+                    except Exception as err:
+                        logger.error("Account %s failed: %s", account_name, err)
+                        account_errors[account_name] = str(err)
+                        results += [failed_result(single_course, weekday_abbr, account_name, str(err))
+                                    for single_course in courses_by_account[account_name]]
+        finally:
+            log_listener.stop()
+
+    report_path = accounts_cfg.get("report_path", os.path.join("logs", "multi_account_report.json"))
+    report = write_report(path=report_path, weekday_abbr=weekday_abbr, results=results, account_errors=account_errors)
+    log_run_summary(results=results, logger=logger)
+    logger.info("Booked %s of %s courses, report written to %s", report["n_booked"], report["n_courses"], report_path)
+    logger.info("Closing process...")
+    sys.exit()
+
+
+if __name__ == "__main__":
+    main_multi_account()
@@ -0,0 +1,102 @@
+import sys
+import os
+
+from logger import setup_logging
+from main import (logger,
+                  load_tasks_cfg,
+                  load_active_courses,
+                  create_session_store,
+                  create_firefox_driver)
+from src.utils.help_functions import read_yaml_file
+from src.tasks.preparation import get_tomorrow_weekday_abbr
+from src.tasks.driver_pool import DriverPool
+from src.tasks.course_booking import ensure_login, run_course_booking, log_run_summary
+from src.utils.tracing import tracer
+from src.utils.selenium.error_exception_handler import retry_engine
+from src.tasks.booking_window import BookingWindow, parse_opens_at, measure_clock_skew
+
+
+def main_scheduled():
+    """Pre-warm drivers ahead of registration opening and fire the booking step at T0.
+
+    Drivers are started, logged in and navigated to each course page
+    `prewarm_lead_s` before the open time, then wait on the monotonic clock.
+    A course row may override the open time with `registration_opens_at`.
+    """
+    setup_logging()
+    tasks_cfg = load_tasks_cfg()
+    locator_fillings = read_yaml_file(os.path.join("src", "utils", "locators","locator_fillings.yaml"))
+    firefox_cfg = read_yaml_file(os.path.join("config", "browser_settings.yaml"))["firefox"]
+
+    opens_at = parse_opens_at(tasks_cfg["registration_opens_at"])
+    # same target day as main() computes when started at the open time
+    weekday_abbr = get_tomorrow_weekday_abbr(add_n_hours=24, now=opens_at.replace(tzinfo=None))
+    active_courses = load_active_courses(tasks_cfg=tasks_cfg, weekday_abbr=weekday_abbr)
+
+    if not active_courses:
+        logger.info("No active courses for %s", weekday_abbr)
+        sys.exit()
+
+    try:
+        clock_skew = measure_clock_skew(url=tasks_cfg["course_overview_url"], logger=logger)
+    except Exception as err:
+        logger.warning("Could not measure clock skew, assuming none: %s", err)
+        clock_skew = 0.0
+    windows = [BookingWindow(opens_at=parse_opens_at(single_course.get("registration_opens_at") or opens_at,
+                                                     default_date=opens_at.date()),
+                             clock_skew_s=clock_skew,
+                             logger=logger)
+               for single_course in active_courses]
+
+    first_window = min(windows, key=lambda window: window.open_monotonic)
+    logger.info("Registration opens in %.1fs, pre-warming %.0fs ahead",
+                first_window.seconds_until_open(), tasks_cfg["prewarm_lead_s"])
+    first_window.sleep_until(seconds_before_open=tasks_cfg["prewarm_lead_s"])
+
+    session_store = create_session_store(tasks_cfg=tasks_cfg)
+    driver_pool = DriverPool(driver_factory=lambda: create_firefox_driver(tasks_cfg=tasks_cfg, firefox_cfg=firefox_cfg),
+                             login_fn=lambda driver: ensure_login(driver=driver,
+                                                                  tasks_cfg=tasks_cfg,
+                                                                  locator_fillings=locator_fillings,
+                                                                  session_store=session_store,
+                                                                  logger=logger),
+                             size=min(tasks_cfg["n_parallel_drivers"], len(active_courses)),
+                             login_url=tasks_cfg["login_url"],
+                             share_login_cookies=tasks_cfg["share_login_cookies"],
+                             logger=logger)
+
+    def book_at_open(driver, course_window):
+        single_course, window = course_window
+
+        def on_booking_ready(booking_pipe):
+            window.wait_until_open()
+            booking_pipe.refresh_course_page()
+
+        result = run_course_booking(driver=driver,
+                                    single_course=single_course,
+                                    weekday_abbr=weekday_abbr,
+                                    tasks_cfg=tasks_cfg,
+                                    locator_fillings=locator_fillings,
+                                    on_booking_ready=on_booking_ready,
+                                    logger=logger)
+        result["click_lateness_ms"] = window.lateness_ms(result.get("clicked_at"))
+        return result
+
+    try:
+        driver_pool.start()
+        results = driver_pool.run(tasks=list(zip(active_courses, windows)), task_fn=book_at_open)
+    finally:
+        driver_pool.close()
+
+    for result in results:
+        logger.info("COURSE: %s PERSON: %s booking click landed %s ms after registration opened",
+                    result["course"], result["person"], result["click_lateness_ms"])
+    log_run_summary(results=results, logger=logger)
+    logger.info("Slowest traced spans:\n%s", tracer.summary())
+    logger.info("Retry statistics:\n%s", retry_engine.report())
+    logger.info("Closing process...")
+    sys.exit()
+
+
+if __name__ == "__main__":
+    main_scheduled()
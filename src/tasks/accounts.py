@@ -0,0 +1,69 @@
+import json
+import os
+from datetime import datetime
+
+from logger import get_logger
+
+
+def load_accounts(accounts_cfg: dict) -> list[dict]:
+    """Resolve the credentials of each configured account from its env variables."""
+    accounts = []
+    for account in accounts_cfg.get("accounts") or []:
+        login_name = os.getenv(account["login_name_env"])
+        password = os.getenv(account["password_env"])
+        if not login_name or not password:
+            raise ValueError(f"Missing credentials for account {account['name']}: set {account['login_name_env']} and {account['password_env']}")
+        accounts.append({"name": account["name"],
+                         "login_name": login_name,
+                         "password": password,
+                         "persons": list(account.get("persons") or [])})
+    return accounts
+
+
+def assign_courses(accounts: list[dict], active_courses: list[dict], logger=None) -> tuple[dict, list[dict]]:
+    """Map course rows to accounts by their `person` column.
+
+    Returns the courses per account name plus the rows no account books for.
+    """
+    logger = logger or get_logger("etvcourse.accounts")
+    account_by_person = {}
+    for account in accounts:
+        for person in account["persons"]:
+            if person in account_by_person:
+                raise ValueError(f"Person {person} is assigned to accounts {account_by_person[person]} and {account['name']}")
+            account_by_person[person] = account["name"]
+
+    courses_by_account = {account["name"]: [] for account in accounts}
+    unassigned = []
+    for single_course in active_courses:
+        account_name = account_by_person.get(single_course.get("person"))
+        if account_name is None:
+            logger.warning("No account books for %s, skipping %s", single_course.get("person"), single_course.get("orig_course_name"))
+            unassigned.append(single_course)
+        else:
+            courses_by_account[account_name].append(single_course)
+    return courses_by_account, unassigned
+
+
+def write_report(path: str, weekday_abbr: str, results: list[dict], account_errors: dict) -> dict:
+    """Merge the results of all accounts into one JSON report."""
+    accounts = {}
+    for result in results:
+        if result["account"] is None:
+            continue
+        summary = accounts.setdefault(result["account"], {"n_courses": 0, "n_booked": 0, "error": None})
+        summary["n_courses"] += 1
+        summary["n_booked"] += bool(result["is_booked"])
+    for account_name, error in account_errors.items():
+        accounts.setdefault(account_name, {"n_courses": 0, "n_booked": 0, "error": None})["error"] = error
+
+    report = {"created_at": datetime.now().astimezone().isoformat(),
+              "weekday": weekday_abbr,
+              "n_courses": len(results),
+              "n_booked": sum(bool(result["is_booked"]) for result in results),
+              "accounts": accounts,
+              "results": results}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2, ensure_ascii=False, default=str)
+    return report
@@ -5,76 +5,241 @@ from src.utils.selenium.selenium_actions import (#ClickAction,
                                                  ClickWhenClickable,
                                                  #EnterTextWhenVisible,
                                                  GetHrefWhenVisible)
+from src.utils.selenium.readiness import (PageReadiness,
+                                          AllOf,
+                                          AnyOf,
+                                          ComponentRendered,
+                                          DocumentReady,
+                                          ElementClickable,
+                                          ElementPresent,
+                                          NetworkIdle)
+from src.tasks.request_blocking import log_request_stats
+from src.utils.selenium.dom_probe import DomProbe
+from src.utils.selenium.booking_confirmation import BookingConfirmationWatcher
+from src.utils.selenium.form_staging import BookingFormStager
+from src.utils.selenium.error_exception_handler import current_budget
+from src.utils.tracing import tracer
 from logger import get_logger
 
 class Booking:
-    def __init__(self, driver, booking_locators_filled, click_action=ClickWhenClickable, get_href_action=GetHrefWhenVisible, logger=None):
+    PAGE_STATE_LOCATORS = ("CANCELLED", "BOOKABLE", "BOOK_PERSON", "INVOICE_PERSON", "AGREEGTC", "BOOK")
+
+    def __init__(self, driver, booking_locators_filled, click_action=ClickWhenClickable, get_href_action=GetHrefWhenVisible, readiness=None,
+                 poll_interval_s=0.25, poll_deadline_s=0.0, poll_refresh="reload", confirmation_texts=None, prestage_form=False, logger=None):
         self.driver = driver
         self.booking_locators_filled = booking_locators_filled
+        self.poll_interval_s = poll_interval_s
+        self.poll_deadline_s = poll_deadline_s
+        self.poll_refresh = poll_refresh
         self.click_action = click_action(driver=self.driver)
         self.get_href_action = get_href_action(driver=self.driver)
         self.logger = logger or get_logger("etvcourse.booking")
+        self.readiness = readiness or PageReadiness(driver=self.driver, logger=self.logger)
+
+        self.dom_probe = DomProbe(driver=self.driver)
+        self.confirmation_watcher = BookingConfirmationWatcher(driver=self.driver,
+                                                               texts=confirmation_texts,
+                                                               booked_locator=self.booking_locators_filled.get("IS_BOOKED")) if confirmation_texts else None
+        self.form_stager = None
+        if prestage_form:
+            self.form_stager = BookingFormStager(driver=self.driver,
+                                                 field_locators={name: self.booking_locators_filled[name]
+                                                                 for name in ("BOOK_PERSON", "INVOICE_PERSON", "AGREEGTC")},
+                                                 book_locator=self.booking_locators_filled["BOOK"])
 
         self.ctx = {}
 
+    @tracer.traced("booking.run_booking", kind="flow")
     def run_booking(self):
+        self.prepare_booking()
+        self.complete_booking()
+
+    @tracer.traced("booking.prepare_booking", kind="flow")
+    def prepare_booking(self):
         self.logger.debug("Starting booking flow")
         self.get_course_link(course_day_locator=self.booking_locators_filled["COURSE_DAY"])
         self.go_to_course_page(course_link=self.ctx["step_1/course_link"])
-        time.sleep(10)  # wait for page to load
+        self.wait_for_course_page()
+
+    @tracer.traced("booking.refresh_course_page")
+    def refresh_course_page(self):
+        self.logger.debug("Refreshing course page")
+        self.driver.refresh()
+        self.wait_for_course_page()
+        # the reload dropped the in-page staging
+        if self.form_stager is not None and "step_4/staged_fields" in self.ctx:
+            self.stage_form()
+
+    def wait_for_course_page(self):
+        self.readiness.wait("booking/course_page_loaded",
+                            AllOf(DocumentReady(),
+                                  AnyOf(ElementPresent(self.booking_locators_filled["BOOKABLE"]),
+                                        ElementPresent(self.booking_locators_filled["CANCELLED"]),
+                                        AllOf(ComponentRendered(), NetworkIdle()))),
+                            timeout=10)
+        log_request_stats(driver=self.driver, page="booking/course_page")
+
+    @tracer.traced("booking.complete_booking", kind="flow")
+    def complete_booking(self):
+        self.read_page_state()
         self.check_if_bookable(bookable_locator=self.booking_locators_filled["BOOKABLE"])
+        # a bookable course is staged by the verification right before the click
+        if self.form_stager is not None and not self.ctx["step_3/is_course_bookable"] and not self.ctx["page_state"]["CANCELLED"]["present"]:
+            self.stage_form()
+        if not self.ctx["step_3/is_course_bookable"] and not self.ctx["page_state"]["CANCELLED"]["present"] and self.poll_deadline_s > 0:
+            self.ctx["step_3/is_course_bookable"] = self.poll_until_bookable()
         if self.ctx["step_3/is_course_bookable"]:
-            time.sleep(1)
-            self.book_for_person(person_locator=self.booking_locators_filled["BOOK_PERSON"])
-            time.sleep(1)
-            self.select_invoice_person(invoice_person_locator=self.booking_locators_filled["INVOICE_PERSON"])
-            time.sleep(1)
-            self.checkmark_terms_and_conditions(terms_locator=self.booking_locators_filled["AGREEGTC"])
-            time.sleep(1)        
+            # with a staged form only the fields that did not hold are filled in here
+            staged_fields = self.verify_staged_form()["fields"] if self.form_stager is not None else {}
+            if not staged_fields.get("BOOK_PERSON"):
+                self.readiness.wait("booking/person_selectable",
+                                    ElementPresent(self.booking_locators_filled["BOOK_PERSON"]),
+                                    timeout=1)
+                self.book_for_person(person_locator=self.booking_locators_filled["BOOK_PERSON"])
+            if not staged_fields.get("INVOICE_PERSON"):
+                self.readiness.wait("booking/invoice_person_selectable",
+                                    ElementPresent(self.booking_locators_filled["INVOICE_PERSON"]),
+                                    timeout=1)
+                self.select_invoice_person(invoice_person_locator=self.booking_locators_filled["INVOICE_PERSON"])
+            if not staged_fields.get("AGREEGTC"):
+                self.readiness.wait("booking/terms_clickable",
+                                    ElementClickable(self.booking_locators_filled["AGREEGTC"]),
+                                    timeout=1)
+                self.checkmark_terms_and_conditions(terms_locator=self.booking_locators_filled["AGREEGTC"])
+            if not self.ctx.get("step_4/staged_form", {}).get("ready"):
+                self.readiness.wait("booking/book_clickable",
+                                    ElementClickable(self.booking_locators_filled["BOOK"]),
+                                    timeout=1)
+            if self.confirmation_watcher is not None:
+                self.confirmation_watcher.install(scope_locator=self.booking_locators_filled["BOOK"])
             self.book(book_locator=self.booking_locators_filled["BOOK"])
+            if self.confirmation_watcher is not None:
+                self.wait_for_confirmation()
             self.logger.info("Booking flow complete")
         else:
             self.logger.info("Course is not bookable, skipping booking step")
 
     # step 1
+    @tracer.traced("booking.get_course_link")
     def get_course_link(self, course_day_locator: tuple) -> None:
         self.logger.debug("Getting course link from %s", course_day_locator)
         self.ctx["step_1/course_link"] = self.get_href_action.execute(locator=course_day_locator)
         self.logger.debug("Got course link")
 
     # step 2
+    @tracer.traced("booking.go_to_course_page")
     def go_to_course_page(self, course_link: str) -> None:
         self.logger.debug("Navigating to course page: %s", course_link)
         self.driver.get(course_link) 
         self.logger.debug("Navigation complete to course page")
 
+    @tracer.traced("booking.read_page_state")
+    def read_page_state(self) -> dict:
+        # COURSE_DAY and IS_BOOKED match text anywhere in the document, they are left out
+        self.ctx["page_state"] = self.dom_probe.probe({name: self.booking_locators_filled[name] for name in self.PAGE_STATE_LOCATORS})
+        return self.ctx["page_state"]
+
     # step 3
+    @tracer.traced("booking.check_if_bookable")
     def check_if_bookable(self, bookable_locator: tuple) -> None:
         self.logger.debug("Checking if course is bookable via %s", bookable_locator)
-        bookable_element = self.driver.find_elements(*bookable_locator)
-        self.ctx["step_3/is_course_bookable"] = bookable_element != []
-        self.logger.debug("Course is bookable")
+        page_state = self.ctx.get("page_state") or self.read_page_state()
+        self.ctx["step_3/is_course_bookable"] = page_state["BOOKABLE"]["present"]
+        if page_state["CANCELLED"]["present"]:
+            self.logger.info("Course has been cancelled by the club")
+        self.logger.debug("Course is bookable: %s", self.ctx["step_3/is_course_bookable"])
+
+    # step 3b
+    @tracer.traced("booking.poll_until_bookable", kind="flow")
+    def poll_until_bookable(self) -> bool:
+        """Re-checks bookability every `poll_interval_s` until `poll_deadline_s` has passed.
+
+        `poll_refresh` "reload" reloads the page on every poll, "none" only
+        re-probes the rendered page, for pages that open without a reload.
+        The course page is rendered client-side, so its HTML alone never shows
+        the opening. Only BOOKABLE and CANCELLED are probed per poll.
+        """
+        self.logger.info("Course not bookable yet, polling every %ss for up to %ss (refresh: %s)",
+                         self.poll_interval_s, self.poll_deadline_s, self.poll_refresh)
+        deadline = time.monotonic() + self.poll_deadline_s
+        watched = {name: self.booking_locators_filled[name] for name in ("BOOKABLE", "CANCELLED")}
+        n_polls = 0
+        is_bookable = False
+        while time.monotonic() < deadline:
+            poll_started = time.monotonic()
+            n_polls += 1
+            if self.poll_refresh == "reload":
+                self.refresh_course_page()
+
+            page_state = self.dom_probe.probe(watched)
+            self.ctx["page_state"].update(page_state)
+            if page_state["BOOKABLE"]["present"]:
+                is_bookable = True
+                break
+            if page_state["CANCELLED"]["present"]:
+                self.logger.info("Course has been cancelled by the club")
+                break
+            time.sleep(max(0.0, self.poll_interval_s - (time.monotonic() - poll_started)))
+
+        self.ctx["step_3/n_polls"] = n_polls
+        self.logger.info("Polled %s times, course is bookable: %s", n_polls, is_bookable)
+        # polling is waiting, not retrying, so the booking steps get the full retry budget
+        budget = current_budget()
+        if is_bookable and budget is not None:
+            budget.restart()
+        return is_bookable
+
+    # step 4a
+    @tracer.traced("booking.stage_form")
+    def stage_form(self) -> dict:
+        """Install the in-page staging that fills steps 4-6 whenever the form renders."""
+        self.ctx["step_4/staged_fields"] = self.form_stager.install()
+        self.logger.debug("Staged booking form fields: %s", self.ctx["step_4/staged_fields"])
+        return self.ctx["step_4/staged_fields"]
+
+    # step 4b
+    @tracer.traced("booking.verify_staged_form")
+    def verify_staged_form(self) -> dict:
+        self.ctx["step_4/staged_form"] = self.form_stager.verify()
+        self.logger.info("Staged booking form ready: %s (fields: %s, book enabled: %s, staging passes: %s)",
+                         self.ctx["step_4/staged_form"]["ready"], self.ctx["step_4/staged_form"]["fields"],
+                         self.ctx["step_4/staged_form"]["book_enabled"], self.ctx["step_4/staged_form"]["passes"])
+        return self.ctx["step_4/staged_form"]
 
     # step 4
+    @tracer.traced("booking.book_for_person")
     def book_for_person(self, person_locator: tuple) -> None:
         self.logger.debug("Booking course for person via %s", person_locator)
         self.click_action.execute(locator=person_locator)
         self.logger.debug("Booked course for person")
 
     # step 5
+    @tracer.traced("booking.select_invoice_person")
     def select_invoice_person(self, invoice_person_locator: tuple) -> None:
         self.logger.debug("Selecting invoice person via %s", invoice_person_locator)
         self.click_action.execute(locator=invoice_person_locator)
         self.logger.debug("Selected invoice person")
 
     # step 6
+    @tracer.traced("booking.checkmark_terms_and_conditions")
     def checkmark_terms_and_conditions(self, terms_locator: tuple) -> None:
         self.logger.debug("Agreeing to terms via %s", terms_locator)
         self.click_action.execute(locator=terms_locator)
         self.logger.debug("Agreed to terms")
 
     # step 7
+    @tracer.traced("booking.book")
     def book(self, book_locator: tuple) -> None:
         self.logger.debug("Clicking book button %s", book_locator)
+        self.ctx["step_7/clicked_at"] = time.monotonic()
         self.click_action.execute(locator=book_locator)
         self.logger.debug("Clicked book button")
+
+    # step 8
+    @tracer.traced("booking.wait_for_confirmation")
+    def wait_for_confirmation(self, timeout_s: float = 2) -> dict:
+        self.logger.debug("Waiting for booking confirmation")
+        self.ctx["step_8/confirmation"] = self.confirmation_watcher.wait(timeout_s=timeout_s)
+        self.logger.info("Booking confirmation: %s via %s (%s)", self.ctx["step_8/confirmation"]["status"],
+                         self.ctx["step_8/confirmation"]["source"], self.ctx["step_8/confirmation"]["detail"])
+        return self.ctx["step_8/confirmation"]
@@ -0,0 +1,81 @@
+import statistics
+import time
+from datetime import datetime, time as dt_time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+from logger import get_logger
+
+
+def parse_opens_at(value, default_date=None) -> datetime:
+    """Accept a datetime or an 'HH:MM[:SS]' string (local time on `default_date`, today by default)."""
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.astimezone()
+    opens_time = dt_time.fromisoformat(str(value))
+    opens_date = default_date or datetime.now().date()
+    return datetime.combine(opens_date, opens_time).astimezone()
+
+
+def measure_clock_skew(url: str, samples: int = 3, timeout: float = 5, logger=None) -> float:
+    """Estimate server minus local clock in seconds from the `Date` header.
+
+    The header has one-second resolution, so each sample assumes the server
+    stamped the middle of its second; the median over samples is returned.
+    """
+    logger = logger or get_logger("etvcourse.booking_window")
+    skews = []
+    for _ in range(samples):
+        sent = time.time()
+        response = requests.head(url, timeout=timeout, allow_redirects=False)
+        received = time.time()
+        server_date = response.headers.get("Date")
+        if not server_date:
+            continue
+        server_time = parsedate_to_datetime(server_date).timestamp() + 0.5
+        skews.append(server_time - (sent + received) / 2)
+    if not skews:
+        logger.warning("No Date header from %s, assuming no clock skew", url)
+        return 0.0
+    skew = statistics.median(skews)
+    logger.info("Measured clock skew against server: %+.3fs over %s samples", skew, len(skews))
+    return skew
+
+
+class BookingWindow:
+    """Registration-open instant `opens_at` (server time) anchored on the monotonic clock."""
+
+    def __init__(self, opens_at: datetime, clock_skew_s: float = 0.0, spin_s: float = 0.02, logger=None):
+        self.opens_at = opens_at
+        self.clock_skew_s = clock_skew_s
+        self.spin_s = spin_s
+        self.logger = logger or get_logger("etvcourse.booking_window")
+
+        server_now = time.time() + clock_skew_s
+        self.open_monotonic = time.monotonic() + (opens_at.timestamp() - server_now)
+
+    def seconds_until_open(self) -> float:
+        return self.open_monotonic - time.monotonic()
+
+    def sleep_until(self, seconds_before_open: float = 0.0) -> None:
+        # sleep coarsely, then spin the last few milliseconds for precision
+        target = self.open_monotonic - seconds_before_open
+        while True:
+            remaining = target - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining - self.spin_s if remaining > self.spin_s else 0)
+
+    def wait_until_open(self) -> float:
+        remaining = self.seconds_until_open()
+        if remaining > 0:
+            self.logger.info("Waiting %.3fs for registration to open at %s", remaining, self.opens_at.isoformat())
+        self.sleep_until()
+        lateness = time.monotonic() - self.open_monotonic
+        self.logger.debug("Released %.1fms after registration opened", lateness * 1000)
+        return lateness
+
+    def lateness_ms(self, moment_monotonic: float | None) -> float | None:
+        if moment_monotonic is None:
+            return None
+        return round((moment_monotonic - self.open_monotonic) * 1000, 1)
@@ -0,0 +1,294 @@
+import time
+from datetime import datetime
+
+from selenium.common.exceptions import WebDriverException
+
+from src.utils.locators.locator_help_fns import fill_and_resolve_locators, build_filter_url, fill_texts
+from src.utils.locators.locator_templates import (LoginPageLocators,
+                                                  FilterPageLocators,
+                                                  BookingLocators)
+from src.tasks.login import Login
+from src.tasks.filter import Filter
+from src.tasks.booking import Booking
+from src.tasks.pipeline import Step, StepPipeline, CourseCheckpoint
+from src.tasks.driver_initialization import record_first_navigation
+from src.tasks.memory_telemetry import log_driver_memory
+from src.utils.selenium.readiness import PageReadiness, AnyOf, ElementPresent, ElementClickable
+from src.utils.selenium.error_exception_handler import RetryBudget
+from src.utils.tracing import tracer
+from logger import get_logger
+
+
+_UNSAMPLED_STEPS = ("course_page",)
+
+
+def step_hooks(driver, placeholders: dict | None = None, logger=None):
+    """`after_step` hook logging the driver's RSS and recording a page snapshot, each only if enabled on the driver.
+
+    Returns None when neither is enabled; otherwise the hook returns the merged span attributes.
+    """
+    hooks = []
+    if getattr(driver, "rss_telemetry", False):
+        # course_page is followed by the bookability check and the click, the booking step samples instead
+        hooks.append(lambda step: None if step in _UNSAMPLED_STEPS else log_driver_memory(driver=driver, step=step, logger=logger))
+    snapshot_recorder = getattr(driver, "snapshot_recorder", None)
+    if snapshot_recorder is not None:
+        hooks.append(lambda step: snapshot_recorder.record(driver=driver, step=step, placeholders=placeholders))
+    if not hooks:
+        return None
+
+    def after_step(step: str) -> dict:
+        attributes = {}
+        for hook in hooks:
+            attributes.update(hook(step) or {})
+        return attributes
+    return after_step
+
+
+@tracer.traced("login", kind="flow")
+def run_login(driver, tasks_cfg: dict, locator_fillings: dict, readiness=None, logger=None) -> None:
+    logger = logger or get_logger("etvcourse.course_booking")
+    login_locators_filled = fill_and_resolve_locators(template_class=LoginPageLocators,
+                                                      base_placeholders=locator_fillings['LoginPageLocators'],
+                                                      extra_fields={"PERSON_NAME": tasks_cfg["login_name"]},)
+
+    login_pipe = Login(driver=driver,
+                       login_url=tasks_cfg["login_url"],
+                       login_name=tasks_cfg["login_name"],
+                       password=tasks_cfg["password"],
+                       locators_filled=login_locators_filled,
+                       readiness=readiness,
+                       after_step=step_hooks(driver, placeholders={"PERSON_NAME": tasks_cfg["login_name"]}, logger=logger),
+                       logger=logger)
+    login_pipe.run_login()
+
+
+def is_session_valid(driver, tasks_cfg: dict, locator_fillings: dict, readiness=None) -> bool:
+    """Open the course overview once and check it shows the filter instead of the login form."""
+    readiness = readiness or PageReadiness(driver=driver)
+    username_locator = LoginPageLocators._resolve(locator=LoginPageLocators.USERNAME,
+                                                  **locator_fillings['LoginPageLocators'])
+    filter_locator = FilterPageLocators._resolve(locator=FilterPageLocators.FILTER,
+                                                 **locator_fillings['FilterPageLocators'])
+    driver.get(tasks_cfg["course_overview_url"])
+    readiness.wait("session/validated",
+                   AnyOf(ElementPresent(username_locator), ElementClickable(filter_locator)),
+                   timeout=10)
+    return driver.find_elements(*username_locator) == [] and driver.find_elements(*filter_locator) != []
+
+
+def ensure_login(driver, tasks_cfg: dict, locator_fillings: dict, session_store=None, readiness=None, logger=None) -> None:
+    """Restore a cached session if it is still valid, otherwise run the full login and cache it."""
+    logger = logger or get_logger("etvcourse.course_booking")
+    after_login = step_hooks(driver, placeholders={"PERSON_NAME": tasks_cfg["login_name"]}, logger=logger)
+    if session_store is not None:
+        start = time.monotonic()
+        try:
+            payload = session_store.restore(driver)
+            if payload is not None:
+                record_first_navigation(driver, logger=logger)
+            is_restored = payload is not None and is_session_valid(driver, tasks_cfg, locator_fillings, readiness)
+        except WebDriverException as err:
+            # e.g. a cookie of another domain or a failing local storage script
+            logger.warning("Could not restore cached session, clearing it: %s", err)
+            session_store.clear()
+            try:
+                driver.delete_all_cookies()
+            except WebDriverException:
+                pass
+            payload, is_restored = None, False
+        if is_restored:
+            restore_duration = time.monotonic() - start
+            logger.info("Restored cached session in %.2fs, saved %.2fs compared to full login",
+                        restore_duration, payload["login_duration_s"] - restore_duration)
+            if after_login is not None:
+                after_login("login")
+            return
+        logger.info("No valid cached session, running full login")
+
+    start = time.monotonic()
+    run_login(driver=driver,
+              tasks_cfg=tasks_cfg,
+              locator_fillings=locator_fillings,
+              readiness=readiness,
+              logger=logger)
+    login_duration = time.monotonic() - start
+    if "first_navigation" not in getattr(driver, "startup_timings", {}):
+        record_first_navigation(driver, logger=logger)
+    logger.info("Full login took %.2fs", login_duration)
+    if after_login is not None:
+        after_login("login")
+
+    if session_store is not None:
+        try:
+            session_store.save(driver, login_duration_s=login_duration)
+        except Exception as err:
+            logger.warning("Could not cache session: %s", err)
+
+
+def run_course_booking(driver, single_course: dict, weekday_abbr: str, tasks_cfg: dict, locator_fillings: dict,
+                       readiness=None, on_booking_ready=None, checkpoint=None, logger=None) -> dict:
+    """Filter and book a single course on `driver`, returning a result record for the run summary.
+
+    `on_booking_ready(booking_pipe)` is called once the course page is loaded and
+    before the booking steps run, e.g. to hold the final steps until registration opens.
+    Retries resume from `checkpoint`, a fresh one per call unless given.
+    """
+    logger = logger or get_logger("etvcourse.course_booking")
+    start = time.monotonic()
+    result = {"course": single_course.get("orig_course_name"),
+              "person": single_course.get("person"),
+              "weekday": weekday_abbr,
+              "is_booked": False,
+              "error": None}
+
+    now = datetime.now().astimezone()
+    logger.info("Starting booking flow for\nCOURSE: %s\nWEEKDAY: %s\nPERSON: %s\nSYSTEM TIME: %s",
+                single_course['orig_course_name'], weekday_abbr, single_course['person'], now.strftime('%Y-%m-%d %H:%M:%S (%A) %Z %z'))
+
+    # filter
+    filter_locators_filled = fill_and_resolve_locators(template_class=FilterPageLocators,
+                                                       base_placeholders=locator_fillings['FilterPageLocators'],
+                                                       extra_fields={"DAY_GER_ABB": single_course.get("weekday_ger_abb")},)
+
+    confirmation_texts = None
+    if locator_fillings.get("BookingConfirmation"):
+        confirmation_texts = fill_texts(templates=locator_fillings["BookingConfirmation"],
+                                        placeholders={"PERSON_NAME": single_course.get("person")})
+
+    # the deep link is tried first, the click-driven filter stays as fallback
+    filter_url = None
+    if tasks_cfg.get("use_filter_deep_link") and locator_fillings.get("FilterDeepLink"):
+        filter_url = build_filter_url(base_url=tasks_cfg["course_overview_url"],
+                                      query_template=locator_fillings["FilterDeepLink"],
+                                      placeholders={**locator_fillings["FilterPageLocators"],
+                                                    "DAY_GER_ABB": single_course.get("weekday_ger_abb")})
+
+    booking_locators_filled = fill_and_resolve_locators(template_class=BookingLocators,
+                                                        base_placeholders=locator_fillings['BookingLocators'],
+                                                        extra_fields={"COURSE_NAME": single_course.get("orig_course_name"),
+                                                                      "PERSON_NAME": single_course.get("person")},)
+    checkpoint = checkpoint or CourseCheckpoint(key=f"{result['course']}/{result['person']}")
+
+    budget = RetryBudget(seconds=tasks_cfg.get("booking_budget_s", 120))
+    with tracer.span("course", kind="flow", course=result["course"], person=result["person"]), budget:
+        for attempt in range(tasks_cfg["n_filter_tries"] + (1 if filter_url else 0)):
+            if budget.is_exhausted:
+                logger.warning("Retry budget of %ss exhausted before attempt %s", budget.seconds, attempt + 1)
+                result["error"] = result["error"] or "retry budget exhausted"
+                break
+
+            filter_pipe = Filter(driver=driver,
+                                 course_overview_url=tasks_cfg["course_overview_url"],
+                                 filter_locators_filled=filter_locators_filled,
+                                 readiness=readiness,
+                                 logger=logger)
+            booking_pipe = Booking(driver=driver,
+                                   booking_locators_filled=booking_locators_filled,
+                                   readiness=readiness,
+                                   poll_interval_s=tasks_cfg.get("bookable_poll_interval_s", 0.25),
+                                   poll_deadline_s=tasks_cfg.get("bookable_poll_deadline_s", 0.0),
+                                   poll_refresh=tasks_cfg.get("bookable_poll_refresh", "reload"),
+                                   confirmation_texts=confirmation_texts,
+                                   prestage_form=tasks_cfg.get("prestage_booking_form", False),
+                                   logger=logger)
+
+            def apply_filter(use_deep_link=bool(filter_url and attempt == 0)):
+                if use_deep_link:
+                    filter_pipe.run_deep_link_filter(filter_url=filter_url)
+                else:
+                    filter_pipe.run_filter()
+                if filter_pipe.ctx["applied_filter_number"] != tasks_cfg["n_correct_filter"]:
+                    raise ValueError(f"Incorrect number of filters applied: {filter_pipe.ctx['applied_filter_number']}")
+                logger.debug("Correct numbers of filter applied")
+                return {"overview_page": True}
+
+            def find_course_link(overview_page):
+                booking_pipe.get_course_link(course_day_locator=booking_locators_filled["COURSE_DAY"])
+                return {"course_link": booking_pipe.ctx["step_1/course_link"]}
+
+            def open_course_page(course_link):
+                booking_pipe.ctx["step_1/course_link"] = course_link
+                booking_pipe.go_to_course_page(course_link=course_link)
+                booking_pipe.wait_for_course_page()
+                return {"course_page": True}
+
+            def book(course_page):
+                if on_booking_ready is not None:
+                    on_booking_ready(booking_pipe)
+                    # waiting for the booking window is not part of the retry budget
+                    budget.restart()
+                booking_pipe.complete_booking()
+                return {"clicked_at": booking_pipe.ctx.get("step_7/clicked_at")}
+
+            # only the course link survives a failed attempt, the other outputs are page state
+            pipeline = StepPipeline(steps=[Step("filter", apply_filter, outputs=("overview_page",), checkpointed=False),
+                                           Step("course_link", find_course_link, inputs=("overview_page",), outputs=("course_link",)),
+                                           Step("course_page", open_course_page, inputs=("course_link",), outputs=("course_page",), checkpointed=False),
+                                           Step("booking", book, inputs=("course_page",), outputs=("clicked_at",), checkpointed=False)],
+                                    checkpoint=checkpoint,
+                                    after_step=step_hooks(driver,
+                                                          placeholders={"DAY_GER_ABB": single_course.get("weekday_ger_abb"),
+                                                                        "COURSE_NAME": single_course.get("orig_course_name"),
+                                                                        "PERSON_NAME": single_course.get("person")},
+                                                          logger=logger),
+                                    logger=logger)
+            try:
+                result["clicked_at"] = pipeline.run()["clicked_at"]
+                break
+
+            except Exception as err:
+                logger.error("Error in filter/ booking process: %s", err)
+                result["error"] = str(err)
+
+            finally:
+
+                outcome = read_booking_outcome(driver=driver, booking_pipe=booking_pipe, person_name=single_course.get("person"))
+                result["booking_status"] = outcome["status"]
+                result["is_booked"] = outcome["status"] == "booked"
+
+                if result["is_booked"]:
+                    logger.info("COURSE: %s\nWEEKDAY: %s\nPERSON: %s\nIS BOOKED: True",
+                                single_course['orig_course_name'], weekday_abbr, single_course['person'])
+                    break
+                else:
+                    logger.warning("COURSE: %s\nPERSON: %s\nIS BOOKED: False",
+                                   single_course['orig_course_name'], single_course['person'])
+
+    result["duration_s"] = round(time.monotonic() - start, 2)
+    return result
+
+
+def read_booking_outcome(driver, booking_pipe, person_name: str) -> dict:
+    """Outcome of a booking attempt without scanning the whole page on every probe.
+
+    Uses the confirmation watcher's result after the booking click. The
+    full-document IS_BOOKED locator is evaluated once, only when a click got
+    no recognisable answer or when a reached course page showed no booking form.
+    """
+    if booking_pipe is None:
+        return {"status": "not_attempted", "source": None, "http_status": None, "detail": None}
+    if booking_pipe.ctx.get("step_7/clicked_at") is None:
+        page_state = booking_pipe.ctx.get("page_state")
+        # an already booked course shows no booking form
+        if page_state is None or page_state["BOOKABLE"]["present"] or page_state["CANCELLED"]["present"]:
+            return {"status": "not_attempted", "source": "page_state", "http_status": None, "detail": None}
+        is_booked = driver.find_elements(*BookingLocators._resolve(locator=BookingLocators.IS_BOOKED, PERSON_NAME=person_name)) != []
+        return {"status": "booked" if is_booked else "not_attempted", "source": "dom_scan", "http_status": None, "detail": None}
+
+    confirmation = booking_pipe.ctx.get("step_8/confirmation")
+    if confirmation is not None and confirmation["status"] != "unknown":
+        return confirmation
+    is_booked_xpath = BookingLocators._resolve(locator=BookingLocators.IS_BOOKED, PERSON_NAME=person_name)
+    is_booked = driver.find_elements(*is_booked_xpath) != []
+    return {"status": "booked" if is_booked else "unknown", "source": "dom_scan", "http_status": None,
+            "detail": confirmation["detail"] if confirmation else None}
+
+
+def log_run_summary(results: list[dict], logger=None) -> None:
+    logger = logger or get_logger("etvcourse.course_booking")
+    lines = [f"{'COURSE':<40} {'PERSON':<25} {'BOOKED':<7} {'SECONDS':>8}"]
+    for result in results:
+        lines.append(f"{str(result['course']):<40} {str(result['person']):<25} {str(result['is_booked']):<7} {result['duration_s']:>8.2f}")
+    logger.info("Run summary (%s/%s booked):\n%s",
+                sum(result["is_booked"] for result in results), len(results), "\n".join(lines))
@@ -0,0 +1,88 @@
+import difflib
+
+from src.utils.locators.locator_help_fns import fill_and_resolve_locators, build_filter_url
+from src.utils.locators.locator_templates import FilterPageLocators
+from src.tasks.filter import Filter
+from src.tasks.pipeline import CourseCheckpoint
+from src.utils.tracing import tracer
+from logger import get_logger
+
+# textContent like normalize-space(.) in COURSE_DAY; innerText drops hidden text and forces a layout
+_ANCHOR_SCRIPT = """
+return Array.from(document.querySelectorAll('a[href]'),
+                  (anchor) => [anchor.textContent.replace(/\\s+/g, ' ').trim(), anchor.href]);
+"""
+
+
+class CourseLinkIndex:
+    """Course name to href of every anchor on a filtered overview page, read in one round trip.
+
+    `lookup` matches like the COURSE_DAY locator: the first anchor whose
+    normalized text contains the course name.
+    """
+
+    def __init__(self, anchors: list):
+        self.anchors = [(" ".join(text.split()), href) for text, href in anchors if text]
+
+    @classmethod
+    def scrape(cls, driver) -> "CourseLinkIndex":
+        return cls(anchors=driver.execute_script(_ANCHOR_SCRIPT))
+
+    def lookup(self, course_name: str) -> str | None:
+        course_name = " ".join(course_name.split())
+        return next((href for text, href in self.anchors if course_name in text), None)
+
+    def closest(self, course_name: str, n: int = 3) -> list[str]:
+        return difflib.get_close_matches(course_name, [text for text, _ in self.anchors], n=n, cutoff=0.5)
+
+
+@tracer.traced("course_index.build", kind="flow")
+def build_course_link_indexes(driver, active_courses: list[dict], tasks_cfg: dict, locator_fillings: dict,
+                              readiness=None, logger=None) -> dict:
+    """Filter the overview once per weekday of the run and index its course links."""
+    logger = logger or get_logger("etvcourse.course_index")
+    indexes = {}
+    for weekday_ger_abb in dict.fromkeys(single_course.get("weekday_ger_abb") for single_course in active_courses):
+        filter_pipe = Filter(driver=driver,
+                             course_overview_url=tasks_cfg["course_overview_url"],
+                             filter_locators_filled=fill_and_resolve_locators(template_class=FilterPageLocators,
+                                                                              base_placeholders=locator_fillings['FilterPageLocators'],
+                                                                              extra_fields={"DAY_GER_ABB": weekday_ger_abb},),
+                             readiness=readiness,
+                             logger=logger)
+        try:
+            if tasks_cfg.get("use_filter_deep_link") and locator_fillings.get("FilterDeepLink"):
+                filter_pipe.run_deep_link_filter(filter_url=build_filter_url(base_url=tasks_cfg["course_overview_url"],
+                                                                             query_template=locator_fillings["FilterDeepLink"],
+                                                                             placeholders={**locator_fillings["FilterPageLocators"],
+                                                                                           "DAY_GER_ABB": weekday_ger_abb}))
+            else:
+                filter_pipe.run_filter()
+        except Exception as err:
+            logger.warning("Could not index the overview for %s, courses use the per-course filter: %s", weekday_ger_abb, err)
+            continue
+        if filter_pipe.ctx["applied_filter_number"] != tasks_cfg["n_correct_filter"]:
+            logger.warning("Incorrect number of filters applied while indexing %s: %s", weekday_ger_abb, filter_pipe.ctx["applied_filter_number"])
+            continue
+        indexes[weekday_ger_abb] = CourseLinkIndex.scrape(driver)
+        logger.info("Indexed %s course links for %s", len(indexes[weekday_ger_abb].anchors), weekday_ger_abb)
+    return indexes
+
+
+def seed_checkpoints(indexes: dict, active_courses: list[dict], logger=None) -> list[CourseCheckpoint]:
+    """A checkpoint per course holding its indexed link; misses are reported with the closest names on the page."""
+    logger = logger or get_logger("etvcourse.course_index")
+    checkpoints = []
+    for single_course in active_courses:
+        checkpoint = CourseCheckpoint(key=f"{single_course.get('orig_course_name')}/{single_course.get('person')}")
+        index = indexes.get(single_course.get("weekday_ger_abb"))
+        if index is not None:
+            course_link = index.lookup(single_course.get("orig_course_name"))
+            if course_link is None:
+                logger.warning("Course %s not found on the %s overview, closest names: %s",
+                               single_course.get("orig_course_name"), single_course.get("weekday_ger_abb"),
+                               index.closest(single_course.get("orig_course_name")) or "none")
+            else:
+                checkpoint.outputs["course_link"] = course_link
+        checkpoints.append(checkpoint)
+    return checkpoints
@@ -0,0 +1,159 @@
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from datetime import date, datetime, time as dt_time
+
+from logger import get_logger
+
+REQUIRED_COLUMNS = ("orig_course_name", "person", "weekday", "weekday_ger_abb", "is_registration_active")
+OPTIONAL_COLUMNS = ("registration_opens_at",)
+
+
+class CoursePlanLoader:
+    """Loads the active courses of a weekday with the predicate pushed down into SQL.
+
+    Only the columns the booking flow reads are selected. The rows of each
+    weekday are kept in a local SQLite snapshot: when the course table has an
+    `updated_at_column`, later runs only fetch rows changed since the last
+    refresh, of any weekday so a course moved away leaves the snapshot, and a
+    full refresh of the weekday happens every `full_refresh_hours`. When the
+    database is slow or unreachable the plan is served from the snapshot.
+    """
+
+    def __init__(self, db_url: str, table_name: str, snapshot_path: str, id_column: str = "id",
+                 updated_at_column: str = "updated_at", full_refresh_hours: float = 24, connect_timeout_s: int = 5,
+                 logger=None):
+        self.db_url = db_url
+        self.table_name = table_name
+        self.snapshot_path = snapshot_path
+        self.id_column = id_column
+        self.updated_at_column = updated_at_column
+        self.full_refresh_hours = full_refresh_hours
+        self.connect_timeout_s = connect_timeout_s
+        self.logger = logger or get_logger("etvcourse.course_plan")
+
+    def load(self, weekday_abbr: str, max_age_s: float = 0) -> list[dict]:
+        """Refresh and read the plan; a snapshot younger than `max_age_s` is read without touching the database."""
+        start = time.monotonic()
+        meta = self._meta(weekday_abbr) if max_age_s > 0 and os.path.exists(self.snapshot_path) else None
+        if meta is not None and time.time() - meta["refreshed_at"] < max_age_s:
+            self.logger.info("Using course plan snapshot refreshed %.0fs ago", time.time() - meta["refreshed_at"])
+            return self.read_snapshot(weekday_abbr=weekday_abbr)
+        try:
+            n_rows = self.refresh(weekday_abbr=weekday_abbr)
+            self.logger.info("Refreshed course plan snapshot for %s with %s rows in %.3fs",
+                             weekday_abbr, n_rows, time.monotonic() - start)
+        except Exception as err:
+            if not self.has_snapshot(weekday_abbr):
+                raise
+            self.logger.warning("Course database unavailable, using snapshot from %s: %s",
+                                time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self._meta(weekday_abbr)["refreshed_at"])), err)
+        return self.read_snapshot(weekday_abbr=weekday_abbr)
+
+    def refresh(self, weekday_abbr: str) -> int:
+        from sqlalchemy import MetaData, Table, create_engine, select
+
+        connect_args = {"connect_timeout": self.connect_timeout_s} if self.db_url.startswith("postgresql") else {}
+        engine = create_engine(self.db_url, connect_args=connect_args)
+        try:
+            table = Table(self.table_name, MetaData(), autoload_with=engine)
+            missing = [column for column in REQUIRED_COLUMNS if column not in table.c]
+            if missing:
+                raise ValueError(f"Course table {self.table_name} lacks columns {missing}")
+            columns = [column for column in (self.id_column,) + REQUIRED_COLUMNS + OPTIONAL_COLUMNS if column in table.c]
+
+            meta = self._meta(weekday_abbr)
+            # without a watermark, e.g. after a full refresh that found no rows, only a full refresh is possible
+            is_incremental = (self.id_column in table.c
+                              and self.updated_at_column in table.c
+                              and meta is not None
+                              and meta["watermark"] is not None
+                              and time.time() - meta["full_refreshed_at"] < self.full_refresh_hours * 3600)
+
+            query = select(*(table.c[column] for column in columns))
+            if is_incremental:
+                # inactive rows and rows of other weekdays are fetched too, so a deactivated
+                # or moved course leaves the snapshot
+                query = query.where(table.c[self.updated_at_column] > _from_iso(meta["watermark"], table.c[self.updated_at_column]))
+            else:
+                query = query.where(table.c["weekday"] == weekday_abbr, table.c["is_registration_active"].is_(True))
+            if self.updated_at_column in table.c:
+                query = query.add_columns(table.c[self.updated_at_column].label("_updated_at"))
+
+            with engine.connect() as connection:
+                rows = [dict(row._mapping) for row in connection.execute(query)]
+        finally:
+            engine.dispose()
+
+        watermark = max((_to_iso(row.pop("_updated_at")) for row in rows if row.get("_updated_at") is not None),
+                        default=meta["watermark"] if is_incremental else None)
+        self._write_snapshot(weekday_abbr=weekday_abbr, rows=rows, is_incremental=is_incremental, watermark=watermark,
+                             full_refreshed_at=meta["full_refreshed_at"] if is_incremental else time.time())
+        return len(rows)
+
+    def has_snapshot(self, weekday_abbr: str) -> bool:
+        return os.path.exists(self.snapshot_path) and self._meta(weekday_abbr) is not None
+
+    def read_snapshot(self, weekday_abbr: str) -> list[dict]:
+        with closing(self._connect()) as connection:
+            records = connection.execute("SELECT record FROM course_plan WHERE weekday = ? AND is_active = 1 ORDER BY row_key",
+                                         (weekday_abbr,)).fetchall()
+        return [_decode_record(json.loads(record)) for record, in records]
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+        connection = sqlite3.connect(self.snapshot_path)
+        connection.execute("CREATE TABLE IF NOT EXISTS course_plan (weekday TEXT, row_key TEXT, is_active INTEGER, record TEXT, PRIMARY KEY (weekday, row_key))")
+        connection.execute("CREATE TABLE IF NOT EXISTS snapshot_meta (weekday TEXT PRIMARY KEY, watermark TEXT, full_refreshed_at REAL, refreshed_at REAL)")
+        connection.commit()
+        return connection
+
+    def _meta(self, weekday_abbr: str) -> dict | None:
+        with closing(self._connect()) as connection:
+            row = connection.execute("SELECT watermark, full_refreshed_at, refreshed_at FROM snapshot_meta WHERE weekday = ?",
+                                     (weekday_abbr,)).fetchone()
+        return None if row is None else {"watermark": row[0], "full_refreshed_at": row[1], "refreshed_at": row[2]}
+
+    def _write_snapshot(self, weekday_abbr: str, rows: list[dict], is_incremental: bool, watermark: str | None,
+                        full_refreshed_at: float) -> None:
+        with closing(self._connect()) as connection, connection:
+            if not is_incremental:
+                connection.execute("DELETE FROM course_plan WHERE weekday = ?", (weekday_abbr,))
+            for index, row in enumerate(rows):
+                row_key = str(row[self.id_column]) if self.id_column in row else str(index)
+                if row["weekday"] != weekday_abbr:
+                    connection.execute("DELETE FROM course_plan WHERE weekday = ? AND row_key = ?", (weekday_abbr, row_key))
+                    continue
+                record = {column: _to_iso(row[column]) for column in REQUIRED_COLUMNS + OPTIONAL_COLUMNS if column in row}
+                record["is_registration_active"] = bool(record["is_registration_active"])
+                connection.execute("INSERT OR REPLACE INTO course_plan VALUES (?, ?, ?, ?)",
+                                   (weekday_abbr, row_key, int(record["is_registration_active"]), json.dumps(record)))
+            connection.execute("INSERT OR REPLACE INTO snapshot_meta VALUES (?, ?, ?, ?)",
+                               (weekday_abbr, watermark, full_refreshed_at, time.time()))
+
+
+def _to_iso(value):
+    return value.isoformat() if isinstance(value, (datetime, date, dt_time)) else value
+
+
+def _from_iso(value: str, column):
+    """The watermark in the type of `column`, so the comparison also works where strings do not cast."""
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return value
+
+
+def _decode_record(record: dict) -> dict:
+    # timestamps are stored as ISO strings, a time of day stays the "HH:MM:SS" string parse_opens_at reads
+    opens_at = record.get("registration_opens_at")
+    if isinstance(opens_at, str) and "-" in opens_at:
+        record["registration_opens_at"] = datetime.fromisoformat(opens_at)
+    return record
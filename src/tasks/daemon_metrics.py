@@ -0,0 +1,130 @@
+import bisect
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from logger import get_logger
+
+
+class LatencyHistogram:
+    """Cumulative histogram with fixed upper bounds, rendered in the Prometheus text format."""
+
+    def __init__(self, buckets: tuple):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+    def render(self, name: str) -> list[str]:
+        lines, cumulative = [f"# TYPE {name} histogram"], 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{le="{"+Inf" if bound == float("inf") else bound}"}} {cumulative}')
+        lines.append(f"{name}_sum {self.total:.3f}")
+        lines.append(f"{name}_count {cumulative}")
+        return lines
+
+
+class DaemonMetrics:
+    """Counters, latency histograms and health state of the daemon, shared with the http endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.counters = {"etvcourse_booking_runs_total": 0,
+                         "etvcourse_plan_refreshes_total": 0,
+                         "etvcourse_plan_refresh_errors_total": 0,
+                         "etvcourse_driver_restarts_total": 0}
+        self.bookings = {}
+        self.histograms = {"etvcourse_booking_duration_seconds": LatencyHistogram(buckets=(5, 10, 20, 30, 60, 120, 300)),
+                           "etvcourse_click_lateness_seconds": LatencyHistogram(buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5))}
+        self.state = {"driver_alive": False, "last_plan_refresh": None, "next_window": None, "active_courses": 0}
+
+    def increment(self, counter: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[counter] += value
+
+    def set_state(self, **state) -> None:
+        with self._lock:
+            self.state.update(state)
+
+    def observe_booking(self, result: dict) -> None:
+        status = result.get("booking_status") or ("booked" if result.get("is_booked") else "failed")
+        with self._lock:
+            self.bookings[status] = self.bookings.get(status, 0) + 1
+            if result.get("duration_s") is not None:
+                self.histograms["etvcourse_booking_duration_seconds"].observe(result["duration_s"])
+            if result.get("click_lateness_ms") is not None:
+                self.histograms["etvcourse_click_lateness_seconds"].observe(result["click_lateness_ms"] / 1000)
+
+    def health(self) -> dict:
+        with self._lock:
+            return {"status": "ok" if self.state["driver_alive"] else "degraded",
+                    "uptime_s": round(time.monotonic() - self.started, 1),
+                    **self.state}
+
+    def render(self) -> str:
+        with self._lock:
+            lines = []
+            for name, value in self.counters.items():
+                lines += [f"# TYPE {name} counter", f"{name} {value}"]
+            lines.append("# TYPE etvcourse_bookings_total counter")
+            lines += [f'etvcourse_bookings_total{{status="{status}"}} {count}' for status, count in sorted(self.bookings.items())]
+            for name, histogram in self.histograms.items():
+                lines += histogram.render(name)
+            lines += ["# TYPE etvcourse_driver_alive gauge", f"etvcourse_driver_alive {int(self.state['driver_alive'])}"]
+        return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        metrics = self.server.metrics
+        if self.path == "/health":
+            health = metrics.health()
+            self._send(200 if health["status"] == "ok" else 503, "application/json", json.dumps(health, default=str))
+        elif self.path == "/metrics":
+            self._send(200, "text/plain; version=0.0.4", metrics.render())
+        else:
+            self._send(404, "text/plain", "not found\n")
+
+    def _send(self, status: int, content_type: str, body: str) -> None:
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        self.server.logger.debug("Metrics endpoint: " + format, *args)
+
+
+class MetricsServer:
+    """Serves /health and /metrics of `metrics` from a background thread."""
+
+    def __init__(self, metrics: DaemonMetrics, host: str = "127.0.0.1", port: int = 8765, logger=None):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self.logger = logger or get_logger("etvcourse.daemon_metrics")
+        self._server = None
+
+    def start(self) -> None:
+        self._server = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+        self._server.daemon_threads = True
+        self._server.metrics = self.metrics
+        self._server.logger = self.logger
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True).start()
+        self.logger.info("Serving /health and /metrics on http://%s:%s", self.host, self.port)
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -1,30 +1,162 @@
+import time
+import atexit
+import shutil
+import threading
 from selenium import webdriver
 from selenium.webdriver.firefox.options import Options
+from selenium.webdriver.firefox.service import Service
+
+from src.tasks.request_blocking import RequestBlockingProxy, resource_type_preferences
+from logger import get_logger
+
+_SEED_LOCK = threading.Lock()
+
+
+class TimedService(Service):
+    """Geckodriver service that records how long spawning the process took."""
+
+    spawn_duration = None
+
+    def start(self):
+        start = time.monotonic()
+        super().start()
+        self.spawn_duration = time.monotonic() - start
+
 
 class DriverInitialization:
 
-    def __init__(self, settings:dict, arguments:list=list()):
+    def __init__(self, settings:dict, arguments:list=list(), profile_template=None, request_blocking:dict=None,
+                 memory_constrained:dict=None, logger=None):
         self.settings = settings
         self.arguments = arguments
+        self.profile_template = profile_template
+        self.request_blocking = request_blocking or {}
+        self.memory_constrained = memory_constrained or {}
+        self.logger = logger or get_logger("etvcourse.driver")
         self.options = Options()
         if self.settings:
             self.add_settings()
+        if self.memory_constrained.get("enabled"):
+            self.add_memory_constrained_settings()
         if self.arguments:
             self.add_firefox_arguments()
 
+        self.startup_timings = {}
+
     def add_settings(self):
         for pref, value in self.settings.items():
             self.options.set_preference(pref, value)
 
+    def add_memory_constrained_settings(self):
+        # applied after the regular settings, so they win where both set a preference
+        for pref, value in (self.memory_constrained.get("preferences") or {}).items():
+            self.options.set_preference(pref, value)
+        self.logger.info("Memory-constrained firefox profile: %s preferences", len(self.memory_constrained.get("preferences") or {}))
+
     def add_firefox_arguments(self):
         for argument in self.arguments:
             self.options.add_argument(argument)
 
+    def start_request_blocker(self) -> RequestBlockingProxy:
+        request_blocker = RequestBlockingProxy(deny_hosts=self.request_blocking.get("deny_hosts"),
+                                               allow_hosts=self.request_blocking.get("allow_hosts"),
+                                               deny_url_patterns=self.request_blocking.get("deny_url_patterns"),
+                                               host=self.request_blocking.get("proxy_host", "127.0.0.1"),
+                                               port=self.request_blocking.get("proxy_port", 0),
+                                               logger=self.logger)
+        request_blocker.start()
+        # teardown_driver stops it with the driver, atexit only catches drivers never torn down
+        atexit.register(request_blocker.stop)
+        preferences = {**request_blocker.firefox_preferences(),
+                       **resource_type_preferences(self.request_blocking.get("block_resource_types"))}
+        for pref, value in preferences.items():
+            self.options.set_preference(pref, value)
+        return request_blocker
+
+    def _launch_local(self, options: Options, profile_dir: str | None = None):
+        if profile_dir:
+            options.add_argument("-profile")
+            options.add_argument(profile_dir)
+            atexit.register(shutil.rmtree, profile_dir, ignore_errors=True)
+        service = TimedService()
+        start = time.monotonic()
+        driver = webdriver.Firefox(options=options, service=service)
+        self.startup_timings["geckodriver_spawn"] = service.spawn_duration
+        self.startup_timings["browser_launch"] = time.monotonic() - start - service.spawn_duration
+        return driver
+
+    def seed_profile_template(self, is_headless: bool = True) -> None:
+        # a single throwaway session lets firefox create its profile databases in the template
+        self.profile_template.write_user_js()
+        options = Options()
+        if is_headless:
+            options.add_argument("--headless")
+        options.add_argument("-profile")
+        options.add_argument(str(self.profile_template.path))
+        driver = webdriver.Firefox(options=options)
+        driver.get("about:blank")
+        driver.quit()
+        self.profile_template.mark_seeded()
+
     def create_firefox_driver(self, is_remote:bool=False, remote_url:str=None, is_headless:bool=True):
         if is_headless:
             self.options.add_argument("--headless")
 
         if is_remote:
-            return webdriver.Remote(command_executor=remote_url, options=self.options)
+            start = time.monotonic()
+            driver = webdriver.Remote(command_executor=remote_url, options=self.options)
+            self.startup_timings["browser_launch"] = time.monotonic() - start
+            driver.startup_timings = self.startup_timings
+            driver.rss_telemetry = bool(self.memory_constrained.get("rss_telemetry"))
+            return driver
+
+        profile_dir = None
+        if self.profile_template is not None:
+            start = time.monotonic()
+            with _SEED_LOCK:
+                if not self.profile_template.is_seeded:
+                    self.seed_profile_template(is_headless=is_headless)
+            profile_dir = self.profile_template.clone()
+            self.startup_timings["profile_clone"] = time.monotonic() - start
+
+        # the proxy runs in this process, so it is only usable for a local browser
+        request_blocker = None
+        if self.request_blocking.get("enabled"):
+            request_blocker = self.start_request_blocker()
+
+        driver = self._launch_local(options=self.options, profile_dir=profile_dir)
+        driver.startup_timings = self.startup_timings
+        driver.request_blocker = request_blocker
+        driver.profile_dir = profile_dir
+        driver.rss_telemetry = bool(self.memory_constrained.get("rss_telemetry"))
+        return driver
+
+
+def teardown_driver(driver, logger=None) -> None:
+    """Quit the driver and release what was started for it: its request-blocking proxy and its profile clone."""
+    logger = logger or get_logger("etvcourse.driver")
+    try:
+        driver.quit()
+    except Exception as err:
+        logger.warning("Failed to quit driver: %s", err)
+    request_blocker = getattr(driver, "request_blocker", None)
+    if request_blocker is not None:
+        request_blocker.stop()
+        driver.request_blocker = None
+    profile_dir = getattr(driver, "profile_dir", None)
+    if profile_dir:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+        driver.profile_dir = None
+
 
-        return webdriver.Firefox(options=self.options)
\ No newline at end of file
+def record_first_navigation(driver, logger=None) -> None:
+    """Add the document load time of the first page (Navigation Timing API) to the driver startup timings and log them."""
+    logger = logger or get_logger("etvcourse.driver")
+    startup_timings = getattr(driver, "startup_timings", {})
+    duration_ms = driver.execute_script(
+        "const nav = performance.getEntriesByType('navigation')[0];"
+        "return nav ? nav.loadEventEnd - nav.startTime : null;")
+    if duration_ms:
+        startup_timings["first_navigation"] = duration_ms / 1000
+    logger.info("Driver startup timings: %s",
+                ", ".join(f"{phase}={seconds:.2f}s" for phase, seconds in startup_timings.items() if seconds is not None))
@@ -0,0 +1,74 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+from src.tasks.driver_initialization import teardown_driver
+from logger import get_logger
+
+
+class DriverPool:
+    """Bounded pool of logged-in drivers shared by concurrent course bookings.
+
+    `driver_factory` builds a fresh driver, `login_fn(driver)` authenticates it.
+    With `share_login_cookies` only the first driver runs the login flow and
+    the others receive its cookies.
+    """
+
+    def __init__(self, driver_factory, login_fn, size: int, login_url: str | None = None,
+                 share_login_cookies: bool = False, logger=None):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.driver_factory = driver_factory
+        self.login_fn = login_fn
+        self.size = size
+        self.login_url = login_url
+        self.share_login_cookies = share_login_cookies
+        self.logger = logger or get_logger("etvcourse.driver_pool")
+
+        self.drivers = []
+        self._idle = queue.Queue()
+
+    def start(self) -> None:
+        self.logger.debug("Starting driver pool with %s drivers", self.size)
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            futures = [executor.submit(self.driver_factory) for _ in range(self.size)]
+        # drivers that did start are kept, so close() quits them when another one failed
+        self.drivers = [future.result() for future in futures if future.exception() is None]
+        errors = [future.exception() for future in futures if future.exception() is not None]
+        if errors:
+            raise errors[0]
+
+        if self.share_login_cookies:
+            self.login_fn(self.drivers[0])
+            cookies = self.drivers[0].get_cookies()
+            with ThreadPoolExecutor(max_workers=self.size) as executor:
+                list(executor.map(lambda driver: self._restore_cookies(driver, cookies), self.drivers[1:]))
+        else:
+            with ThreadPoolExecutor(max_workers=self.size) as executor:
+                list(executor.map(self.login_fn, self.drivers))
+
+        for driver in self.drivers:
+            self._idle.put(driver)
+        self.logger.debug("Driver pool ready")
+
+    def _restore_cookies(self, driver, cookies: list[dict]) -> None:
+        # cookies can only be set for the domain currently loaded
+        driver.get(self.login_url)
+        for cookie in cookies:
+            driver.add_cookie(cookie)
+
+    def run(self, tasks: list, task_fn) -> list:
+        """Run `task_fn(driver, task)` for each task on the next idle driver, keeping input order."""
+        def _run_on_idle_driver(task):
+            driver = self._idle.get()
+            try:
+                return task_fn(driver, task)
+            finally:
+                self._idle.put(driver)
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            return list(executor.map(_run_on_idle_driver, tasks))
+
+    def close(self) -> None:
+        for driver in self.drivers:
+            teardown_driver(driver, logger=self.logger)
+        self.drivers = []
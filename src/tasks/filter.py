@@ -1,74 +1,126 @@
 
-import time
+from selenium.common.exceptions import NoSuchElementException
 from src.utils.selenium.selenium_actions import (ClickAction,
                                                  #EnterTextAction,
                                                  ClickWhenClickable,
                                                  #EnterTextWhenVisible
                                                  )
+from src.utils.selenium.readiness import (PageReadiness,
+                                          AllOf,
+                                          DocumentReady,
+                                          ElementClickable,
+                                          ElementPresent,
+                                          NetworkIdle,
+                                          TextChanged)
+from src.tasks.request_blocking import log_request_stats
+from src.utils.selenium.dom_probe import DomProbe
+from src.utils.tracing import tracer
 from logger import get_logger
 
 
 class Filter:
-    def __init__(self, driver, course_overview_url, filter_locators_filled, click_action=ClickWhenClickable, logger=None):
+    def __init__(self, driver, course_overview_url, filter_locators_filled, click_action=ClickWhenClickable, readiness=None, logger=None):
         self.driver = driver
         self.course_overview_url = course_overview_url
         self.filter_locators_filled = filter_locators_filled
         self.click_action = click_action(driver=self.driver)
         self.logger = logger or get_logger("etvcourse.filter")
+        self.readiness = readiness or PageReadiness(driver=self.driver, logger=self.logger)
 
         self.ctx = {}
 
+    @tracer.traced("filter.run_filter", kind="flow")
     def run_filter(self):
         self.logger.debug("Starting filter flow for url: %s", self.course_overview_url)
         self.go_to_course_overview_page(course_overview_url=self.course_overview_url)
+        self.readiness.wait("filter/overview_loaded",
+                            AllOf(DocumentReady(), ElementClickable(self.filter_locators_filled["FILTER"])),
+                            timeout=10)
+        initial_filter_number = self.read_filter_number(applied_filter_locator=self.filter_locators_filled["FILTERNUMBER"])
         self.click_filter(filter_locator=self.filter_locators_filled["FILTER"],
                           click_action=self.click_action)
-        time.sleep(2)
+        self.readiness.wait("filter/location_rendered",
+                            ElementPresent(self.filter_locators_filled["LOCATION"]),
+                            timeout=2)
         self.click_location(location_locator=self.filter_locators_filled["LOCATION"],
                             click_action=self.click_action)
-        time.sleep(2)
+        self.readiness.wait("filter/weekday_rendered",
+                            ElementPresent(self.filter_locators_filled["WEEKDAY"]),
+                            timeout=2)
         self.click_weekday(weekday_locator=self.filter_locators_filled["WEEKDAY"],
                            click_action=self.click_action)
-        time.sleep(2)
+        self.readiness.wait("filter/apply_clickable",
+                            ElementClickable(self.filter_locators_filled["APPLY_FILTER"]),
+                            timeout=2)
         self.click_apply_button(apply_button_locator=self.filter_locators_filled["APPLY_FILTER"],
                                 click_action=self.click_action)
-        time.sleep(10) 
+        self.readiness.wait("filter/filter_applied",
+                            AllOf(TextChanged(self.filter_locators_filled["FILTERNUMBER"], initial_filter_number),
+                                  NetworkIdle()),
+                            timeout=10)
+        log_request_stats(driver=self.driver, page="filter/course_overview")
         self.get_applied_filter_number(applied_filter_locator=self.filter_locators_filled["FILTERNUMBER"])
         self.logger.debug("Completed filter flow for url: %s", self.course_overview_url)
 
+    @tracer.traced("filter.run_deep_link_filter", kind="flow")
+    def run_deep_link_filter(self, filter_url: str):
+        self.logger.debug("Starting deep link filter flow for url: %s", filter_url)
+        self.go_to_course_overview_page(course_overview_url=filter_url)
+        self.readiness.wait("filter/deep_link_applied",
+                            AllOf(DocumentReady(),
+                                  ElementPresent(self.filter_locators_filled["FILTERNUMBER"]),
+                                  NetworkIdle()),
+                            timeout=10)
+        log_request_stats(driver=self.driver, page="filter/course_overview_deep_link")
+        self.get_applied_filter_number(applied_filter_locator=self.filter_locators_filled["FILTERNUMBER"])
+        self.logger.debug("Completed deep link filter flow for url: %s", filter_url)
+
     # step 1
+    @tracer.traced("filter.go_to_course_overview_page")
     def go_to_course_overview_page(self, course_overview_url) -> None:
         self.logger.debug("Navigating to course page: %s", course_overview_url)
         self.driver.get(course_overview_url) 
         self.logger.debug("Navigation complete to course page")
 
     # step 2
+    @tracer.traced("filter.click_filter")
     def click_filter(self, filter_locator: tuple, click_action: ClickAction) -> None:
         self.logger.debug("Clicking filter %s", filter_locator)
         click_action.execute(locator=filter_locator)
         self.logger.debug("Clicked filter")
 
     # step 3
+    @tracer.traced("filter.click_location")
     def click_location(self, location_locator: tuple, click_action: ClickAction) -> None:
         self.logger.debug("Clicking location %s", location_locator)
         click_action.execute(locator=location_locator)
         self.logger.debug("Clicked location")
 
     # step 4
+    @tracer.traced("filter.click_weekday")
     def click_weekday(self, weekday_locator: tuple, click_action: ClickAction) -> None:
         self.logger.debug("Clicking weekday %s", weekday_locator)
         click_action.execute(locator=weekday_locator)
         self.logger.debug("Clicked weekday")
 
     # step 5
+    @tracer.traced("filter.click_apply_button")
     def click_apply_button(self, apply_button_locator: tuple, click_action: ClickAction) -> None:
         self.logger.debug("Clicking apply button %s", apply_button_locator)
         click_action.execute(locator=apply_button_locator)
         self.logger.debug("Clicked apply button")
 
+    @tracer.traced("filter.get_applied_filter_number")
     def get_applied_filter_number(self, applied_filter_locator: tuple) -> None:
         self.logger.debug("Getting applied filter number from %s", applied_filter_locator)
-        element = self.driver.find_element(*applied_filter_locator)
-        filter_number = element.text
+        # one round trip for presence and text instead of find_element plus .text
+        counter = DomProbe(driver=self.driver).probe({"FILTERNUMBER": applied_filter_locator})["FILTERNUMBER"]
+        if not counter["present"]:
+            raise NoSuchElementException(f"Applied filter counter not found: {applied_filter_locator}")
+        filter_number = counter["text"]
         self.logger.debug("Got applied filter number: %s", filter_number)
-        self.ctx["applied_filter_number"] = int(filter_number)
\ No newline at end of file
+        self.ctx["applied_filter_number"] = int(filter_number)
+
+    def read_filter_number(self, applied_filter_locator: tuple) -> str | None:
+        elements = self.driver.find_elements(*applied_filter_locator)
+        return elements[0].text.strip() if elements else None
\ No newline at end of file
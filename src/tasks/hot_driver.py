@@ -0,0 +1,58 @@
+from selenium.common.exceptions import WebDriverException
+
+from src.tasks.driver_initialization import teardown_driver
+from logger import get_logger
+
+
+class HotDriver:
+    """A single logged-in driver kept alive between booking windows.
+
+    `driver_factory` builds a fresh driver, `login_fn(driver)` authenticates it
+    and `session_check_fn(driver)` tells whether the session is still logged in.
+    A driver that stopped answering is replaced on the next `get`.
+    """
+
+    def __init__(self, driver_factory, login_fn, session_check_fn=None, on_restart=None, logger=None):
+        self.driver_factory = driver_factory
+        self.login_fn = login_fn
+        self.session_check_fn = session_check_fn
+        self.on_restart = on_restart
+        self.logger = logger or get_logger("etvcourse.hot_driver")
+
+        self.driver = None
+        self.restarts = 0
+
+    def is_alive(self) -> bool:
+        if self.driver is None:
+            return False
+        try:
+            return self.driver.execute_script("return 1;") == 1
+        except WebDriverException:
+            return False
+
+    def get(self):
+        if self.is_alive():
+            return self.driver
+        if self.driver is not None:
+            self.logger.warning("Driver stopped responding, restarting it")
+            self.restarts += 1
+            self.quit()
+            if self.on_restart is not None:
+                self.on_restart()
+        self.driver = self.driver_factory()
+        self.login_fn(self.driver)
+        return self.driver
+
+    def ensure_authenticated(self):
+        """Return the live driver, logging in again if its session expired."""
+        driver = self.get()
+        if self.session_check_fn is not None and not self.session_check_fn(driver):
+            self.logger.info("Session expired, logging in again")
+            self.login_fn(driver)
+        return driver
+
+    def quit(self) -> None:
+        if self.driver is None:
+            return
+        teardown_driver(self.driver, logger=self.logger)
+        self.driver = None
@@ -0,0 +1,184 @@
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from logger import get_logger
+
+
+def origin_of(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def create_http_session(pool_maxsize: int = 4, max_retries: int = 2) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=max_retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Accept": "application/json"})
+    return session
+
+
+class HttpLogin:
+    def __init__(self, session, base_url, login_name, password, endpoints, timeout=10, logger=None):
+        self.session = session
+        self.base_url = base_url
+        self.login_name = login_name
+        self.password = password
+        self.endpoints = endpoints
+        self.timeout = timeout
+        self.logger = logger or get_logger("etvcourse.http_login")
+
+    def run_login(self):
+        self.logger.debug("Starting http login for user: %s", self.login_name)
+        response = self.session.post(self.base_url + self.endpoints["login"],
+                                     json={"email": self.login_name, "password": self.password},
+                                     timeout=self.timeout)
+        response.raise_for_status()
+        token = response.json().get("token") if response.content else None
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+        self.logger.debug("Completed http login for user: %s", self.login_name)
+
+
+class HttpFilter:
+    def __init__(self, session, base_url, endpoints, course_query, placeholders, timeout=10, logger=None):
+        self.session = session
+        self.base_url = base_url
+        self.endpoints = endpoints
+        self.course_query = course_query
+        self.placeholders = placeholders
+        self.timeout = timeout
+        self.logger = logger or get_logger("etvcourse.http_filter")
+
+        self.ctx = {}
+
+    def run_filter(self):
+        params = {key: value.format(**self.placeholders) for key, value in self.course_query.items()}
+        self.logger.debug("Fetching filtered course list with %s", params)
+        response = self.session.get(self.base_url + self.endpoints["courses"], params=params, timeout=self.timeout)
+        response.raise_for_status()
+        self.ctx["courses"] = response.json()
+        self.logger.debug("Got %s courses", len(self.ctx["courses"]))
+
+
+class HttpBooking:
+    # answers that are final for this course, a selenium retry would only find the same state
+    FINAL_STATUSES = ("full", "not_bookable")
+
+    def __init__(self, session, base_url, endpoints, course_name, person_name, timeout=10, logger=None):
+        self.session = session
+        self.base_url = base_url
+        self.endpoints = endpoints
+        self.course_name = course_name
+        self.person_name = person_name
+        self.timeout = timeout
+        self.logger = logger or get_logger("etvcourse.http_booking")
+
+        self.ctx = {}
+
+    def run_booking(self, courses: list[dict]):
+        self.logger.debug("Starting http booking flow")
+        self.get_course(courses=courses)
+        self.ctx["step_3/is_course_bookable"] = bool(self.ctx["step_1/course"].get("bookable"))
+        if self.ctx["step_3/is_course_bookable"]:
+            self.book(course=self.ctx["step_1/course"])
+            self.logger.info("Http booking flow complete")
+        else:
+            self.ctx["booking_status"] = "not_bookable"
+            self.logger.info("Course is not bookable, skipping booking step")
+
+    # step 1
+    def get_course(self, courses: list[dict]) -> None:
+        matches = [course for course in courses if self.course_name in " ".join(course.get("name", "").split())]
+        if not matches:
+            raise LookupError(f"Course not found in course list: {self.course_name}")
+        self.ctx["step_1/course"] = matches[0]
+
+    # step 2
+    def book(self, course: dict) -> None:
+        participant = next((person for person in course.get("participants", [])
+                            if self.person_name in person.get("name", "")), None)
+        if participant is None:
+            raise LookupError(f"Person not available for booking: {self.person_name}")
+        response = self.session.post(self.base_url + self.endpoints["booking"].format(COURSE_ID=course["id"]),
+                                     json={"participant_id": participant["id"],
+                                           "invoice_recipient_id": participant["id"],
+                                           "accept_terms": True},
+                                     timeout=self.timeout)
+        status = self.read_status(response)
+        if status in self.FINAL_STATUSES:
+            self.ctx["booking_status"] = status
+            self.ctx["is_booked"] = False
+            return
+        response.raise_for_status()
+        self.ctx["booking_status"] = status or "unknown"
+        self.ctx["is_booked"] = status == "booked"
+
+    @staticmethod
+    def read_status(response) -> str | None:
+        try:
+            return response.json().get("status")
+        except ValueError:
+            return None
+
+
+class HttpEngine:
+    """Browser-free counterpart of the Login/Filter/Booking pipeline on one pooled HTTP session."""
+
+    def __init__(self, http_cfg: dict, tasks_cfg: dict, locator_fillings: dict, logger=None):
+        self.http_cfg = http_cfg
+        self.tasks_cfg = tasks_cfg
+        self.locator_fillings = locator_fillings
+        self.base_url = (http_cfg.get("base_url") or origin_of(tasks_cfg["login_url"])).rstrip("/")
+        self.timeout = http_cfg.get("timeout", 10)
+        self.session = create_http_session(pool_maxsize=http_cfg.get("pool_maxsize", 4),
+                                           max_retries=http_cfg.get("max_retries", 2))
+        self.logger = logger or get_logger("etvcourse.http_engine")
+
+    def login(self) -> None:
+        HttpLogin(session=self.session,
+                  base_url=self.base_url,
+                  login_name=self.tasks_cfg["login_name"],
+                  password=self.tasks_cfg["password"],
+                  endpoints=self.http_cfg["endpoints"],
+                  timeout=self.timeout,
+                  logger=self.logger).run_login()
+
+    def book_course(self, single_course: dict, weekday_abbr: str) -> dict:
+        start = time.monotonic()
+        result = {"course": single_course.get("orig_course_name"),
+                  "person": single_course.get("person"),
+                  "weekday": weekday_abbr,
+                  "is_booked": False,
+                  "error": None}
+
+        filter_pipe = HttpFilter(session=self.session,
+                                 base_url=self.base_url,
+                                 endpoints=self.http_cfg["endpoints"],
+                                 course_query=self.http_cfg["course_query"],
+                                 placeholders={**self.locator_fillings["FilterPageLocators"],
+                                               "DAY_GER_ABB": single_course.get("weekday_ger_abb")},
+                                 timeout=self.timeout,
+                                 logger=self.logger)
+        filter_pipe.run_filter()
+
+        booking_pipe = HttpBooking(session=self.session,
+                                   base_url=self.base_url,
+                                   endpoints=self.http_cfg["endpoints"],
+                                   course_name=single_course.get("orig_course_name"),
+                                   person_name=single_course.get("person"),
+                                   timeout=self.timeout,
+                                   logger=self.logger)
+        booking_pipe.run_booking(courses=filter_pipe.ctx["courses"])
+        result["is_booked"] = booking_pipe.ctx.get("is_booked", False)
+        result["booking_status"] = booking_pipe.ctx.get("booking_status")
+        result["duration_s"] = round(time.monotonic() - start, 2)
+        self.logger.info("Http booking of %s for %s took %.3fs, booked: %s",
+                         result["course"], result["person"], result["duration_s"], result["is_booked"])
+        return result
+
+    def close(self) -> None:
+        self.session.close()
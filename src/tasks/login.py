@@ -1,15 +1,17 @@
-import time
 from src.utils.selenium.selenium_actions import (ClickAction,
                                                  EnterTextAction,
                                                  ClickWhenClickable,
                                                  EnterTextWhenVisible)
+from src.utils.selenium.readiness import PageReadiness, AllOf, UrlChanged, NetworkIdle
+from src.tasks.request_blocking import log_request_stats
+from src.utils.tracing import tracer
 from logger import get_logger
 
 
 class Login:
     def __init__(self, driver, login_url, login_name, password, locators_filled,
                  click_action=ClickWhenClickable, enter_text_action=EnterTextWhenVisible,
-                 logger=None):
+                 readiness=None, after_step=None, logger=None):
         self.driver = driver
         self.login_url = login_url
         self.login_name = login_name
@@ -18,11 +20,16 @@ class Login:
         self.click_action = click_action(driver=self.driver)
         self.enter_text_action = enter_text_action(driver=self.driver)
         self.logger = logger or get_logger("etvcourse.login")
+        self.readiness = readiness or PageReadiness(driver=self.driver, logger=self.logger)
+        self.after_step = after_step
 
+    @tracer.traced("login.run_login", kind="flow")
     def run_login(self):
         self.logger.debug("Starting login flow for user: %s", self.login_name)
 
         self.go_to_login_page(login_url=self.login_url)
+        if self.after_step is not None:
+            self.after_step("login/page")
 
         self.enter_username(username_locator=self.locators_filled["USERNAME"],
                             username=self.login_name,
@@ -34,18 +41,24 @@ class Login:
 
         self.click_checkbox(checkbox_locator=self.locators_filled["CHECKBOX"],
                             click_action=self.click_action)
+        login_page_url = self.driver.current_url
         self.click_login_button(login_button_locator=self.locators_filled["SUBMIT"],
                                 click_action=self.click_action)
+        self.readiness.wait("login/logged_in",
+                            AllOf(UrlChanged(from_url=login_page_url), NetworkIdle()),
+                            timeout=5)
+        log_request_stats(driver=self.driver, page="login")
         self.logger.debug("Completed login flow for user: %s", self.login_name)
-        time.sleep(5)
 
     # step 1
+    @tracer.traced("login.go_to_login_page")
     def go_to_login_page(self, login_url) -> None:
         self.logger.debug("Navigating to login url: %s", login_url)
         self.driver.get(login_url)
         self.logger.debug("Navigation complete to login url")
 
     # step 2
+    @tracer.traced("login.enter_username")
     def enter_username(self, username_locator: tuple, username:str, enter_text_action: EnterTextAction) -> None:
         self.logger.debug("Entering username into %s", username_locator)
         enter_text_action.execute(locator=username_locator,
@@ -53,6 +66,7 @@ class Login:
         self.logger.debug("Entered username")
         
     #step 3
+    @tracer.traced("login.enter_password")
     def enter_password(self, password_locator: tuple, password: str, enter_text_action: EnterTextAction) -> None:
         self.logger.debug("Entering password into %s", password_locator)
         enter_text_action.execute(locator=password_locator,
@@ -60,12 +74,14 @@ class Login:
         self.logger.debug("Entered password")
 
     # step 4
+    @tracer.traced("login.click_checkbox")
     def click_checkbox(self, checkbox_locator: tuple, click_action: ClickAction) -> None:
         self.logger.debug("Clicking checkbox %s", checkbox_locator)
         click_action.execute(locator=checkbox_locator)
         self.logger.debug("Clicked checkbox")
 
     # step 5
+    @tracer.traced("login.click_login_button")
     def click_login_button(self, login_button_locator: tuple, click_action: ClickAction) -> None:
         self.logger.debug("Clicking login button %s", login_button_locator)
         click_action.execute(locator=login_button_locator)
@@ -0,0 +1,90 @@
+import os
+
+try:
+    import psutil
+except ImportError:  # /proc is read directly when psutil is missing
+    psutil = None
+
+from logger import get_logger
+
+_PROCESS_ERRORS = (OSError, psutil.Error) if psutil is not None else (OSError,)
+
+
+def _rss_bytes(pid: int) -> int:
+    if psutil is not None:
+        return psutil.Process(pid).memory_info().rss
+    return _proc_rss_bytes(pid)
+
+
+def _proc_rss_bytes(pid: int) -> int:
+    with open(f"/proc/{pid}/status", encoding="utf-8") as file:
+        for line in file:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def _proc_children(pid: int) -> list[int]:
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="utf-8") as file:
+                # the command name may contain spaces, the ppid follows its closing parenthesis
+                if int(file.read().rsplit(")", 1)[1].split()[1]) == pid:
+                    children.append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+    return children
+
+
+def process_tree_rss(pid: int) -> tuple[int, int]:
+    """RSS in bytes of `pid` and all its descendants, plus the number of processes counted."""
+    if psutil is not None:
+        try:
+            pids = [pid] + [child.pid for child in psutil.Process(pid).children(recursive=True)]
+        except psutil.Error:
+            return 0, 0
+    else:
+        pids, pending = [], [pid]
+        while pending:
+            pids.append(pending.pop())
+            pending.extend(_proc_children(pids[-1]))
+
+    rss, count = 0, 0
+    for current in pids:
+        try:
+            rss += _rss_bytes(current)
+            count += 1
+        except _PROCESS_ERRORS:
+            continue
+    return rss, count
+
+
+def sample_driver_memory(driver) -> dict:
+    """RSS of geckodriver alone and of the firefox process tree, in MB; None where the pid is unknown (remote drivers)."""
+    service = getattr(driver, "service", None)
+    geckodriver_pid = getattr(getattr(service, "process", None), "pid", None)
+    firefox_pid = (getattr(driver, "capabilities", None) or {}).get("moz:processID")
+
+    sample = {"geckodriver_rss_mb": None, "firefox_rss_mb": None, "firefox_processes": None}
+    if geckodriver_pid is not None:
+        try:
+            sample["geckodriver_rss_mb"] = round(_rss_bytes(geckodriver_pid) / 2 ** 20, 1)
+        except _PROCESS_ERRORS:
+            pass
+    if firefox_pid is not None:
+        rss, count = process_tree_rss(firefox_pid)
+        sample["firefox_rss_mb"] = round(rss / 2 ** 20, 1)
+        sample["firefox_processes"] = count
+    return sample
+
+
+def log_driver_memory(driver, step: str, logger=None) -> dict:
+    """Sample and log the driver's memory at `step`; returns the sample for span attributes."""
+    logger = logger or get_logger("etvcourse.memory")
+    sample = sample_driver_memory(driver)
+    logger.info("RSS at %s: geckodriver=%s MB firefox=%s MB in %s processes", step,
+                sample["geckodriver_rss_mb"], sample["firefox_rss_mb"], sample["firefox_processes"])
+    return sample
@@ -0,0 +1,91 @@
+from src.utils.tracing import tracer
+from logger import get_logger
+
+
+class Step:
+    """A pipeline step: `fn(**inputs)` returns a dict holding at least `outputs`.
+
+    Outputs of a `checkpointed` step stay valid across retries; the others
+    describe page state (e.g. "the course page is open") and are redone.
+    """
+
+    def __init__(self, name: str, fn, inputs: tuple = (), outputs: tuple = (), checkpointed: bool = True):
+        self.name = name
+        self.fn = fn
+        self.inputs = inputs
+        self.outputs = outputs
+        self.checkpointed = checkpointed
+
+    def __repr__(self) -> str:
+        return f"Step({self.name})"
+
+
+class CourseCheckpoint:
+    """Outputs of completed checkpointed steps of one course, plus failure counts per step."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.outputs = {}
+        self.failures = {}
+
+    def clear(self) -> None:
+        self.outputs.clear()
+
+
+class StepPipeline:
+    """Runs the steps needed for the last one, resuming from the checkpoint.
+
+    Working back from the last step, a step is run only when one of its
+    outputs is needed and not checkpointed. A retry after a failure in the
+    booking steps therefore reuses e.g. a known course link and starts at
+    the course page instead of the overview. A step failing `max_failures`
+    times in a row clears the checkpoint, so the next attempt starts over.
+    `after_step(name)` runs after each successful step inside its span; a
+    returned dict is added to the span attributes.
+    """
+
+    def __init__(self, steps: list[Step], checkpoint: CourseCheckpoint, max_failures: int = 2, after_step=None, logger=None):
+        self.steps = steps
+        self.checkpoint = checkpoint
+        self.max_failures = max_failures
+        self.after_step = after_step
+        self.logger = logger or get_logger("etvcourse.pipeline")
+
+    def plan(self) -> list[Step]:
+        needed = set()
+        required = []
+        for index, step in enumerate(reversed(self.steps)):
+            is_goal = index == 0
+            is_needed = any(name in needed and not (step.checkpointed and name in self.checkpoint.outputs)
+                            for name in step.outputs)
+            if is_goal or is_needed:
+                required.append(step)
+                needed.update(step.inputs)
+        return list(reversed(required))
+
+    def run(self) -> dict:
+        values = dict(self.checkpoint.outputs)
+        plan = self.plan()
+        skipped = [step.name for step in self.steps if step not in plan]
+        if skipped:
+            self.logger.info("Resuming %s from checkpoint, skipping %s", self.checkpoint.key, ", ".join(skipped))
+
+        for step in plan:
+            with tracer.span(f"pipeline.{step.name}", kind="step", course=self.checkpoint.key) as span:
+                try:
+                    outputs = step.fn(**{name: values[name] for name in step.inputs}) or {}
+                except Exception:
+                    self.checkpoint.failures[step.name] = self.checkpoint.failures.get(step.name, 0) + 1
+                    if self.checkpoint.failures[step.name] >= self.max_failures:
+                        self.logger.warning("Step %s failed %s times, clearing the checkpoint of %s",
+                                            step.name, self.checkpoint.failures[step.name], self.checkpoint.key)
+                        self.checkpoint.clear()
+                        self.checkpoint.failures.clear()
+                    raise
+                if self.after_step is not None:
+                    span.attributes.update(self.after_step(step.name) or {})
+            self.checkpoint.failures.pop(step.name, None)
+            values.update(outputs)
+            if step.checkpointed:
+                self.checkpoint.outputs.update({name: outputs[name] for name in step.outputs if name in outputs})
+        return values
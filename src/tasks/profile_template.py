@@ -0,0 +1,65 @@
+import functools
+import hashlib
+import json
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+from logger import get_logger
+
+# files firefox locks while a profile is in use, never copied into clones
+_LOCK_FILES = ("lock", ".parentlock", "parent.lock")
+
+
+@functools.lru_cache(maxsize=None)
+def detect_firefox_version(binary: str = "firefox") -> str:
+    """`firefox --version` output, or "unknown" when the binary cannot be run."""
+    try:
+        return subprocess.run([binary, "--version"], capture_output=True, text=True, timeout=10).stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+class FirefoxProfileTemplate:
+    """Pre-seeded Firefox profile cached on disk and cloned for each driver.
+
+    The cache directory is keyed by a hash of the preferences and the Firefox
+    version, so changing `browser_settings.yaml` or upgrading Firefox creates a
+    new template instead of reusing a stale one.
+    """
+
+    def __init__(self, preferences: dict, cache_dir: str | Path, seed_preferences: dict | None = None,
+                 firefox_version: str | None = None, logger=None):
+        self.preferences = {**(seed_preferences or {}), **(preferences or {})}
+        self.cache_dir = Path(cache_dir)
+        self.firefox_version = firefox_version or detect_firefox_version()
+        self.logger = logger or get_logger("etvcourse.profile_template")
+
+    @property
+    def key(self) -> str:
+        serialized = json.dumps({"firefox_version": self.firefox_version, "preferences": self.preferences},
+                                sort_keys=True, default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()[:16]
+
+    @property
+    def path(self) -> Path:
+        return self.cache_dir / self.key
+
+    @property
+    def is_seeded(self) -> bool:
+        return (self.path / ".seeded").exists()
+
+    def write_user_js(self) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        lines = [f"user_pref({json.dumps(pref)}, {json.dumps(value)});" for pref, value in self.preferences.items()]
+        (self.path / "user.js").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def mark_seeded(self) -> None:
+        (self.path / ".seeded").touch()
+        self.logger.info("Seeded firefox profile template %s", self.path)
+
+    def clone(self) -> str:
+        target = tempfile.mkdtemp(prefix="etv-firefox-profile-")
+        shutil.copytree(self.path, target, dirs_exist_ok=True, ignore=shutil.ignore_patterns(*_LOCK_FILES))
+        return target
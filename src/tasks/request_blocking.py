@@ -0,0 +1,189 @@
+import fnmatch
+import select
+import socket
+import socketserver
+import threading
+from urllib.parse import urlsplit
+
+from logger import get_logger
+
+# firefox preferences that drop a whole resource type without a proxy
+RESOURCE_TYPE_PREFERENCES = {
+    "font": {"gfx.downloadable_fonts.enabled": False},
+    "image": {"permissions.default.image": 2},
+    "stylesheet": {"permissions.default.stylesheet": 2},
+    "media": {"media.autoplay.default": 5, "media.play-stand-alone": False},
+}
+
+
+class RequestStats:
+    def __init__(self):
+        self.blocked = 0
+        self.allowed = 0
+        self.bytes_relayed = 0
+        self.blocked_hosts = {}
+        self.lock = threading.Lock()
+
+    def add_blocked(self, host: str) -> None:
+        with self.lock:
+            self.blocked += 1
+            self.blocked_hosts[host] = self.blocked_hosts.get(host, 0) + 1
+
+    def add_allowed(self) -> None:
+        with self.lock:
+            self.allowed += 1
+
+    def add_bytes(self, n_bytes: int) -> None:
+        with self.lock:
+            self.bytes_relayed += n_bytes
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {"blocked": self.blocked,
+                    "allowed": self.allowed,
+                    "bytes_relayed": self.bytes_relayed,
+                    "blocked_hosts": dict(self.blocked_hosts)}
+
+
+class _ProxyHandler(socketserver.StreamRequestHandler):
+    # unbuffered, so nothing past the request headers is read before relaying
+    rbufsize = 0
+
+    def handle(self):
+        request_line = self.rfile.readline(65537).decode("latin-1").strip()
+        if not request_line:
+            return
+        method, target, version = request_line.split(" ", 2)
+        headers = []
+        while True:
+            line = self.rfile.readline(65537)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            headers.append(line)
+
+        if method == "CONNECT":
+            host, _, port = target.partition(":")
+            url = f"https://{host}/"
+        else:
+            parts = urlsplit(target)
+            host, port = parts.hostname or "", parts.port or 80
+            url = target
+
+        if self.server.blocker.is_blocked(host=host, url=url):
+            self.server.blocker.stats.add_blocked(host)
+            self.wfile.write(b"HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            return
+
+        self.server.blocker.stats.add_allowed()
+        try:
+            upstream = socket.create_connection((host, int(port or 443)), timeout=30)
+        except OSError:
+            self.wfile.write(b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            return
+
+        with upstream:
+            if method == "CONNECT":
+                self.wfile.write(b"HTTP/1.1 200 Connection Established\r\n\r\n")
+            else:
+                # one upstream per client connection, so keep-alive must not reuse it for another host
+                path = urlsplit(target)._replace(scheme="", netloc="").geturl() or "/"
+                headers = [line for line in headers
+                           if not line.lower().startswith((b"connection:", b"proxy-connection:"))]
+                headers.append(b"Connection: close\r\n")
+                upstream.sendall(f"{method} {path} {version}\r\n".encode("latin-1") + b"".join(headers) + b"\r\n")
+            self._relay(upstream)
+
+    def _relay(self, upstream: socket.socket) -> None:
+        client = self.connection
+        sockets = [client, upstream]
+        while True:
+            readable, _, errored = select.select(sockets, [], sockets, 30)
+            if errored or not readable:
+                return
+            for sock in readable:
+                data = sock.recv(65536)
+                if not data:
+                    return
+                other = upstream if sock is client else client
+                other.sendall(data)
+                if sock is upstream:
+                    self.server.blocker.stats.add_bytes(len(data))
+
+
+class _ThreadingProxyServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class RequestBlockingProxy:
+    """Local filtering proxy that drops requests the booking flow does not need.
+
+    HTTPS traffic is tunnelled, so only the host is visible there; URL patterns
+    apply to plain HTTP requests. Allow patterns win over deny patterns.
+    """
+
+    def __init__(self, deny_hosts: list | None = None, allow_hosts: list | None = None,
+                 deny_url_patterns: list | None = None, host: str = "127.0.0.1", port: int = 0, logger=None):
+        self.deny_hosts = deny_hosts or []
+        self.allow_hosts = allow_hosts or []
+        self.deny_url_patterns = deny_url_patterns or []
+        self.host = host
+        self.port = port
+        self.logger = logger or get_logger("etvcourse.request_blocking")
+
+        self.stats = RequestStats()
+        self._last_snapshot = self.stats.snapshot()
+        self._server = None
+
+    def is_blocked(self, host: str, url: str) -> bool:
+        if any(fnmatch.fnmatch(host, pattern) for pattern in self.allow_hosts):
+            return False
+        if any(fnmatch.fnmatch(host, pattern) for pattern in self.deny_hosts):
+            return True
+        return any(fnmatch.fnmatch(url, pattern) for pattern in self.deny_url_patterns)
+
+    def start(self) -> None:
+        self._server = _ThreadingProxyServer((self.host, self.port), _ProxyHandler)
+        self._server.blocker = self
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.logger.debug("Request blocking proxy listening on %s:%s", self.host, self.port)
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def firefox_preferences(self) -> dict:
+        return {"network.proxy.type": 1,
+                "network.proxy.http": self.host,
+                "network.proxy.http_port": self.port,
+                "network.proxy.ssl": self.host,
+                "network.proxy.ssl_port": self.port,
+                "network.proxy.no_proxies_on": ""}
+
+    def log_page_stats(self, page: str, driver=None) -> dict:
+        """Log requests blocked and bytes relayed since the previous call."""
+        current = self.stats.snapshot()
+        delta = {key: current[key] - self._last_snapshot[key] for key in ("blocked", "allowed", "bytes_relayed")}
+        self._last_snapshot = current
+        if driver is not None:
+            delta["page_transfer_bytes"] = driver.execute_script(
+                "return performance.getEntriesByType('resource').reduce((s, e) => s + (e.transferSize || 0), 0);")
+        self.logger.info("Page %s: %s requests blocked, %s allowed, %s bytes relayed, %s bytes transferred by the page",
+                         page, delta["blocked"], delta["allowed"], delta["bytes_relayed"], delta.get("page_transfer_bytes"))
+        return delta
+
+
+def resource_type_preferences(block_resource_types: list) -> dict:
+    preferences = {}
+    for resource_type in block_resource_types or []:
+        preferences.update(RESOURCE_TYPE_PREFERENCES.get(resource_type, {}))
+    return preferences
+
+
+def log_request_stats(driver, page: str) -> None:
+    request_blocker = getattr(driver, "request_blocker", None)
+    if request_blocker is not None:
+        request_blocker.log_page_stats(page=page, driver=driver)
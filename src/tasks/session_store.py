@@ -0,0 +1,81 @@
+import base64
+import hashlib
+import json
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from logger import get_logger
+
+
+class SessionStore:
+    """Encrypted on-disk cache of an authenticated browser session.
+
+    Stores cookies and local storage after a successful login so the next run
+    can restore them instead of typing credentials again. The file is encrypted
+    with a Fernet key derived from `secret`.
+    """
+
+    def __init__(self, path: str | Path, secret: str, max_age_hours: float = 12, logger=None):
+        if not secret:
+            raise ValueError("A secret is required to encrypt the session store")
+        self.path = Path(path)
+        self.secret = secret
+        self.max_age_hours = max_age_hours
+        self.logger = logger or get_logger("etvcourse.session_store")
+
+    def _fernet(self):
+        from cryptography.fernet import Fernet
+        key = base64.urlsafe_b64encode(hashlib.sha256(self.secret.encode("utf-8")).digest())
+        return Fernet(key)
+
+    @staticmethod
+    def _origin(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}/"
+
+    def save(self, driver, login_duration_s: float) -> None:
+        payload = {"saved_at": time.time(),
+                   "login_duration_s": login_duration_s,
+                   "origin": self._origin(driver.current_url),
+                   "cookies": driver.get_cookies(),
+                   "local_storage": driver.execute_script("return Object.assign({}, window.localStorage);")}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_bytes(self._fernet().encrypt(json.dumps(payload).encode("utf-8")))
+        self.logger.debug("Saved session with %s cookies to %s", len(payload["cookies"]), self.path)
+
+    def load(self) -> dict | None:
+        from cryptography.fernet import InvalidToken
+        if not self.path.exists():
+            return None
+        try:
+            payload = json.loads(self._fernet().decrypt(self.path.read_bytes()))
+        except (InvalidToken, ValueError) as err:
+            self.logger.warning("Discarding unreadable session store %s: %s", self.path, err)
+            return None
+        age_hours = (time.time() - payload["saved_at"]) / 3600
+        if age_hours > self.max_age_hours:
+            self.logger.info("Stored session is %.1fh old, ignoring it", age_hours)
+            return None
+        return payload
+
+    def restore(self, driver) -> dict | None:
+        payload = self.load()
+        if payload is None:
+            return None
+        # cookies and local storage can only be set for the origin currently loaded
+        driver.get(payload["origin"])
+        for cookie in payload["cookies"]:
+            if cookie.get("sameSite") not in ("Strict", "Lax", "None"):
+                cookie.pop("sameSite", None)
+            driver.add_cookie(cookie)
+        driver.execute_script("""
+            const items = arguments[0];
+            for (const key in items) { window.localStorage.setItem(key, items[key]); }
+        """, payload["local_storage"])
+        self.logger.debug("Restored %s cookies and %s local storage items",
+                          len(payload["cookies"]), len(payload["local_storage"]))
+        return payload
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,134 @@
+import copy
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.switch_to import SwitchTo
+
+from src.tasks.course_booking import run_course_booking
+from logger import get_logger
+
+_NAVIGATE_SCRIPT = "window.__etvcourseNavigating = true; window.location.href = arguments[0];"
+_RELOAD_SCRIPT = "window.__etvcourseNavigating = true; window.location.reload();"
+_LANDED_SCRIPT = "return window.__etvcourseNavigating !== true && document.readyState === 'complete';"
+
+
+def tab_driver(driver, execute):
+    """A shallow copy of `driver` that sends every command through `execute(tab, driver_command, params)`.
+
+    `execute` hands the command on with `send`, which unwraps the answer for
+    the copy, so elements found through it belong to it and their commands
+    take the same route; the shared driver and everyone else holding it are
+    unaffected.
+    """
+    tab = copy.copy(driver)
+    tab.execute = functools.partial(execute, tab)
+    tab._switch_to = SwitchTo(tab)
+    return tab
+
+
+def send(tab, driver_command, params=None):
+    """Send a command of a `tab_driver` copy to the browser, past its routing."""
+    return type(tab).execute(tab, driver_command, params)
+
+
+class TabOrchestrator:
+    """Books several courses in one logged-in browser, one tab per course.
+
+    Each course runs the regular `run_course_booking` in its own worker thread,
+    so tab mode gets the same step pipeline, checkpoints, bookability polling
+    and step hooks as the other modes. Each thread gets its own `tab_driver`,
+    whose commands hold the lock for that one command and switch to the
+    thread's tab first. Page loads are started by script and polled, so a tab
+    waiting for its page or for its booking outcome never holds the session
+    while the others need it.
+
+    Only the tab that ran the last command is selected, the others are
+    background tabs, where Firefox clamps page timers (setTimeout/setInterval)
+    to 1s. The landing and bookability polls are driven from Python and the
+    confirmation wait holds the lock while its tab is selected, so they are not
+    slowed; the site's own timers are, unless the background timer preferences
+    in config/browser_settings.yaml lift the clamp.
+    """
+
+    def __init__(self, driver, tasks_cfg: dict, locator_fillings: dict, poll_frequency: float = 0.1,
+                 page_load_timeout_s: float = 30, logger=None):
+        self.driver = driver
+        self.tasks_cfg = tasks_cfg
+        self.locator_fillings = locator_fillings
+        self.poll_frequency = poll_frequency
+        self.page_load_timeout_s = page_load_timeout_s
+        self.logger = logger or get_logger("etvcourse.tab_orchestrator")
+
+        self.lock = threading.Lock()
+        self._current_handle = None
+
+    def open_tabs(self, n_tabs: int) -> list[str]:
+        handles = [self.driver.current_window_handle]
+        for _ in range(n_tabs - 1):
+            self.driver.switch_to.new_window("tab")
+            handles.append(self.driver.current_window_handle)
+        self._current_handle = handles[-1]
+        return handles
+
+    def close_tabs(self, handles: list[str]) -> None:
+        for handle in handles[1:]:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        self._current_handle = None
+        self.driver.switch_to.window(handles[0])
+
+    def _switch_to(self, handle: str) -> None:
+        if handle != self._current_handle:
+            self.driver.execute(Command.SWITCH_TO_WINDOW, {"handle": handle})
+            self._current_handle = handle
+
+    def _run_on_tab(self, handle: str, tab, driver_command: str, params: dict | None):
+        with self.lock:
+            self._switch_to(handle)
+            return send(tab, driver_command, params)
+
+    def _execute(self, handle: str, tab, driver_command, params=None):
+        if driver_command == Command.GET:
+            return self._navigate(handle, tab, _NAVIGATE_SCRIPT, [params["url"]])
+        if driver_command == Command.REFRESH:
+            return self._navigate(handle, tab, _RELOAD_SCRIPT, [])
+        return self._run_on_tab(handle, tab, driver_command, params)
+
+    def _navigate(self, handle: str, tab, script: str, args: list) -> dict:
+        # driver.get would block the session until the load event, the landing is polled instead
+        self._run_on_tab(handle, tab, Command.W3C_EXECUTE_SCRIPT, {"script": script, "args": args})
+        deadline = time.monotonic() + self.page_load_timeout_s
+        while True:
+            time.sleep(self.poll_frequency)
+            try:
+                if self._run_on_tab(handle, tab, Command.W3C_EXECUTE_SCRIPT, {"script": _LANDED_SCRIPT, "args": []})["value"]:
+                    return {"value": None}
+            except WebDriverException:
+                # the document is being replaced
+                pass
+            if time.monotonic() >= deadline:
+                raise TimeoutException(f"Page did not load within {self.page_load_timeout_s}s")
+
+    def book_course(self, handle: str, single_course: dict, weekday_abbr: str, checkpoint=None) -> dict:
+        return run_course_booking(driver=tab_driver(self.driver, functools.partial(self._execute, handle)),
+                                  single_course=single_course,
+                                  weekday_abbr=weekday_abbr,
+                                  tasks_cfg=self.tasks_cfg,
+                                  locator_fillings=self.locator_fillings,
+                                  checkpoint=checkpoint,
+                                  logger=self.logger)
+
+    def run(self, active_courses: list[dict], weekday_abbr: str, checkpoints: list | None = None) -> list[dict]:
+        checkpoints = checkpoints or [None] * len(active_courses)
+        handles = self.open_tabs(len(active_courses))
+        self.logger.info("Booking %s courses in %s tabs of one browser", len(active_courses), len(handles))
+        try:
+            with ThreadPoolExecutor(max_workers=len(handles)) as executor:
+                return list(executor.map(self.book_course, handles, active_courses,
+                                         [weekday_abbr] * len(handles), checkpoints))
+        finally:
+            self.close_tabs(handles)
@@ -1,5 +1,17 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
 def fill_and_resolve_locators(template_class, base_placeholders, extra_fields=None):
       placeholders = base_placeholders.copy()
       if extra_fields:
             placeholders.update(extra_fields)
-      return template_class.resolve_all(**placeholders)
\ No newline at end of file
+      return template_class.resolve_all(**placeholders)
+
+def build_filter_url(base_url, query_template, placeholders):
+      parts = urlsplit(base_url)
+      query = dict(parse_qsl(parts.query))
+      query.update({key: value.format(**placeholders) for key, value in query_template.items()})
+      return urlunsplit(parts._replace(query=urlencode(query)))
+
+def fill_texts(templates, placeholders):
+      return {key: value.format(**placeholders) for key, value in templates.items()}
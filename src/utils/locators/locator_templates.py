@@ -1,4 +1,5 @@
 from selenium.webdriver.common.by import By
+from src.utils.selenium.dom_probe import DomProbe
 
 class ResolveLocators:
     @classmethod
@@ -14,6 +15,10 @@ class ResolveLocators:
             if name.isupper()
         }
 
+    @classmethod
+    def probe_all(cls, driver, **placeholders):
+        return DomProbe(driver=driver).probe(cls.resolve_all(**placeholders))
+
 
 class LoginPageLocators(ResolveLocators):
     USERNAME = (By.XPATH, "//input[@autocomplete='{USERNAME}']")
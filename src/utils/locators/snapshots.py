@@ -0,0 +1,144 @@
+"""Record page snapshots during a live run and replay the locators against them offline.
+
+A run with SNAPSHOT_DIR set saves the page source after each login and booking
+step, together with the placeholders of the course and the match count of
+every locator in the live page. Replaying evaluates the current locator
+templates and fillings against those snapshots with lxml, without Firefox:
+
+    python -m src.utils.locators.snapshots .snapshots/20260101-090000-1234-1 [--fillings path] [--output report.json]
+
+A locator whose presence differs from the live run is reported and makes the
+command exit with status 1.
+"""
+import argparse
+import json
+import os
+import threading
+
+from src.utils.locators import locator_templates
+from src.utils.selenium.dom_probe import DomProbe
+from logger import get_logger
+
+LOCATOR_CLASSES = ("LoginPageLocators", "FilterPageLocators", "BookingLocators")
+
+
+def resolve_known_locators(locator_fillings: dict, placeholders: dict) -> dict:
+    """All locators, named "<class>.<LOCATOR>", whose placeholders are known for this snapshot."""
+    locators = {}
+    for class_name in LOCATOR_CLASSES:
+        template_class = getattr(locator_templates, class_name)
+        for name in template_class.__dict__:
+            if not name.isupper():
+                continue
+            try:
+                locators[f"{class_name}.{name}"] = template_class._resolve(getattr(template_class, name),
+                                                                           **{**locator_fillings.get(class_name, {}), **placeholders})
+            except KeyError:
+                continue
+    return locators
+
+
+class SnapshotRecorder:
+    """Writes the page source and live locator state of a driver after each step into `directory`.
+
+    Snapshots are numbered in recording order and listed in `manifest.jsonl`.
+    """
+
+    def __init__(self, directory: str, locator_fillings: dict, logger=None):
+        self.directory = directory
+        self.locator_fillings = locator_fillings
+        self.logger = logger or get_logger("etvcourse.snapshots")
+        self._count = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def record(self, driver, step: str, placeholders: dict | None = None) -> dict:
+        """Save a snapshot of the current page; a failure is logged and never interrupts the run."""
+        placeholders = placeholders or {}
+        try:
+            locators = resolve_known_locators(self.locator_fillings, placeholders)
+            live = DomProbe(driver=driver).probe(locators)
+            page_source = driver.page_source
+            url = driver.current_url
+        except Exception as err:
+            self.logger.warning("Could not record snapshot at %s: %s", step, err)
+            return {}
+
+        with self._lock:
+            self._count += 1
+            file_name = f"{self._count:03d}_{step.replace('/', '_').replace('.', '_')}.html"
+            with open(os.path.join(self.directory, file_name), "w", encoding="utf-8") as file:
+                file.write(page_source)
+            entry = {"step": step,
+                     "file": file_name,
+                     "url": url,
+                     "placeholders": placeholders,
+                     "live": {name: state["count"] for name, state in live.items()}}
+            with open(os.path.join(self.directory, "manifest.jsonl"), "a", encoding="utf-8") as file:
+                file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.logger.debug("Recorded snapshot %s at %s", file_name, step)
+        return {"snapshot": file_name}
+
+
+def load_manifest(directory: str) -> list[dict]:
+    with open(os.path.join(directory, "manifest.jsonl"), encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def replay(directory: str, locator_fillings: dict) -> list[dict]:
+    """Evaluate the current locators on each recorded snapshot and compare them with the live run.
+
+    Returns one row per snapshot and locator with the live count (None if the
+    locator did not exist when recording), the replayed count and a `changed`
+    flag when presence differs.
+    """
+    from lxml import etree, html
+
+    rows = []
+    for entry in load_manifest(directory):
+        with open(os.path.join(directory, entry["file"]), "rb") as file:
+            document = html.fromstring(file.read())
+        for name, (by, value) in resolve_known_locators(locator_fillings, entry["placeholders"]).items():
+            if by != "xpath":
+                rows.append({"step": entry["step"], "locator": name, "live": entry["live"].get(name),
+                             "replayed": None, "changed": False, "error": f"unsupported strategy {by}"})
+                continue
+            try:
+                replayed, error = len(document.xpath(value)), None
+            except etree.XPathError as err:
+                replayed, error = 0, str(err)
+            live = entry["live"].get(name)
+            rows.append({"step": entry["step"],
+                         "locator": name,
+                         "live": live,
+                         "replayed": replayed,
+                         "changed": error is not None or (live is not None and (live > 0) != (replayed > 0)),
+                         "error": error})
+    return rows
+
+
+def format_report(rows: list[dict]) -> str:
+    lines = [f"{'STEP':<24} {'LOCATOR':<36} {'LIVE':>5} {'REPLAY':>6}"]
+    for row in rows:
+        marker = "  <- changed" if row["changed"] else ""
+        lines.append(f"{row['step']:<24} {row['locator']:<36} {str(row['live']):>5} {str(row['replayed']):>6}{marker}"
+                     + (f" ({row['error']})" if row["error"] else ""))
+    lines.append(f"{sum(row['changed'] for row in rows)} of {len(rows)} locator checks changed")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    from src.utils.help_functions import read_yaml_file
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", help="snapshot directory of one recorded driver")
+    parser.add_argument("--fillings", default=os.path.join("src", "utils", "locators", "locator_fillings.yaml"))
+    parser.add_argument("--output", help="write the rows as json")
+    args = parser.parse_args()
+
+    rows = replay(directory=args.directory, locator_fillings=read_yaml_file(args.fillings))
+    print(format_report(rows))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(rows, file, indent=2, ensure_ascii=False)
+    raise SystemExit(1 if any(row["changed"] for row in rows) else 0)
@@ -0,0 +1,134 @@
+import time
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+_INSTALL_SCRIPT = """
+const texts = arguments[0];
+const scopeElement = arguments[1];
+const state = {status: null, source: null, httpStatus: null, detail: null};
+window.__etvcourseBooking = state;
+
+function settle(status, source, httpStatus, detail) {
+    if (state.status === null) { Object.assign(state, {status, source, httpStatus, detail}); }
+}
+const normalize = (text) => (text || '').replace(/\\s+/g, ' ').trim();
+
+function classifyText(text, source) {
+    text = normalize(text);
+    if (!text) { return; }
+    if (text.includes(texts.BOOKED)) { settle('booked', source, null, text.slice(0, 200)); }
+    else if (text.includes(texts.FULL)) { settle('full', source, null, text.slice(0, 200)); }
+    else if (text.includes(texts.FAILED)) { settle('failed', source, null, text.slice(0, 200)); }
+}
+
+// the POST of the booking click decides by the status in its response body; a 2xx
+// without a known status is left to the booking area text
+state.classifyResponse = (method, url, httpStatus, body) => {
+    if (String(method || 'GET').toUpperCase() !== 'POST' || !new RegExp(texts.REQUEST).test(url)) { return; }
+    const detail = normalize(body).slice(0, 200);
+    let status = '';
+    try { status = String(JSON.parse(body).status || '').toLowerCase(); } catch (error) {}
+    if (status === 'booked') { settle('booked', 'network', httpStatus, detail); }
+    else if (status === 'full' || detail.includes(texts.FULL)) { settle('full', 'network', httpStatus, detail); }
+    else if (httpStatus >= 400) { settle('failed', 'network', httpStatus, detail); }
+};
+
+if (!window.__etvcourseRequestsWrapped) {
+    window.__etvcourseRequestsWrapped = true;
+    const report = (method, url, httpStatus, body) => {
+        if (window.__etvcourseBooking) { window.__etvcourseBooking.classifyResponse(method, String(url), httpStatus, body); }
+    };
+    const originalFetch = window.fetch;
+    window.fetch = function (input, init) {
+        const url = typeof input === 'string' ? input : input.url;
+        const method = (init && init.method) || (typeof input === 'string' ? 'GET' : input.method);
+        return originalFetch.apply(this, arguments).then((response) => {
+            response.clone().text().then((body) => report(method, url, response.status, body), () => report(method, url, response.status, ''));
+            return response;
+        });
+    };
+    const originalOpen = XMLHttpRequest.prototype.open;
+    XMLHttpRequest.prototype.open = function (method, url) {
+        this.addEventListener('loadend', () => {
+            let body = '';
+            try { body = this.responseText; } catch (error) {}
+            report(method, url, this.status, body);
+        });
+        return originalOpen.apply(this, arguments);
+    };
+}
+
+// only the booking area is observed, and only the nodes added to it are read
+const scope = (scopeElement && (scopeElement.closest('form') || scopeElement).parentElement) || document.body;
+const observer = new MutationObserver((mutations) => {
+    for (const mutation of mutations) {
+        for (const node of mutation.addedNodes) { classifyText(node.textContent, 'dom'); }
+        if (mutation.type === 'characterData') { classifyText(mutation.target.textContent, 'dom'); }
+    }
+    if (state.status !== null) { observer.disconnect(); }
+});
+observer.observe(scope, {childList: true, subtree: true, characterData: true});
+"""
+
+_WAIT_SCRIPT = """
+const timeoutMs = arguments[0];
+const bookedXpath = arguments[1];
+const done = arguments[arguments.length - 1];
+const started = Date.now();
+// the confirmation may render outside the observed area or on a re-rendered page, the
+// document-wide IS_BOOKED check runs once per slice to catch it
+if (bookedXpath && document.evaluate(bookedXpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue) {
+    return done({status: 'booked', source: 'dom_scan', httpStatus: null, detail: null});
+}
+(function poll() {
+    const state = window.__etvcourseBooking;
+    if (!state) { return done({status: 'unknown', source: null, httpStatus: null, detail: 'page was replaced after the booking click'}); }
+    if (state.status !== null) { return done({status: state.status, source: state.source, httpStatus: state.httpStatus, detail: state.detail}); }
+    if (Date.now() - started >= timeoutMs) { return done({status: 'pending', source: null, httpStatus: null, detail: null}); }
+    setTimeout(poll, 25);
+})();
+"""
+
+
+class BookingConfirmationWatcher:
+    """Detects the outcome of the booking click from the page itself.
+
+    `install` wraps fetch/XHR to classify the response of the POST submit
+    request matching `texts["REQUEST"]` by the `status` in its body, and observes the booking area for the
+    BOOKED/FULL/FAILED texts; it has to run before the click. The request and
+    body contract is assumed, so `wait` also checks the document-wide
+    `booked_locator` (IS_BOOKED) between its slices. `wait` returns
+    {"status": "booked" | "full" | "failed" | "unknown", "source", "http_status", "detail"}.
+    """
+
+    def __init__(self, driver: WebDriver, texts: dict, booked_locator: tuple | None = None):
+        self.driver = driver
+        self.texts = texts
+        self.booked_xpath = booked_locator[1] if booked_locator and booked_locator[0] == "xpath" else None
+
+    def install(self, scope_locator: tuple) -> None:
+        scope = self.driver.find_elements(*scope_locator)
+        self.driver.execute_script(_INSTALL_SCRIPT, self.texts, scope[0] if scope else None)
+
+    def wait(self, timeout_s: float = 2, slice_s: float = 0.25) -> dict:
+        # short in-page waits, so a driver shared between tabs is released between them
+        deadline = time.monotonic() + timeout_s
+        while True:
+            try:
+                outcome = self.driver.execute_async_script(_WAIT_SCRIPT,
+                                                           int(min(slice_s, max(0.0, deadline - time.monotonic())) * 1000),
+                                                           self.booked_xpath)
+            except WebDriverException as err:
+                # e.g. the click navigated and unloaded the page mid-script; the click itself went through
+                outcome = {"status": "unknown", "source": None, "httpStatus": None, "detail": f"{type(err).__name__} while waiting"}
+                break
+            if outcome["status"] != "pending":
+                break
+            if time.monotonic() >= deadline:
+                outcome = {"status": "unknown", "source": None, "httpStatus": None, "detail": "no confirmation within timeout"}
+                break
+        return {"status": outcome["status"],
+                "source": outcome["source"],
+                "http_status": outcome["httpStatus"],
+                "detail": outcome["detail"]}
@@ -0,0 +1,60 @@
+from selenium.webdriver.remote.webdriver import WebDriver
+
+_FIND_SCRIPT = """
+function find(by, value, root) {
+    if (by === 'xpath') {
+        const snapshot = root.evaluate(value, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        return Array.from({length: snapshot.snapshotLength}, (_, i) => snapshot.snapshotItem(i));
+    }
+    if (by === 'css selector') { return Array.from(root.querySelectorAll(value)); }
+    if (by === 'id') { return [root.getElementById(value)].filter(Boolean); }
+    if (by === 'name') { return Array.from(root.getElementsByName(value)); }
+    if (by === 'tag name') { return Array.from(root.getElementsByTagName(value)); }
+    if (by === 'class name') { return Array.from(root.getElementsByClassName(value)); }
+    throw new Error('Unsupported locator strategy: ' + by);
+}
+"""
+
+_PROBE_SCRIPT = _FIND_SCRIPT + """
+const locators = arguments[0];
+const result = {};
+
+function isVisible(element) {
+    // options render inside their select, so their visibility is the select's
+    const target = element.tagName === 'OPTION' ? (element.closest('select') || element) : element;
+    const style = window.getComputedStyle(target);
+    return target.getClientRects().length > 0 && style.visibility !== 'hidden' && style.display !== 'none';
+}
+
+for (const [name, [by, value]] of Object.entries(locators)) {
+    try {
+        const elements = find(by, value, document);
+        const element = elements[0];
+        result[name] = {
+            present: elements.length > 0,
+            count: elements.length,
+            visible: element ? isVisible(element) : false,
+            text: element ? (element.innerText || element.textContent || '').trim() : null,
+            href: element ? (element.href || element.getAttribute('href')) : null,
+            error: null,
+        };
+    } catch (error) {
+        result[name] = {present: false, count: 0, visible: false, text: null, href: null, error: String(error)};
+    }
+}
+return result;
+"""
+
+class DomProbe:
+    """Evaluates a whole resolved locator dict inside the browser in a single WebDriver round trip.
+
+    Returns, per locator name, presence, match count, visibility, text and href
+    of the first match, so a task can read the page state at once instead of
+    querying element by element.
+    """
+
+    def __init__(self, driver: WebDriver):
+        self.driver = driver
+
+    def probe(self, locators: dict) -> dict:
+        return self.driver.execute_script(_PROBE_SCRIPT, {name: list(locator) for name, locator in locators.items()})
@@ -1,45 +1,186 @@
 from abc import ABC, abstractmethod
+import contextvars
 import functools
+import random
+import threading
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.by import By
 import re
 import time
-from selenium.common.exceptions import NoSuchElementException, ElementClickInterceptedException
+from selenium.common.exceptions import NoSuchElementException, ElementClickInterceptedException, TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+from src.utils.selenium.readiness import NetworkIdle
+from src.utils.tracing import tracer
 
 class BaseHandler(ABC):
+    # expected seconds a handler call takes, checked against the remaining retry budget
+    cost = 0.0
+
     @abstractmethod
     def handle(self, driver: WebDriver, exception: WebDriverException) -> None:
         pass
 
-def retry_with_handlers(exception_handlers: dict, max_retries: int = 3, delay: float = 0.5):
+
+_current_budget = contextvars.ContextVar("current_retry_budget", default=None)
+
+
+class RetryBudget:
+    """Time budget shared by every action retried while it is active (one per course booking).
+
+    Used as a context manager; actions read it through `current_budget()`.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.started_at = time.monotonic()
+        self._token = None
+
+    def remaining(self) -> float:
+        return self.seconds - (time.monotonic() - self.started_at)
+
+    @property
+    def is_exhausted(self) -> bool:
+        return self.remaining() <= 0
+
+    def restart(self) -> None:
+        self.started_at = time.monotonic()
+
+    def __enter__(self):
+        self.started_at = time.monotonic()
+        self._token = _current_budget.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_budget.reset(self._token)
+        return False
+
+
+def current_budget() -> RetryBudget | None:
+    return _current_budget.get()
+
+
+class AdaptiveRetryEngine:
+    """Keeps per-locator attempt statistics and per-locator handler hit rates across a run.
+
+    A handler "hits" when the attempt right after it succeeds. For each
+    locator, handlers are tried in order of their smoothed hit rate on that
+    locator; after `min_samples` uses there a handler below `min_hit_rate` is
+    skipped for it, as is one costing more than the time left.
+    """
+
+    def __init__(self, min_samples: int = 3, min_hit_rate: float = 0.2):
+        self.min_samples = min_samples
+        self.min_hit_rate = min_hit_rate
+        self.locator_stats = {}
+        self.handler_stats = {}
+        self._lock = threading.Lock()
+
+    def hit_rate(self, locator, handler: BaseHandler) -> float:
+        uses, hits = self.handler_stats.get((str(locator), type(handler).__name__), (0, 0))
+        return (hits + 1) / (uses + 2)
+
+    def select_handlers(self, locator, handlers: list, remaining: float | None) -> list:
+        selected = []
+        for handler in sorted(handlers, key=lambda handler: self.hit_rate(locator, handler), reverse=True):
+            uses, _ = self.handler_stats.get((str(locator), type(handler).__name__), (0, 0))
+            if uses >= self.min_samples and self.hit_rate(locator, handler) < self.min_hit_rate:
+                continue
+            if remaining is not None and handler.cost >= remaining:
+                continue
+            selected.append(handler)
+        return selected
+
+    def record_attempt(self, locator, duration: float, is_success: bool) -> None:
+        with self._lock:
+            attempts, failures, seconds = self.locator_stats.get(str(locator), (0, 0, 0.0))
+            self.locator_stats[str(locator)] = (attempts + 1, failures + (not is_success), seconds + duration)
+
+    def record_handlers(self, locator, handlers: list, is_hit: bool) -> None:
+        with self._lock:
+            for handler in handlers:
+                key = (str(locator), type(handler).__name__)
+                uses, hits = self.handler_stats.get(key, (0, 0))
+                self.handler_stats[key] = (uses + 1, hits + is_hit)
+
+    def report(self) -> str:
+        with self._lock:
+            lines = [f"{'LOCATOR':<90} {'ATTEMPTS':>8} {'FAILED':>6} {'SECONDS':>8}"]
+            for locator, (attempts, failures, seconds) in sorted(self.locator_stats.items(), key=lambda item: -item[1][2]):
+                lines.append(f"{locator[:90]:<90} {attempts:>8} {failures:>6} {seconds:>8.2f}")
+                for (handler_locator, name), (uses, hits) in self.handler_stats.items():
+                    if handler_locator == locator:
+                        lines.append(f"    handler {name}: {hits}/{uses} hits")
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.locator_stats = {}
+            self.handler_stats = {}
+
+
+retry_engine = AdaptiveRetryEngine()
+
+
+def retry_with_budget(exception_handlers: dict, max_retries: int = 3, base_delay: float = 0.2, max_delay: float = 2.0,
+                      jitter: float = 0.5, default_wait: float = 3, max_action_s: float = 5.0, budget_share: float = 0.1,
+                      engine: AdaptiveRetryEngine = retry_engine):
+    """Retry a driver action with exponential backoff and jitter within a per-action deadline.
+
+    The deadline is `max_action_s`, shortened to `budget_share` of the remaining
+    `RetryBudget` when one is active, so one broken locator cannot eat the
+    course's budget. Each attempt's `seconds_to_wait` and the handlers are
+    capped by the time left until the deadline, and retrying stops as soon as
+    it cannot cover the backoff plus another wait.
+    """
 
     def decorator(func):
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
+            if not args or not hasattr(args[0], "driver"):
+                raise RuntimeError(
+                    "retry_with_budget expects a bound method; ensure the decorated function is an instance method with a `.driver` attribute on self"
+                )
+            driver_arg = getattr(args[0], "driver")
+            locator = kwargs.get("locator", args[1] if len(args) > 1 else None)
+            seconds_to_wait = kwargs.pop("seconds_to_wait", default_wait)
+            pending_handlers = []
+
+            budget = current_budget()
+            action_s = max_action_s if budget is None else min(max_action_s, budget_share * max(0.0, budget.remaining()))
+            deadline = time.monotonic() + action_s
+
             for attempt in range(1, max_retries + 1):
+                wait = max(0.1, min(seconds_to_wait, deadline - time.monotonic()))
+                start = time.monotonic()
                 try:
-                    return func(*args, **kwargs)
+                    with tracer.span(f"{func.__qualname__}.attempt", kind="retry", attempt=attempt):
+                        result = func(*args, seconds_to_wait=wait, **kwargs)
                 except Exception as e:
+                    engine.record_attempt(locator, time.monotonic() - start, is_success=False)
+                    engine.record_handlers(locator, pending_handlers, is_hit=False)
+
                     handlers = []
                     for exc_type, exc_handlers in exception_handlers.items():
                         if isinstance(e, exc_type):
                             handlers.extend(exc_handlers)
+                    pending_handlers = engine.select_handlers(locator, handlers, remaining=deadline - time.monotonic())
 
-                    if not args or not hasattr(args[0], "driver"):
-                        raise RuntimeError(
-                            "retry_with_handlers expects a bound method; ensure the decorated function is an instance method with a `.driver` attribute on self"
-                        )
-
-                    driver_arg = getattr(args[0], "driver")
+                    for handler in pending_handlers:
+                        with tracer.span(f"handler.{type(handler).__name__}", kind="handler", exception=type(e).__name__):
+                            try:
+                                handler.handle(driver_arg, e)
+                            except Exception as handler_error:
+                                tracer.logger.debug("Handler %s failed: %s", type(handler).__name__, handler_error)
 
-                    for handler in handlers:
-                        handler.handle(driver_arg, e)
-
-                    if attempt < max_retries:
-                        time.sleep(delay)
-                    else:
+                    delay = min(max_delay, base_delay * 2 ** (attempt - 1)) * random.uniform(1 - jitter, 1 + jitter)
+                    if attempt == max_retries or deadline - time.monotonic() < delay + 0.1:
                         raise e
+                    time.sleep(delay)
+                else:
+                    engine.record_attempt(locator, time.monotonic() - start, is_success=True)
+                    engine.record_handlers(locator, pending_handlers, is_hit=True)
+                    return result
         return wrapper
     return decorator
 
@@ -78,8 +219,20 @@ class ClickInterceptedHandler(BaseHandler):
         tag, classes = match.groups()
         return tag + "." + ".".join(classes.split())
 
-class SleepThreeSeconds(BaseHandler):
+class WaitForNetworkIdle(BaseHandler):
+    """Waits up to `timeout` for the page to settle, so a missing element gets its render instead of a fixed sleep."""
+
+    def __init__(self, timeout: float = 1.0, quiet_ms: int = 200, poll_frequency: float = 0.05):
+        self.timeout = timeout
+        self.cost = timeout
+        self.condition = NetworkIdle(quiet_ms=quiet_ms)
+        self.poll_frequency = poll_frequency
+
     def handle(self, driver: WebDriver, exception: WebDriverException):
         if not isinstance(exception, NoSuchElementException):
-            raise TypeError("NoSuchElementHandler used with wrong exception type")
-        time.sleep(3)
\ No newline at end of file
+            raise TypeError("WaitForNetworkIdle used with wrong exception type")
+        try:
+            WebDriverWait(driver, self.timeout, poll_frequency=self.poll_frequency).until(self.condition)
+        except TimeoutException:
+            # the retry that follows decides, a page still loading is no reason to fail the handler
+            pass
@@ -0,0 +1,88 @@
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from src.utils.selenium.dom_probe import _FIND_SCRIPT
+
+# selects the person options and ticks the terms checkbox, leaving fields that are already set alone
+_STAGE_SCRIPT = _FIND_SCRIPT + """
+function stageField(element) {
+    if (!element) { return false; }
+    if (element.tagName === 'OPTION') {
+        if (element.selected) { return true; }
+        const select = element.closest('select');
+        if (!select) { element.click(); return element.selected; }
+        element.selected = true;
+        select.dispatchEvent(new Event('input', {bubbles: true}));
+        select.dispatchEvent(new Event('change', {bubbles: true}));
+        return element.selected;
+    }
+    if (element.type === 'checkbox') {
+        if (!element.checked) { element.click(); }
+        return element.checked;
+    }
+    return false;
+}
+
+function applyStaging(fields) {
+    const staged = {};
+    for (const [name, [by, value]] of Object.entries(fields)) {
+        let element = null;
+        try { element = find(by, value, document)[0]; } catch (error) {}
+        staged[name] = stageField(element);
+    }
+    return staged;
+}
+"""
+
+_INSTALL_SCRIPT = _STAGE_SCRIPT + """
+const fields = arguments[0];
+if (window.__etvcourseStaging) { window.__etvcourseStaging.observer.disconnect(); }
+const staging = {fields: applyStaging(fields), passes: 1, observer: null};
+// re-renders replace the form nodes, so every batch of added nodes is staged again
+let scheduled = false;
+staging.observer = new MutationObserver(() => {
+    if (scheduled) { return; }
+    scheduled = true;
+    queueMicrotask(() => {
+        scheduled = false;
+        staging.fields = applyStaging(fields);
+        staging.passes += 1;
+    });
+});
+staging.observer.observe(document.body, {childList: true, subtree: true});
+window.__etvcourseStaging = staging;
+return staging.fields;
+"""
+
+_VERIFY_SCRIPT = _STAGE_SCRIPT + """
+const fields = arguments[0];
+const [bookBy, bookValue] = arguments[1];
+const staged = applyStaging(fields);
+let book = null;
+try { book = find(bookBy, bookValue, document)[0]; } catch (error) {}
+return {fields: staged,
+        book_enabled: Boolean(book && !book.disabled && book.getAttribute('aria-disabled') !== 'true'),
+        passes: window.__etvcourseStaging ? window.__etvcourseStaging.passes : 0};
+"""
+
+
+class BookingFormStager:
+    """Keeps the booking form filled in from inside the page, ahead of the course opening.
+
+    `install` selects the person and invoice person options and ticks the
+    terms checkbox as soon as they render, and again after every re-render.
+    `verify` applies the staging once more and reports, per field, whether it
+    holds, plus whether the book button is enabled, all in one round trip.
+    """
+
+    def __init__(self, driver: WebDriver, field_locators: dict, book_locator: tuple):
+        self.driver = driver
+        self.field_locators = {name: list(locator) for name, locator in field_locators.items()}
+        self.book_locator = list(book_locator)
+
+    def install(self) -> dict:
+        return self.driver.execute_script(_INSTALL_SCRIPT, self.field_locators)
+
+    def verify(self) -> dict:
+        state = self.driver.execute_script(_VERIFY_SCRIPT, self.field_locators, self.book_locator)
+        state["ready"] = all(state["fields"].values()) and state["book_enabled"]
+        return state
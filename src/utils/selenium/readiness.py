@@ -0,0 +1,185 @@
+import time
+from abc import ABC, abstractmethod
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from src.utils.tracing import tracer
+from logger import get_logger
+
+
+class ReadinessCondition(ABC):
+    name = "condition"
+
+    @abstractmethod
+    def __call__(self, driver: WebDriver) -> bool:
+        pass
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+class DocumentReady(ReadinessCondition):
+    name = "document_ready"
+
+    def __call__(self, driver: WebDriver) -> bool:
+        return driver.execute_script("return document.readyState") == "complete"
+
+
+class NetworkIdle(ReadinessCondition):
+    """No resource has finished loading for `quiet_ms` and the document is complete.
+
+    Based on the Resource Timing buffer, so requests still in flight are only
+    noticed once they finish; the quiet window covers the usual XHR chains.
+    """
+    name = "network_idle"
+
+    _SCRIPT = """
+        const quiet = arguments[0];
+        if (document.readyState !== 'complete') { return false; }
+        const entries = performance.getEntriesByType('resource');
+        const last = entries.reduce((m, e) => Math.max(m, e.responseEnd), 0);
+        return performance.now() - last >= quiet;
+    """
+
+    def __init__(self, quiet_ms: int = 500):
+        self.quiet_ms = quiet_ms
+
+    def __call__(self, driver: WebDriver) -> bool:
+        return bool(driver.execute_script(self._SCRIPT, self.quiet_ms))
+
+
+class ComponentRendered(ReadinessCondition):
+    """At least one custom element with the given tag prefix has rendered children."""
+    name = "component_rendered"
+
+    _SCRIPT = """
+        const prefix = arguments[0];
+        const result = document.evaluate(
+            "//*[starts-with(local-name(), '" + prefix + "')][*]",
+            document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null);
+        return result.singleNodeValue !== null;
+    """
+
+    def __init__(self, tag_prefix: str = "kgr-"):
+        self.tag_prefix = tag_prefix
+
+    def __call__(self, driver: WebDriver) -> bool:
+        return bool(driver.execute_script(self._SCRIPT, self.tag_prefix))
+
+
+class ElementPresent(ReadinessCondition):
+    name = "element_present"
+
+    def __init__(self, locator: tuple):
+        self.locator = locator
+
+    def __call__(self, driver: WebDriver) -> bool:
+        return driver.find_elements(*self.locator) != []
+
+
+class ElementClickable(ReadinessCondition):
+    name = "element_clickable"
+
+    def __init__(self, locator: tuple):
+        self.locator = locator
+
+    def __call__(self, driver: WebDriver) -> bool:
+        return bool(EC.element_to_be_clickable(mark=self.locator)(driver))
+
+
+class TextChanged(ReadinessCondition):
+    """Text of the located element is non-empty and differs from `initial_text`."""
+    name = "text_changed"
+
+    def __init__(self, locator: tuple, initial_text: str | None):
+        self.locator = locator
+        self.initial_text = initial_text
+
+    def __call__(self, driver: WebDriver) -> bool:
+        elements = driver.find_elements(*self.locator)
+        if not elements:
+            return False
+        text = elements[0].text.strip()
+        return text != "" and text != self.initial_text
+
+
+class UrlChanged(ReadinessCondition):
+    name = "url_changed"
+
+    def __init__(self, from_url: str):
+        self.from_url = from_url
+
+    def __call__(self, driver: WebDriver) -> bool:
+        return driver.current_url != self.from_url
+
+
+class AnyOf(ReadinessCondition):
+    name = "any_of"
+
+    def __init__(self, *conditions: ReadinessCondition):
+        self.conditions = conditions
+
+    def __call__(self, driver: WebDriver) -> bool:
+        return any(condition(driver) for condition in self.conditions)
+
+    def __repr__(self) -> str:
+        return f"any_of({', '.join(map(repr, self.conditions))})"
+
+
+class AllOf(ReadinessCondition):
+    name = "all_of"
+
+    def __init__(self, *conditions: ReadinessCondition):
+        self.conditions = conditions
+
+    def __call__(self, driver: WebDriver) -> bool:
+        return all(condition(driver) for condition in self.conditions)
+
+    def __repr__(self) -> str:
+        return f"all_of({', '.join(map(repr, self.conditions))})"
+
+
+class PageReadiness:
+    """Waits for step conditions under per-step deadlines and logs the time spent.
+
+    A missed deadline is logged but not raised: the following action keeps its
+    own waits and retries, exactly as after the former fixed sleeps.
+    """
+
+    def __init__(self, driver: WebDriver, timeouts: dict | None = None, default_timeout: float = 10,
+                 poll_frequency: float = 0.1, logger=None):
+        self.driver = driver
+        self.timeouts = timeouts or {}
+        self.default_timeout = default_timeout
+        self.poll_frequency = poll_frequency
+        self.logger = logger or get_logger("etvcourse.readiness")
+
+        self.waited = {}
+
+    def wait(self, step: str, condition: ReadinessCondition, timeout: float | None = None) -> bool:
+        deadline = self.timeouts.get(step, timeout if timeout is not None else self.default_timeout)
+        start = time.monotonic()
+        with tracer.span(f"wait.{step}", kind="wait", deadline=deadline) as wait_span:
+            try:
+                WebDriverWait(driver=self.driver,
+                              timeout=deadline,
+                              poll_frequency=self.poll_frequency,
+                              ignored_exceptions=(WebDriverException,)).until(condition)
+                is_ready = True
+            except TimeoutException:
+                is_ready = False
+            wait_span.attributes["is_ready"] = is_ready
+        elapsed = time.monotonic() - start
+        self.waited[step] = self.waited.get(step, 0.0) + elapsed
+
+        if is_ready:
+            self.logger.info("Step %s ready after %.2fs (deadline %.1fs)", step, elapsed, deadline)
+        else:
+            self.logger.warning("Step %s not ready after %.2fs, condition %r", step, elapsed, condition)
+        return is_ready
+
+    @property
+    def total_waited(self) -> float:
+        return sum(self.waited.values())
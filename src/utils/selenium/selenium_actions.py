@@ -2,12 +2,13 @@ from abc import ABC, abstractmethod
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-from src.utils.selenium.error_exception_handler import ClickInterceptedHandler, SleepThreeSeconds, retry_with_handlers
+from src.utils.selenium.error_exception_handler import ClickInterceptedHandler, WaitForNetworkIdle, retry_with_budget
 from selenium.common.exceptions import NoSuchElementException, ElementClickInterceptedException
+from src.utils.tracing import tracer
 
 handlers = {
     ElementClickInterceptedException: [ClickInterceptedHandler()],
-    NoSuchElementException: [SleepThreeSeconds(), ClickInterceptedHandler()]
+    NoSuchElementException: [WaitForNetworkIdle(), ClickInterceptedHandler()]
 }
 
 
@@ -52,7 +53,8 @@ class GetAttributeAction(ABC):
 # click
 class ClickWhenVisible(ClickAction):
 
-    @retry_with_handlers(exception_handlers=handlers, max_retries=3, delay=0.5)
+    @tracer.traced("action.ClickWhenVisible", kind="action", attributes_from=("locator",))
+    @retry_with_budget(exception_handlers=handlers)
     def execute(self, locator: tuple, seconds_to_wait: float = 3) -> None:
         element = WebDriverWait(driver=self.driver,
                                 timeout=seconds_to_wait).until(EC.visibility_of_element_located(locator = locator))
@@ -60,7 +62,8 @@ class ClickWhenVisible(ClickAction):
 
 class ClickWhenClickable(ClickAction):
 
-    @retry_with_handlers(exception_handlers=handlers, max_retries=3, delay=0.5)
+    @tracer.traced("action.ClickWhenClickable", kind="action", attributes_from=("locator",))
+    @retry_with_budget(exception_handlers=handlers)
     def execute(self, locator: tuple, seconds_to_wait: float = 3) -> None:
         element = WebDriverWait(driver=self.driver,
                                 timeout=seconds_to_wait).until(EC.element_to_be_clickable(mark = locator))
@@ -69,7 +72,8 @@ class ClickWhenClickable(ClickAction):
 # enter text
 class EnterTextWhenVisible(EnterTextAction):
 
-    @retry_with_handlers(exception_handlers=handlers, max_retries=3, delay=0.5)
+    @tracer.traced("action.EnterTextWhenVisible", kind="action", attributes_from=("locator",))
+    @retry_with_budget(exception_handlers=handlers)
     def execute(self, locator: tuple, text: str, seconds_to_wait: float = 3) -> None:
         element = WebDriverWait(driver=self.driver,
                                 timeout=seconds_to_wait).until(EC.visibility_of_element_located(locator = locator))
@@ -79,7 +83,8 @@ class EnterTextWhenVisible(EnterTextAction):
 # get
 class GetHrefWhenVisible(GetAttributeAction):
 
-    @retry_with_handlers(exception_handlers=handlers, max_retries=3, delay=0.5)
+    @tracer.traced("action.GetHrefWhenVisible", kind="action", attributes_from=("locator",))
+    @retry_with_budget(exception_handlers=handlers)
     def execute(self, locator: tuple, seconds_to_wait: float = 3) -> str:
         element = WebDriverWait(driver=self.driver,
                                 timeout=seconds_to_wait).until(EC.visibility_of_element_located(locator = locator))
@@ -0,0 +1,104 @@
+import contextvars
+import functools
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+from logger import get_logger
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    __slots__ = ("name", "kind", "span_id", "parent_id", "attributes", "start", "duration_s", "status", "error", "thread")
+
+    def __init__(self, name: str, kind: str, span_id: int, parent_id: int | None, attributes: dict):
+        self.name = name
+        self.kind = kind
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start = time.time()
+        self.duration_s = None
+        self.status = "ok"
+        self.error = None
+        self.thread = threading.current_thread().name
+
+    def to_dict(self) -> dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class Tracer:
+    """Records nested timing spans and writes each finished span to the `etvcourse.trace` logger.
+
+    Spans nest per thread through a context variable, so concurrent bookings
+    keep separate trees. Kinds used in the pipeline: flow, step, action,
+    retry, handler and wait.
+    """
+
+    def __init__(self, logger=None):
+        self.logger = logger or get_logger("etvcourse.trace")
+        self.spans = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, kind: str = "step", **attributes):
+        parent = _current_span.get()
+        current = Span(name=name,
+                       kind=kind,
+                       span_id=next(self._ids),
+                       parent_id=parent.span_id if parent else None,
+                       attributes=attributes)
+        token = _current_span.set(current)
+        start = time.monotonic()
+        try:
+            yield current
+        except BaseException as err:
+            current.status = "error"
+            current.error = f"{type(err).__name__}: {err}"
+            raise
+        finally:
+            current.duration_s = time.monotonic() - start
+            _current_span.reset(token)
+            with self._lock:
+                self.spans.append(current)
+            self.logger.debug("span %s %.3fs", name, current.duration_s, extra={"span": current.to_dict()})
+
+    def traced(self, name: str | None = None, kind: str = "step", attributes_from: tuple = ()):
+        """Decorator wrapping a function call in a span; `attributes_from` copies keyword arguments onto it."""
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                attributes = {key: str(kwargs[key]) for key in attributes_from if key in kwargs}
+                with self.span(span_name, kind=kind, **attributes):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def reset(self) -> None:
+        with self._lock:
+            self.spans = []
+
+    def summary(self, top_n: int = 10) -> str:
+        with self._lock:
+            spans = list(self.spans)
+        totals = {}
+        for span in spans:
+            count, total, slowest = totals.get((span.name, span.kind), (0, 0.0, 0.0))
+            totals[(span.name, span.kind)] = (count + 1, total + span.duration_s, max(slowest, span.duration_s))
+
+        total_wait = sum(span.duration_s for span in spans if span.kind == "wait")
+        total_run = sum(span.duration_s for span in spans if span.parent_id is None)
+        lines = [f"{'SPAN':<50} {'KIND':<8} {'COUNT':>5} {'TOTAL S':>8} {'MAX S':>8}"]
+        slowest_first = sorted(totals.items(), key=lambda item: item[1][1], reverse=True)[:top_n]
+        for (name, kind), (count, total, slowest) in slowest_first:
+            lines.append(f"{name:<50} {kind:<8} {count:>5} {total:>8.2f} {slowest:>8.2f}")
+        lines.append(f"Total traced time: {total_run:.2f}s, total wait time: {total_wait:.2f}s")
+        return "\n".join(lines)
+
+
+tracer = Tracer()
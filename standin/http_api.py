@@ -0,0 +1,117 @@
+"""Local stand-in for the club site's login, course list and booking endpoints.
+
+Serves the JSON API the http engine talks to (see config/http_engine.yaml) from
+an in-memory course list, so the browser-free engine can be exercised without
+touching the live site:
+
+    python -m standin.http_api --port 8765
+    LOGIN_URL=http://127.0.0.1:8765/login BOOKING_ENGINE=http python main.py
+"""
+import argparse
+import json
+import secrets
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl
+
+DEFAULT_COURSES = [
+    {"id": 1, "name": "Yoga am Morgen", "weekday": "Mo", "location": "Sportzentrum Hoheluft",
+     "bookable": True, "capacity": 12, "participants": [{"id": 11, "name": "Max Mustermann"}]},
+    {"id": 2, "name": "Rückenfit", "weekday": "Mo", "location": "Sportzentrum Hoheluft",
+     "bookable": False, "capacity": 10, "participants": [{"id": 11, "name": "Max Mustermann"}]},
+]
+
+
+class StandinState:
+    def __init__(self, courses=None, login_name=None, password=None):
+        self.courses = json.loads(json.dumps(courses or DEFAULT_COURSES))
+        self.login_name = login_name
+        self.password = password
+        self.tokens = set()
+        self.bookings = []
+        self.lock = threading.Lock()
+
+
+def make_handler(state: StandinState):
+
+    class StandinHandler(BaseHTTPRequestHandler):
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, payload) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_json(self) -> dict:
+            length = int(self.headers.get("Content-Length", 0))
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def _is_authorized(self) -> bool:
+            return self.headers.get("Authorization", "").removeprefix("Bearer ") in state.tokens
+
+        def do_POST(self):
+            path = urlsplit(self.path).path
+            if path == "/api/auth/login":
+                credentials = self._read_json()
+                if state.login_name and (credentials.get("email"), credentials.get("password")) != (state.login_name, state.password):
+                    return self._send_json(401, {"error": "invalid credentials"})
+                token = secrets.token_hex(16)
+                state.tokens.add(token)
+                return self._send_json(200, {"token": token})
+
+            parts = path.strip("/").split("/")
+            if len(parts) == 4 and parts[:2] == ["api", "courses"] and parts[3] == "bookings":
+                if not self._is_authorized():
+                    return self._send_json(401, {"error": "not logged in"})
+                booking = self._read_json()
+                with state.lock:
+                    course = next((c for c in state.courses if str(c["id"]) == parts[2]), None)
+                    if course is None:
+                        return self._send_json(404, {"error": "unknown course"})
+                    if not course["bookable"]:
+                        return self._send_json(409, {"status": "not_bookable"})
+                    if not booking.get("accept_terms"):
+                        return self._send_json(422, {"status": "terms_not_accepted"})
+                    if course["capacity"] <= 0:
+                        return self._send_json(409, {"status": "full"})
+                    course["capacity"] -= 1
+                    state.bookings.append({"course_id": course["id"], **booking})
+                return self._send_json(201, {"status": "booked"})
+
+            self._send_json(404, {"error": "not found"})
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            if parts.path == "/api/courses":
+                if not self._is_authorized():
+                    return self._send_json(401, {"error": "not logged in"})
+                query = dict(parse_qsl(parts.query))
+                courses = [course for course in state.courses
+                           if course["weekday"] == query.get("weekday", course["weekday"])
+                           and course["location"] == query.get("location", course["location"])]
+                return self._send_json(200, courses)
+            self._send_json(404, {"error": "not found"})
+
+    return StandinHandler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, state: StandinState | None = None) -> ThreadingHTTPServer:
+    """Start the stand-in API on a background thread and return the server."""
+    server = ThreadingHTTPServer((host, port), make_handler(state or StandinState()))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(StandinState()))
+    print(f"Stand-in API on http://{args.host}:{args.port}")
+    server.serve_forever()
@@ -0,0 +1,165 @@
+"""Local stand-in for the club site's pages, built from the HTML fixtures.
+
+The fixtures copy the DOM structure the locators in locator_templates.py
+expect (kgr-form-field, kgr-select-control, the filter counter and the
+"Gebucht für" confirmation), so the selenium pipeline runs unchanged:
+
+    python -m standin.site --port 8766 --latency-ms 200 --overlay
+    LOGIN_URL=http://127.0.0.1:8766/login COURSE_OVERVIEW_URL=http://127.0.0.1:8766/overview ...
+
+Latency is added to every response and the overlay is a cookie banner that
+intercepts clicks until dismissed.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from standin.http_api import StandinState
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+OVERLAY = """
+<div class="cookie-overlay" style="position:fixed;inset:0;z-index:1000;background:rgba(0,0,0,.4)">
+  <div class="cookie-banner" style="position:absolute;bottom:0;width:100%;background:#fff;padding:1em">
+    Diese Seite verwendet Cookies.
+    <button type="button" onclick="this.closest('.cookie-overlay').remove()">Akzeptieren</button>
+  </div>
+</div>
+"""
+
+
+class SiteConfig:
+    def __init__(self, latency_ms: int = 0, overlay: bool = False, opens_in_s: float | None = None, live_open: bool = False):
+        self.latency_ms = latency_ms
+        self.overlay = overlay
+        self.opens_in_s = opens_in_s
+        # whether a closed course page renders the form by itself once registration opens
+        self.live_open = live_open
+        self.started_at = time.time()
+
+    @property
+    def opens_at_ms(self) -> int:
+        # closed courses never open when no opening is configured
+        if self.opens_in_s is None:
+            return 2 ** 53
+        return int((self.started_at + self.opens_in_s) * 1000)
+
+    @property
+    def is_open(self) -> bool:
+        return time.time() * 1000 >= self.opens_at_ms
+
+
+def make_handler(state: StandinState, config: SiteConfig):
+
+    class SiteHandler(BaseHTTPRequestHandler):
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body: bytes, content_type: str, headers: dict | None = None) -> None:
+            if config.latency_ms:
+                time.sleep(config.latency_ms / 1000)
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, status: int, payload, headers: dict | None = None) -> None:
+            self._send(status, json.dumps(payload).encode("utf-8"), "application/json", headers)
+
+        def _send_page(self, name: str, replacements: dict | None = None) -> None:
+            html = (FIXTURES / name).read_text(encoding="utf-8")
+            if config.overlay:
+                html = html.replace("<!-- OVERLAY -->", OVERLAY)
+            for marker, value in (replacements or {}).items():
+                html = html.replace(marker, value)
+            self._send(200, html.encode("utf-8"), "text/html; charset=utf-8")
+
+        def _is_logged_in(self) -> bool:
+            return "etv_session=1" in self.headers.get("Cookie", "")
+
+        def _course(self, course_id: str) -> dict | None:
+            return next((course for course in state.courses if str(course["id"]) == course_id), None)
+
+        def do_GET(self):
+            path = urlsplit(self.path).path
+            if path in ("/", "/login"):
+                return self._send_page("login.html")
+            if not self._is_logged_in():
+                return self._send(302, b"", "text/plain", {"Location": "/login"})
+            if path == "/overview":
+                return self._send_page("overview.html", {"/*COURSES*/[]": json.dumps(state.courses)})
+            if path.startswith("/course/"):
+                course = self._course(path.rsplit("/", 1)[-1])
+                if course is None:
+                    return self._send(404, b"unknown course", "text/plain")
+                opens_at = 0 if course["bookable"] else config.opens_at_ms
+                return self._send_page("course.html", {"/*COURSE*/{}": json.dumps({**course, "live_open": config.live_open}),
+                                                       "/*OPENS_AT*/0": str(opens_at),
+                                                       "/*COURSE_NAME*/": course["name"]})
+            if path == "/api/courses":
+                return self._send_json(200, state.courses)
+            self._send(404, b"not found", "text/plain")
+
+        def do_POST(self):
+            path = urlsplit(self.path).path
+            if path == "/api/session":
+                return self._send_json(200, {"status": "ok"}, {"Set-Cookie": "etv_session=1; Path=/"})
+
+            parts = path.strip("/").split("/")
+            if len(parts) == 4 and parts[:2] == ["api", "courses"] and parts[3] == "bookings":
+                if not self._is_logged_in():
+                    return self._send_json(401, {"status": "not_logged_in"})
+                length = int(self.headers.get("Content-Length", 0))
+                booking = json.loads(self.rfile.read(length) or b"{}")
+                with state.lock:
+                    course = self._course(parts[2])
+                    if course is None:
+                        return self._send_json(404, {"status": "unknown_course"})
+                    if not (course["bookable"] or config.is_open):
+                        return self._send_json(409, {"status": "not_bookable"})
+                    if not (booking.get("participant_id") and booking.get("invoice_recipient_id") and booking.get("accept_terms")):
+                        return self._send_json(422, {"status": "incomplete"})
+                    if course["capacity"] <= 0:
+                        return self._send_json(409, {"status": "full"})
+                    course["capacity"] -= 1
+                    state.bookings.append({"course_id": course["id"], **booking})
+                return self._send_json(201, {"status": "booked"})
+
+            self._send(404, b"not found", "text/plain")
+
+    return SiteHandler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8766, state: StandinState | None = None,
+          config: SiteConfig | None = None) -> ThreadingHTTPServer:
+    """Start the stand-in site on a background thread and return the server."""
+    server = ThreadingHTTPServer((host, port), make_handler(state or StandinState(), config or SiteConfig()))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--overlay", action="store_true")
+    parser.add_argument("--opens-in-s", type=float, default=None,
+                        help="seconds until closed courses open for registration, never by default")
+    parser.add_argument("--live-open", action="store_true")
+    args = parser.parse_args()
+    server = ThreadingHTTPServer((args.host, args.port),
+                                 make_handler(StandinState(), SiteConfig(latency_ms=args.latency_ms,
+                                                                         overlay=args.overlay,
+                                                                         opens_in_s=args.opens_in_s,
+                                                                         live_open=args.live_open)))
+    print(f"Stand-in site on http://{args.host}:{args.port}/login")
+    server.serve_forever()
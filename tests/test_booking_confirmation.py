@@ -0,0 +1,53 @@
+from selenium.common.exceptions import JavascriptException
+
+from src.utils.selenium.booking_confirmation import BookingConfirmationWatcher
+
+TEXTS = {"BOOKED": "Gebucht für Max Mustermann", "FULL": "ausgebucht", "FAILED": "fehlgeschlagen", "REQUEST": "/bookings"}
+IS_BOOKED = ("xpath", "//*[contains(normalize-space(.), 'Gebucht für Max Mustermann')]")
+
+
+class ScriptedDriver:
+    """Answers each wait slice with the next scripted outcome; an exception instance is raised."""
+
+    def __init__(self, outcomes: list):
+        self.outcomes = outcomes
+        self.calls = []
+
+    def execute_async_script(self, script, *args):
+        self.calls.append(args)
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def pending():
+    return {"status": "pending", "source": None, "httpStatus": None, "detail": None}
+
+
+def test_settled_outcome_is_returned():
+    driver = ScriptedDriver([pending(), {"status": "booked", "source": "network", "httpStatus": 201, "detail": "{}"}])
+
+    outcome = BookingConfirmationWatcher(driver=driver, texts=TEXTS, booked_locator=IS_BOOKED).wait(timeout_s=1, slice_s=0.01)
+
+    assert outcome == {"status": "booked", "source": "network", "http_status": 201, "detail": "{}"}
+    # every slice also checks the document-wide IS_BOOKED xpath
+    assert [args[1] for args in driver.calls] == [IS_BOOKED[1], IS_BOOKED[1]]
+
+
+def test_no_confirmation_ends_as_unknown_after_the_timeout():
+    driver = ScriptedDriver([pending()])
+
+    outcome = BookingConfirmationWatcher(driver=driver, texts=TEXTS).wait(timeout_s=0.05, slice_s=0.01)
+
+    assert outcome["status"] == "unknown"
+    assert driver.calls[0][1] is None
+
+
+def test_navigation_during_the_wait_is_unknown_not_an_error():
+    driver = ScriptedDriver([JavascriptException("Document was unloaded during execution")])
+
+    outcome = BookingConfirmationWatcher(driver=driver, texts=TEXTS, booked_locator=IS_BOOKED).wait(timeout_s=1)
+
+    assert outcome["status"] == "unknown"
+    assert outcome["detail"] == "JavascriptException while waiting"
@@ -0,0 +1,118 @@
+from datetime import datetime
+
+import pytest
+
+sqlalchemy = pytest.importorskip("sqlalchemy")
+
+from src.tasks.course_plan import CoursePlanLoader
+
+
+@pytest.fixture
+def course_db(tmp_path):
+    """A local SQLite stand-in for the course table."""
+    engine = sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'courses.sqlite'}")
+    metadata = sqlalchemy.MetaData()
+    table = sqlalchemy.Table("courses", metadata,
+                             sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+                             sqlalchemy.Column("orig_course_name", sqlalchemy.String),
+                             sqlalchemy.Column("person", sqlalchemy.String),
+                             sqlalchemy.Column("weekday", sqlalchemy.String),
+                             sqlalchemy.Column("weekday_ger_abb", sqlalchemy.String),
+                             sqlalchemy.Column("is_registration_active", sqlalchemy.Boolean),
+                             sqlalchemy.Column("registration_opens_at", sqlalchemy.DateTime),
+                             sqlalchemy.Column("updated_at", sqlalchemy.DateTime))
+    metadata.create_all(engine)
+    yield engine, table
+    engine.dispose()
+
+
+def add_course(course_db, id, weekday="Mo", is_active=True, updated_at=datetime(2026, 1, 1), **columns):
+    engine, table = course_db
+    with engine.begin() as connection:
+        connection.execute(table.insert().values(id=id, orig_course_name=f"Kurs {id}", person="Max Mustermann",
+                                                 weekday=weekday, weekday_ger_abb=weekday,
+                                                 is_registration_active=is_active, updated_at=updated_at, **columns))
+
+
+def update_course(course_db, id, **columns):
+    engine, table = course_db
+    with engine.begin() as connection:
+        connection.execute(table.update().where(table.c.id == id).values(**columns))
+
+
+def make_loader(course_db, tmp_path, db_url=None):
+    engine, _ = course_db
+    return CoursePlanLoader(db_url=db_url or str(engine.url), table_name="courses",
+                            snapshot_path=str(tmp_path / "snapshot.sqlite"))
+
+
+def course_names(courses):
+    return sorted(course["orig_course_name"] for course in courses)
+
+
+def test_full_load_keeps_only_active_courses_of_the_weekday(course_db, tmp_path):
+    add_course(course_db, 1)
+    add_course(course_db, 2, is_active=False)
+    add_course(course_db, 3, weekday="Di")
+
+    courses = make_loader(course_db, tmp_path).load(weekday_abbr="Mo")
+
+    assert course_names(courses) == ["Kurs 1"]
+    assert courses[0]["is_registration_active"] is True
+
+
+def test_incremental_refresh_applies_changes_since_the_watermark(course_db, tmp_path):
+    add_course(course_db, 1)
+    add_course(course_db, 2)
+    loader = make_loader(course_db, tmp_path)
+    loader.load(weekday_abbr="Mo")
+
+    update_course(course_db, 2, is_registration_active=False, updated_at=datetime(2026, 1, 2))
+    add_course(course_db, 3, updated_at=datetime(2026, 1, 2))
+
+    assert course_names(loader.load(weekday_abbr="Mo")) == ["Kurs 1", "Kurs 3"]
+
+
+def test_course_moved_to_another_weekday_leaves_the_snapshot(course_db, tmp_path):
+    add_course(course_db, 1)
+    add_course(course_db, 2)
+    loader = make_loader(course_db, tmp_path)
+    loader.load(weekday_abbr="Mo")
+
+    update_course(course_db, 2, weekday="Di", weekday_ger_abb="Di", updated_at=datetime(2026, 1, 2))
+
+    assert course_names(loader.load(weekday_abbr="Mo")) == ["Kurs 1"]
+
+
+def test_weekday_without_courses_refreshes_fully_next_time(course_db, tmp_path):
+    loader = make_loader(course_db, tmp_path)
+    assert loader.load(weekday_abbr="Mo") == []
+    assert loader._meta("Mo")["watermark"] is None
+
+    add_course(course_db, 1)
+
+    assert course_names(loader.load(weekday_abbr="Mo")) == ["Kurs 1"]
+
+
+def test_registration_opens_at_timestamp_round_trips(course_db, tmp_path):
+    add_course(course_db, 1, registration_opens_at=datetime(2026, 10, 19, 9, 0))
+
+    courses = make_loader(course_db, tmp_path).load(weekday_abbr="Mo")
+
+    assert courses[0]["registration_opens_at"] == datetime(2026, 10, 19, 9, 0)
+
+
+def test_unreachable_database_falls_back_to_the_snapshot(course_db, tmp_path):
+    add_course(course_db, 1)
+    make_loader(course_db, tmp_path).load(weekday_abbr="Mo")
+
+    broken = make_loader(course_db, tmp_path, db_url=f"sqlite:///{tmp_path / 'missing' / 'courses.sqlite'}")
+
+    assert course_names(broken.load(weekday_abbr="Mo")) == ["Kurs 1"]
+
+
+def test_unreachable_database_without_snapshot_raises(course_db, tmp_path):
+    broken = make_loader(course_db, tmp_path, db_url=f"sqlite:///{tmp_path / 'missing' / 'courses.sqlite'}")
+
+    with pytest.raises(Exception):
+        broken.load(weekday_abbr="Mo")
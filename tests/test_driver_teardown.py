@@ -0,0 +1,67 @@
+import os
+
+from selenium.common.exceptions import WebDriverException
+
+from src.tasks.driver_pool import DriverPool
+from src.tasks.hot_driver import HotDriver
+from src.tasks.request_blocking import RequestBlockingProxy
+
+
+class FakeDriver:
+    def __init__(self, profile_dir: str):
+        self.request_blocker = RequestBlockingProxy(deny_hosts=["ads.example.com"], port=0)
+        self.request_blocker.start()
+        self.profile_dir = profile_dir
+        self.is_dead = False
+        self.quit_calls = 0
+
+    def execute_script(self, script):
+        if self.is_dead:
+            raise WebDriverException("browser died")
+        return 1
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+def make_profile(tmp_path, name: str) -> str:
+    profile_dir = tmp_path / name
+    profile_dir.mkdir()
+    (profile_dir / "prefs.js").write_text("", encoding="utf-8")
+    return str(profile_dir)
+
+
+def assert_torn_down(driver: FakeDriver, profile_dir: str, proxy: RequestBlockingProxy):
+    assert driver.quit_calls == 1
+    assert proxy._server is None
+    assert driver.request_blocker is None and driver.profile_dir is None
+    assert not os.path.exists(profile_dir)
+
+
+def test_hot_driver_restart_releases_proxy_and_profile(tmp_path):
+    profiles = iter([make_profile(tmp_path, "first"), make_profile(tmp_path, "second")])
+    hot_driver = HotDriver(driver_factory=lambda: FakeDriver(next(profiles)), login_fn=lambda driver: None)
+
+    first = hot_driver.get()
+    first_profile, first_proxy = first.profile_dir, first.request_blocker
+    first.is_dead = True
+    second = hot_driver.get()
+
+    assert second is not first and hot_driver.restarts == 1
+    assert_torn_down(first, first_profile, first_proxy)
+
+    second_profile, second_proxy = second.profile_dir, second.request_blocker
+    hot_driver.quit()
+    assert_torn_down(second, second_profile, second_proxy)
+
+
+def test_driver_pool_close_releases_proxies_and_profiles(tmp_path):
+    profiles = iter([make_profile(tmp_path, "a"), make_profile(tmp_path, "b")])
+    pool = DriverPool(driver_factory=lambda: FakeDriver(next(profiles)), login_fn=lambda driver: None, size=2)
+    pool.start()
+    started = [(driver, driver.profile_dir, driver.request_blocker) for driver in pool.drivers]
+
+    pool.close()
+
+    for driver, profile_dir, proxy in started:
+        assert_torn_down(driver, profile_dir, proxy)
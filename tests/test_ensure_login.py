@@ -0,0 +1,45 @@
+import pytest
+from selenium.common.exceptions import InvalidCookieDomainException, JavascriptException
+
+from src.tasks import course_booking
+
+TASKS_CFG = {"login_name": "max@example.com", "password": "secret", "course_overview_url": "https://example.com/courses"}
+
+
+class FakeDriver:
+    def __init__(self):
+        self.startup_timings = {"first_navigation": 0.1}
+        self.cookies_deleted = False
+
+    def delete_all_cookies(self):
+        self.cookies_deleted = True
+
+
+class BrokenSessionStore:
+    def __init__(self, error: Exception):
+        self.error = error
+        self.cleared = False
+        self.saved = False
+
+    def restore(self, driver):
+        raise self.error
+
+    def clear(self):
+        self.cleared = True
+
+    def save(self, driver, login_duration_s):
+        self.saved = True
+
+
+@pytest.mark.parametrize("error", [InvalidCookieDomainException("cookie of another domain"),
+                                   JavascriptException("localStorage is not available")])
+def test_failed_restore_clears_the_cache_and_runs_the_full_login(monkeypatch, error):
+    logins = []
+    monkeypatch.setattr(course_booking, "run_login", lambda **kwargs: logins.append(kwargs["driver"]))
+    driver, session_store = FakeDriver(), BrokenSessionStore(error)
+
+    course_booking.ensure_login(driver=driver, tasks_cfg=TASKS_CFG, locator_fillings={}, session_store=session_store)
+
+    assert logins == [driver]
+    assert session_store.cleared and driver.cookies_deleted
+    assert session_store.saved
@@ -0,0 +1,82 @@
+import pytest
+
+from src.tasks.http_engine import HttpEngine
+from standin.http_api import StandinState, serve
+
+HTTP_CFG = {"timeout": 5,
+            "pool_maxsize": 2,
+            "max_retries": 0,
+            "endpoints": {"login": "/api/auth/login",
+                          "courses": "/api/courses",
+                          "booking": "/api/courses/{COURSE_ID}/bookings"},
+            "course_query": {"location": "{LOCATION}", "weekday": "{DAY_GER_ABB}"}}
+LOCATOR_FILLINGS = {"FilterPageLocators": {"LOCATION": "Sportzentrum Hoheluft"}}
+
+
+@pytest.fixture
+def standin():
+    state = StandinState(login_name="max@example.com", password="secret")
+    server = serve(port=0, state=state)
+    yield state, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def make_engine(base_url, password="secret"):
+    tasks_cfg = {"login_url": f"{base_url}/login", "login_name": "max@example.com", "password": password}
+    return HttpEngine(http_cfg=HTTP_CFG, tasks_cfg=tasks_cfg, locator_fillings=LOCATOR_FILLINGS)
+
+
+def course(name):
+    return {"orig_course_name": name, "person": "Max Mustermann", "weekday_ger_abb": "Mo"}
+
+
+def test_books_a_bookable_course(standin):
+    state, base_url = standin
+    engine = make_engine(base_url)
+    engine.login()
+
+    result = engine.book_course(single_course=course("Yoga am Morgen"), weekday_abbr="Mo")
+
+    assert result["is_booked"] is True
+    assert result["booking_status"] == "booked"
+    assert state.bookings == [{"course_id": 1, "participant_id": 11, "invoice_recipient_id": 11, "accept_terms": True}]
+
+
+def test_full_course_is_a_final_result(standin):
+    state, base_url = standin
+    state.courses[0]["capacity"] = 0
+    engine = make_engine(base_url)
+    engine.login()
+
+    result = engine.book_course(single_course=course("Yoga am Morgen"), weekday_abbr="Mo")
+
+    assert result["is_booked"] is False
+    assert result["booking_status"] == "full"
+
+
+def test_not_bookable_course_is_a_final_result(standin):
+    _, base_url = standin
+    engine = make_engine(base_url)
+    engine.login()
+
+    result = engine.book_course(single_course=course("Rückenfit"), weekday_abbr="Mo")
+
+    assert result["is_booked"] is False
+    assert result["booking_status"] == "not_bookable"
+
+
+def test_unknown_course_raises_for_the_selenium_fallback(standin):
+    _, base_url = standin
+    engine = make_engine(base_url)
+    engine.login()
+
+    with pytest.raises(LookupError):
+        engine.book_course(single_course=course("Pilates"), weekday_abbr="Mo")
+
+
+def test_wrong_password_fails_the_login(standin):
+    _, base_url = standin
+
+    with pytest.raises(Exception):
+        make_engine(base_url, password="wrong").login()
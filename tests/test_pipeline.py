@@ -0,0 +1,110 @@
+import pytest
+
+from src.tasks.pipeline import CourseCheckpoint, Step, StepPipeline
+
+
+class BookingSteps:
+    """The step layout of run_course_booking with recorded calls and a switchable booking failure."""
+
+    def __init__(self, booking_failures: int = 0):
+        self.calls = []
+        self.booking_failures = booking_failures
+
+    def filter(self):
+        self.calls.append("filter")
+        return {"overview_page": True}
+
+    def course_link(self, overview_page):
+        self.calls.append("course_link")
+        return {"course_link": "https://example.com/course/1"}
+
+    def course_page(self, course_link):
+        self.calls.append("course_page")
+        return {"course_page": course_link}
+
+    def booking(self, course_page):
+        self.calls.append("booking")
+        if self.booking_failures:
+            self.booking_failures -= 1
+            raise RuntimeError("book button not found")
+        return {"clicked_at": 1.0}
+
+    def steps(self) -> list[Step]:
+        return [Step("filter", self.filter, outputs=("overview_page",), checkpointed=False),
+                Step("course_link", self.course_link, inputs=("overview_page",), outputs=("course_link",)),
+                Step("course_page", self.course_page, inputs=("course_link",), outputs=("course_page",), checkpointed=False),
+                Step("booking", self.booking, inputs=("course_page",), outputs=("clicked_at",), checkpointed=False)]
+
+
+def plan_names(pipeline: StepPipeline) -> list[str]:
+    return [step.name for step in pipeline.plan()]
+
+
+def test_plan_runs_every_step_without_a_checkpoint():
+    pipeline = StepPipeline(steps=BookingSteps().steps(), checkpoint=CourseCheckpoint(key="Yoga/Max"))
+
+    assert plan_names(pipeline) == ["filter", "course_link", "course_page", "booking"]
+
+
+def test_plan_resumes_from_a_checkpointed_course_link():
+    checkpoint = CourseCheckpoint(key="Yoga/Max")
+    checkpoint.outputs["course_link"] = "https://example.com/course/1"
+    pipeline = StepPipeline(steps=BookingSteps().steps(), checkpoint=checkpoint)
+
+    assert plan_names(pipeline) == ["course_page", "booking"]
+
+
+def test_plan_ignores_checkpointed_outputs_of_page_state_steps():
+    checkpoint = CourseCheckpoint(key="Yoga/Max")
+    checkpoint.outputs["course_page"] = "https://example.com/course/1"
+    pipeline = StepPipeline(steps=BookingSteps().steps(), checkpoint=checkpoint)
+
+    assert plan_names(pipeline) == ["filter", "course_link", "course_page", "booking"]
+
+
+def test_retry_after_a_booking_failure_skips_the_overview():
+    steps = BookingSteps(booking_failures=1)
+    checkpoint = CourseCheckpoint(key="Yoga/Max")
+    pipeline = StepPipeline(steps=steps.steps(), checkpoint=checkpoint, max_failures=2)
+
+    with pytest.raises(RuntimeError):
+        pipeline.run()
+    assert checkpoint.outputs == {"course_link": "https://example.com/course/1"}
+    assert checkpoint.failures == {"booking": 1}
+
+    values = pipeline.run()
+
+    assert steps.calls == ["filter", "course_link", "course_page", "booking", "course_page", "booking"]
+    assert values["clicked_at"] == 1.0
+    assert checkpoint.failures == {}
+
+
+def test_repeated_failures_clear_the_checkpoint_and_the_next_run_starts_over():
+    steps = BookingSteps(booking_failures=2)
+    checkpoint = CourseCheckpoint(key="Yoga/Max")
+    pipeline = StepPipeline(steps=steps.steps(), checkpoint=checkpoint, max_failures=2)
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            pipeline.run()
+    assert checkpoint.outputs == {}
+    assert checkpoint.failures == {}
+
+    steps.calls.clear()
+    pipeline.run()
+
+    assert steps.calls == ["filter", "course_link", "course_page", "booking"]
+
+
+def test_after_step_attributes_are_added_to_the_step_span():
+    from src.utils.tracing import tracer
+
+    tracer.reset()
+    pipeline = StepPipeline(steps=BookingSteps().steps(), checkpoint=CourseCheckpoint(key="Yoga/Max"),
+                            after_step=lambda name: {"snapshot": f"{name}.html"})
+
+    pipeline.run()
+
+    spans = {span.name: span.attributes for span in tracer.spans}
+    assert spans["pipeline.booking"] == {"course": "Yoga/Max", "snapshot": "booking.html"}
+    tracer.reset()
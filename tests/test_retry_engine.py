@@ -0,0 +1,219 @@
+import time
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+
+from src.utils.selenium import error_exception_handler
+from src.utils.selenium.error_exception_handler import (AdaptiveRetryEngine, BaseHandler, RetryBudget,
+                                                        WaitForNetworkIdle, retry_with_budget)
+from src.utils.selenium.selenium_actions import ClickWhenVisible
+
+
+class RecordingHandler(BaseHandler):
+    def __init__(self, cost: float = 0.0):
+        self.cost = cost
+        self.calls = []
+
+    def handle(self, driver, exception):
+        self.calls.append((driver, type(exception).__name__))
+
+
+class OtherHandler(RecordingHandler):
+    pass
+
+
+class FlakyAction:
+    """Fails `n_failures` times with NoSuchElementException, then returns the wait it got."""
+
+    def __init__(self, n_failures: int):
+        self.driver = "driver"
+        self.n_failures = n_failures
+        self.waits = []
+
+    def execute(self, locator, seconds_to_wait):
+        self.waits.append(seconds_to_wait)
+        # a failing wait runs out its timeout
+        if len(self.waits) <= self.n_failures:
+            time.sleep(seconds_to_wait)
+        if len(self.waits) <= self.n_failures:
+            raise NoSuchElementException("missing")
+        return seconds_to_wait
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replaces time.monotonic and time.sleep everywhere, selenium's WebDriverWait included."""
+    fake = FakeClock()
+    monkeypatch.setattr(time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(time, "sleep", fake.sleep)
+    monkeypatch.setattr(error_exception_handler.random, "uniform", lambda low, high: 1.0)
+    return fake
+
+
+def decorate(engine, handlers=(), **kwargs):
+    return retry_with_budget({NoSuchElementException: list(handlers)}, engine=engine, **kwargs)(FlakyAction.execute)
+
+
+def backoffs(clock: FakeClock, action: FlakyAction) -> list[float]:
+    return [seconds for seconds in clock.sleeps if seconds not in action.waits]
+
+
+def test_backoff_doubles_up_to_max_delay(clock):
+    execute = decorate(AdaptiveRetryEngine(), max_retries=6, base_delay=0.2, max_delay=1.0, max_action_s=60)
+    action = FlakyAction(n_failures=5)
+
+    assert execute(action, ("xpath", "//a"), seconds_to_wait=0.1) == 0.1
+    assert backoffs(clock, action) == pytest.approx([0.2, 0.4, 0.8, 1.0, 1.0])
+
+
+def test_gives_up_after_max_retries(clock):
+    execute = decorate(AdaptiveRetryEngine(), max_retries=3, max_action_s=60)
+    action = FlakyAction(n_failures=5)
+
+    with pytest.raises(NoSuchElementException):
+        execute(action, ("xpath", "//a"), seconds_to_wait=0.5)
+    assert action.waits == [0.5, 0.5, 0.5]
+    assert len(backoffs(clock, action)) == 2
+
+
+def test_deadline_caps_the_waits_and_stops_retrying(clock):
+    execute = decorate(AdaptiveRetryEngine(), max_retries=5, base_delay=0.2, max_action_s=2.0)
+    action = FlakyAction(n_failures=5)
+    start = clock.now
+
+    with pytest.raises(NoSuchElementException):
+        execute(action, ("xpath", "//a"), seconds_to_wait=1.5)
+    # 1.5s wait, 0.2s backoff, the rest of the deadline; a further backoff does not fit anymore
+    assert action.waits == pytest.approx([1.5, 0.3])
+    assert clock.now - start == pytest.approx(2.0)
+
+
+def test_deadline_is_a_share_of_the_remaining_budget(clock):
+    execute = decorate(AdaptiveRetryEngine(), max_action_s=5.0, budget_share=0.1)
+    action = FlakyAction(n_failures=5)
+
+    with RetryBudget(seconds=10):
+        start = clock.now
+        with pytest.raises(NoSuchElementException):
+            execute(action, ("xpath", "//a"), seconds_to_wait=3)
+    assert action.waits == [pytest.approx(1.0)]
+    assert clock.now - start == pytest.approx(1.0)
+
+
+class MissingElementDriver:
+    def find_element(self, by, value):
+        raise NoSuchElementException(f"{by}={value}")
+
+    def execute_script(self, script, *args):
+        return True
+
+
+def test_missing_element_gives_up_well_below_the_old_ten_seconds(clock):
+    action = ClickWhenVisible(driver=MissingElementDriver())
+    start = clock.now
+
+    with RetryBudget(seconds=120):
+        with pytest.raises(Exception):
+            action.execute(locator=("xpath", "//button[@id='missing']"))
+
+    # the old retry cost 3 waits of 3s plus 2 delays of 0.5s; WebDriverWait may overrun by one poll
+    assert clock.now - start <= 5.0 + 0.5
+
+
+def test_handlers_run_on_the_matching_exception_and_hits_are_recorded(clock):
+    engine = AdaptiveRetryEngine()
+    handler = RecordingHandler()
+    execute = decorate(engine, handlers=[handler])
+
+    execute(FlakyAction(n_failures=1), ("xpath", "//a"))
+
+    assert handler.calls == [("driver", "NoSuchElementException")]
+    assert engine.handler_stats == {("('xpath', '//a')", "RecordingHandler"): (1, 1)}
+    assert engine.locator_stats["('xpath', '//a')"][:2] == (2, 1)
+
+
+LINK = ("xpath", "//a")
+BUTTON = ("xpath", "//button")
+
+
+def test_select_handlers_orders_by_hit_rate_and_skips_poor_ones():
+    engine = AdaptiveRetryEngine(min_samples=3, min_hit_rate=0.2)
+    poor, good = RecordingHandler(), OtherHandler()
+    engine.handler_stats = {(str(LINK), "RecordingHandler"): (5, 0), (str(LINK), "OtherHandler"): (2, 2)}
+
+    assert engine.select_handlers(LINK, [poor, good], remaining=None) == [good]
+
+    engine.handler_stats = {(str(LINK), "RecordingHandler"): (2, 0), (str(LINK), "OtherHandler"): (2, 2)}
+    assert engine.select_handlers(LINK, [poor, good], remaining=None) == [good, poor]
+
+
+def test_a_handler_dropped_for_one_locator_is_kept_for_others():
+    engine = AdaptiveRetryEngine(min_samples=3, min_hit_rate=0.2)
+    handler = RecordingHandler()
+    for _ in range(5):
+        engine.record_handlers(LINK, [handler], is_hit=False)
+
+    assert engine.select_handlers(LINK, [handler], remaining=None) == []
+    assert engine.select_handlers(BUTTON, [handler], remaining=None) == [handler]
+
+
+def test_report_lists_hit_rates_per_locator():
+    engine = AdaptiveRetryEngine()
+    engine.record_attempt(LINK, 0.5, is_success=False)
+    engine.record_attempt(BUTTON, 0.1, is_success=False)
+    engine.record_handlers(LINK, [RecordingHandler()], is_hit=True)
+    engine.record_handlers(BUTTON, [RecordingHandler()], is_hit=False)
+
+    lines = engine.report().splitlines()
+
+    assert lines[1].startswith(str(LINK)) and lines[2] == "    handler RecordingHandler: 1/1 hits"
+    assert lines[3].startswith(str(BUTTON)) and lines[4] == "    handler RecordingHandler: 0/1 hits"
+
+
+def test_select_handlers_skips_handlers_costing_more_than_the_time_left():
+    engine = AdaptiveRetryEngine()
+    cheap, costly = RecordingHandler(cost=0.1), OtherHandler(cost=1.0)
+
+    assert engine.select_handlers(LINK, [cheap, costly], remaining=0.5) == [cheap]
+    assert engine.select_handlers(LINK, [cheap, costly], remaining=None) == [cheap, costly]
+
+
+def test_reset_clears_the_statistics():
+    engine = AdaptiveRetryEngine()
+    engine.record_attempt(("xpath", "//a"), 0.1, is_success=False)
+    engine.record_handlers(LINK, [RecordingHandler()], is_hit=True)
+
+    engine.reset()
+
+    assert engine.locator_stats == {} and engine.handler_stats == {}
+
+
+def test_wait_for_network_idle_returns_once_the_page_settled():
+    class SettlingDriver:
+        def __init__(self):
+            self.polls = 0
+
+        def execute_script(self, script, *args):
+            self.polls += 1
+            return self.polls >= 3
+
+    driver = SettlingDriver()
+    handler = WaitForNetworkIdle(timeout=1.0, poll_frequency=0.01)
+
+    handler.handle(driver, NoSuchElementException("missing"))
+
+    assert driver.polls == 3
+    assert handler.cost == 1.0
@@ -0,0 +1,84 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from src.utils.help_functions import read_yaml_file
+from src.utils.locators.snapshots import SnapshotRecorder, format_report, load_manifest, replay
+
+FIXTURES = Path(__file__).parent / "fixtures" / "snapshots"
+LOCATOR_FILLINGS = Path(__file__).parent.parent / "src" / "utils" / "locators" / "locator_fillings.yaml"
+
+
+@pytest.fixture
+def lxml():
+    return pytest.importorskip("lxml")
+
+
+@pytest.fixture
+def locator_fillings():
+    return read_yaml_file(str(LOCATOR_FILLINGS))
+
+
+def rows_by_step(rows: list[dict]) -> dict:
+    return {(row["step"], row["locator"]): row for row in rows}
+
+
+def test_recorded_fixtures_replay_unchanged(lxml, locator_fillings):
+    rows = replay(directory=str(FIXTURES), locator_fillings=locator_fillings)
+
+    assert [row for row in rows if row["changed"]] == []
+    rows = rows_by_step(rows)
+    assert rows[("login/page", "LoginPageLocators.USERNAME")]["replayed"] == 1
+    assert rows[("filter", "BookingLocators.COURSE_DAY")]["replayed"] == 1
+    assert rows[("course_page", "BookingLocators.BOOK")]["replayed"] == 1
+    assert rows[("course_page", "BookingLocators.IS_BOOKED")]["replayed"] == 0
+
+
+def test_changed_filling_is_reported(lxml, locator_fillings):
+    locator_fillings["BookingLocators"]["BOOK"] = "Jetzt buchen"
+
+    rows = replay(directory=str(FIXTURES), locator_fillings=locator_fillings)
+
+    changed = [(row["step"], row["locator"]) for row in rows if row["changed"]]
+    assert changed == [("course_page", "BookingLocators.BOOK")]
+    assert "1 of" in format_report(rows).splitlines()[-1]
+
+
+def test_locator_unknown_when_recording_is_not_reported(lxml, locator_fillings, tmp_path):
+    shutil.copytree(FIXTURES, tmp_path, dirs_exist_ok=True)
+    entries = load_manifest(str(tmp_path))
+    for entry in entries:
+        entry["live"].pop("BookingLocators.BOOK", None)
+    (tmp_path / "manifest.jsonl").write_text("".join(json.dumps(entry) + "\n" for entry in entries), encoding="utf-8")
+
+    rows = rows_by_step(replay(directory=str(tmp_path), locator_fillings=locator_fillings))
+
+    assert rows[("course_page", "BookingLocators.BOOK")]["live"] is None
+    assert rows[("course_page", "BookingLocators.BOOK")]["changed"] is False
+
+
+class FixtureDriver:
+    """Serves a fixture page; the probe script answers with the counts the fixture manifest recorded."""
+
+    def __init__(self, entry: dict):
+        self.page_source = (FIXTURES / entry["file"]).read_text(encoding="utf-8")
+        self.current_url = entry["url"]
+        self.live = entry["live"]
+
+    def execute_script(self, script, locators):
+        return {name: {"count": self.live.get(name, 0)} for name in locators}
+
+
+def test_recorded_snapshots_round_trip_through_replay(locator_fillings, tmp_path):
+    recorder = SnapshotRecorder(directory=str(tmp_path), locator_fillings=locator_fillings)
+    for entry in load_manifest(str(FIXTURES)):
+        assert recorder.record(driver=FixtureDriver(entry), step=entry["step"], placeholders=entry["placeholders"])
+
+    recorded = load_manifest(str(tmp_path))
+    assert [entry["file"] for entry in recorded] == ["001_login_page.html", "002_filter.html", "003_course_page.html"]
+    assert [entry["live"] for entry in recorded] == [entry["live"] for entry in load_manifest(str(FIXTURES))]
+
+    pytest.importorskip("lxml")
+    assert not any(row["changed"] for row in replay(directory=str(tmp_path), locator_fillings=locator_fillings))
@@ -0,0 +1,19 @@
+from types import SimpleNamespace
+
+from src.tasks import course_booking
+
+
+def test_rss_is_not_sampled_between_course_page_and_click(monkeypatch):
+    sampled = []
+    monkeypatch.setattr(course_booking, "log_driver_memory",
+                        lambda driver, step, logger: sampled.append(step) or {"rss_mb": 1.0})
+    after_step = course_booking.step_hooks(SimpleNamespace(rss_telemetry=True))
+
+    attributes = {step: after_step(step) for step in ("filter", "course_link", "course_page", "booking")}
+
+    assert sampled == ["filter", "course_link", "booking"]
+    assert attributes["course_page"] == {}
+
+
+def test_no_hook_without_telemetry_or_snapshots():
+    assert course_booking.step_hooks(SimpleNamespace(rss_telemetry=False)) is None
@@ -0,0 +1,110 @@
+import threading
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.errorhandler import ErrorHandler
+from selenium.webdriver.remote.locator_converter import LocatorConverter
+from selenium.webdriver.remote.switch_to import SwitchTo
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+from src.tasks import tab_orchestrator
+from src.tasks.tab_orchestrator import TabOrchestrator
+
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+
+class FakeBrowser:
+    """Command executor of a browser whose tabs each hold a url; logs (selected tab, command)."""
+
+    def __init__(self):
+        self.tabs = {"tab-0": None}
+        self.selected = "tab-0"
+        self.log = []
+        self._lock = threading.Lock()
+
+    def execute(self, command, params):
+        # the orchestrator's lock must make every command atomic, concurrent calls are a bug
+        assert self._lock.acquire(blocking=False), "two commands ran at the same time"
+        try:
+            time.sleep(0.001)
+            return {"value": self._answer(command, params or {})}
+        finally:
+            self._lock.release()
+
+    def _answer(self, command, params):
+        self.log.append((self.selected, command))
+        if command == Command.W3C_GET_CURRENT_WINDOW_HANDLE:
+            return self.selected
+        if command == Command.NEW_WINDOW:
+            handle = f"tab-{len(self.tabs)}"
+            self.tabs[handle] = None
+            return {"handle": handle, "type": "tab"}
+        if command == Command.SWITCH_TO_WINDOW:
+            self.selected = params["handle"]
+            return None
+        if command == Command.CLOSE:
+            del self.tabs[self.selected]
+            return None
+        if command == Command.W3C_EXECUTE_SCRIPT:
+            if params["args"]:
+                self.tabs[self.selected] = params["args"][0]
+            return True
+        if command == Command.FIND_ELEMENT:
+            return {ELEMENT_KEY: f"{self.selected}:{params['value']}"}
+        return None
+
+
+def make_driver(browser: FakeBrowser) -> WebDriver:
+    driver = WebDriver.__new__(WebDriver)
+    driver.command_executor = browser
+    driver.session_id = "session"
+    driver.error_handler = ErrorHandler()
+    driver.locator_converter = LocatorConverter()
+    driver._web_element_cls = WebElement
+    driver._switch_to = SwitchTo(driver)
+    return driver
+
+
+def fake_booking(driver, single_course, **kwargs):
+    driver.get(single_course["url"])
+    book = driver.find_element(By.ID, "book")
+    book.click()
+    return {"course": single_course["orig_course_name"], "element_parent": book.parent, "driver": driver}
+
+
+def test_each_tab_runs_on_its_own_driver_without_patching_the_shared_one(monkeypatch):
+    monkeypatch.setattr(tab_orchestrator, "run_course_booking", fake_booking)
+    browser = FakeBrowser()
+    driver = make_driver(browser)
+    courses = [{"orig_course_name": f"course {index}", "url": f"https://example.com/course/{index}"} for index in range(3)]
+    orchestrator = TabOrchestrator(driver=driver, tasks_cfg={}, locator_fillings={}, poll_frequency=0.001)
+
+    results = orchestrator.run(active_courses=courses, weekday_abbr="Mo")
+
+    assert [result["course"] for result in results] == ["course 0", "course 1", "course 2"]
+    assert "execute" not in driver.__dict__
+    assert all(result["element_parent"] is result["driver"] is not driver for result in results)
+    # every tab loaded its own course and the click of its element ran while that tab was selected
+    clicks = sorted(selected for selected, command in browser.log if command == Command.CLICK_ELEMENT)
+    assert clicks == ["tab-0", "tab-1", "tab-2"]
+    assert list(browser.tabs) == ["tab-0"]
+
+
+def test_tab_driver_routes_element_commands():
+    browser = FakeBrowser()
+    driver = make_driver(browser)
+    routed = []
+
+    def execute(tab, driver_command, params=None):
+        routed.append(driver_command)
+        return tab_orchestrator.send(tab, driver_command, params)
+
+    tab = tab_orchestrator.tab_driver(driver, execute)
+    element = tab.find_element(By.ID, "book")
+    element.click()
+    tab.switch_to.window("tab-0")
+
+    assert element.parent is tab
+    assert routed == [Command.FIND_ELEMENT, Command.CLICK_ELEMENT, Command.SWITCH_TO_WINDOW]
@@ -0,0 +1,39 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from logger import setup_worker_logging, start_worker_log_listener
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def log_from_worker(account_name: str) -> None:
+    logging.getLogger("etvcourse.multi_account").info("Account %s: booking %s courses", account_name, 2)
+    logging.getLogger("etvcourse.multi_account").debug("below the configured level")
+
+
+def test_worker_records_are_written_by_the_parent():
+    target = logging.getLogger("etvcourse")
+    handler = RecordingHandler()
+    target.addHandler(handler)
+    mp_context = multiprocessing.get_context("spawn")
+    log_queue = mp_context.Queue()
+    listener = start_worker_log_listener(log_queue)
+    try:
+        with ProcessPoolExecutor(max_workers=2, mp_context=mp_context,
+                                 initializer=setup_worker_logging, initargs=(log_queue,)) as executor:
+            list(executor.map(log_from_worker, ["anna", "ben"]))
+    finally:
+        listener.stop()
+        target.removeHandler(handler)
+
+    messages = sorted(record.getMessage() for record in handler.records)
+    assert messages == ["Account anna: booking 2 courses", "Account ben: booking 2 courses"]
+    assert {record.processName for record in handler.records} != {multiprocessing.current_process().name}